@@ -12,14 +12,11 @@ from pydantic import BaseModel, ValidationError
 from config import config
 
 from agentscope.agent import ReActAgent
-from agentscope.formatter import (
-    DashScopeMultiAgentFormatter,
-    OpenAIMultiAgentFormatter,
-    OllamaMultiAgentFormatter,
-)
-from agentscope.model import DashScopeChatModel, OpenAIChatModel, OllamaChatModel
 from agentscope.message import Msg
 
+from core.model_factory import create_chat_model, create_formatter
+from core.model_router import decision_kind
+
 from analysis.schemas import (
     Psychology,
     Network,
@@ -232,33 +229,23 @@ def _extract_json(text: str) -> str:
 
 
 def _build_model_and_formatter() -> tuple[Any, Any]:
-    if config.model_provider == "dashscope":
-        return (
-            DashScopeChatModel(api_key=config.dashscope_api_key,
-                               model_name=config.dashscope_model_name),
-            DashScopeMultiAgentFormatter(),
-        )
-
     if config.model_provider == "openai":
         # 使用可用的 OpenAI 兼容配置进行分析。
         # 优先使用分析模块独立配置（ANALYSIS_OPENAI_*），否则回退 Player1/全局配置。
         cfg = config.openai_analysis_config or config.openai_player_configs[0]
         return (
-            OpenAIChatModel(
+            create_chat_model(
+                "openai",
                 api_key=cfg.get("api_key"),
                 model_name=cfg.get("model_name"),
-                client_args={"base_url": cfg.get("base_url")},
+                base_url=cfg.get("base_url"),
+                routed=True,
             ),
-            OpenAIMultiAgentFormatter(),
-        )
-
-    if config.model_provider == "ollama":
-        return (
-            OllamaChatModel(model_name=config.ollama_model_name),
-            OllamaMultiAgentFormatter(),
+            create_formatter("openai"),
         )
 
-    raise ValueError(f"不支持的模型提供商: {config.model_provider}")
+    # dashscope / ollama 使用全局配置；不支持的提供商由工厂抛出 ValueError
+    return create_chat_model(routed=True), create_formatter()
 
 
 def create_analysis_agent(name: str, sys_prompt: str) -> ReActAgent:
@@ -297,7 +284,8 @@ async def ask_for_schema(agent: ReActAgent, user_prompt: str, schema: type[T], *
 
         msg = Msg("User", user_prompt + suffix, role="user")
         try:
-            resp = await agent(msg)
+            with decision_kind("analysis"):
+                resp = await agent(msg)
             raw = _normalize_model_output(resp)
         except Exception as exc:
             last_err = f"agent 调用异常: {exc}"
@@ -10,7 +10,7 @@ from typing import Any
 
 
 _ROLE_RE = re.compile(r"^\s*-\s*(Player\d+)(?:\s*\(.*?\))?\s*:\s*(\w+)\s*$")
-_GAME_ID_RE = re.compile(r"^\s*游戏ID\s*:\s*([0-9_]+)\s*$")
+_GAME_ID_RE = re.compile(r"^\s*游戏ID\s*:\s*(\w+)\s*$")
 _EVENT_HEADER_RE = re.compile(
     r"^\[(\d{2}:\d{2}:\d{2})\]\s*(.*?)\s*\|\s*(Player\d+)\s*$")
 
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""引擎性能基准：用零延迟的模拟模型驱动完整对局，测量引擎自身的开销。
+
+模型固定为 MODEL_PROVIDER=mock 且不加延迟，测得的时间全部来自引擎
+（提示词拼装、消息广播、结构化校验、日志写入等）。报告内容：
+
+- 吞吐：每秒对局数、每秒模型调用数
+- 各阶段（准备 / 夜晚 / 白天 / 反思 / 收尾）的 CPU 时间
+- 进程峰值 RSS
+- 每回合的内存分配（tracemalloc，单独运行几局以免拖慢计时）
+- 热点函数耗时：_format_impression_context、_extract_msg_fields、
+  GameLogger 各方法与 MsgHub.broadcast
+
+结果写为 JSON，便于在不同提交之间比较：
+
+    python backend/benchmark.py --games 20 --alloc-games 1
+    python backend/benchmark.py --games 20 --set REFLECTION_MODE=separate --out a.json
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from agentscope.pipeline import MsgHub
+
+from config import config
+from core import game_engine
+from core.game_logger import GameLogger
+from core.http_pool import close_http_clients
+from tournament import run_game
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# 基准运行固定使用的配置：零延迟模拟模型，不做跨进程限流与赛后分析
+_BENCHMARK_CONFIG = {
+    "MODEL_PROVIDER": "mock",
+    "MOCK_LATENCY": "0",
+    "MOCK_LATENCY_JITTER": "0",
+    "RATE_GOVERNOR_ENABLED": "false",
+    "AUTO_ANALYZE": "false",
+}
+
+_IGNORE_TRACEMALLOC = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the WolfMind engine")
+    p.add_argument("--games", type=int, default=10,
+                   help="Timed games (run one after another)")
+    p.add_argument("--alloc-games", type=int, default=1,
+                   help="Extra games run under tracemalloc (0 to skip)")
+    p.add_argument("--seed", type=int, default=0,
+                   help="MOCK_SEED, and base game seed (game i uses seed + i)")
+    p.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                   help="Extra config override for every game")
+    p.add_argument("--out", default=None, help="Output JSON path")
+    p.add_argument("--verbose", action="store_true",
+                   help="Keep the game's console output")
+    return p.parse_args()
+
+
+class _Timings:
+    """按标签累计调用次数、墙钟时间与 CPU 时间。"""
+
+    def __init__(self) -> None:
+        self.calls: dict[str, int] = defaultdict(int)
+        self.wall: dict[str, float] = defaultdict(float)
+        self.cpu: dict[str, float] = defaultdict(float)
+
+    def add(self, label: str, wall: float, cpu: float) -> None:
+        self.calls[label] += 1
+        self.wall[label] += wall
+        self.cpu[label] += cpu
+
+    def report(self) -> dict[str, dict[str, float]]:
+        return {
+            label: {
+                "calls": self.calls[label],
+                "wall_sec": round(self.wall[label], 6),
+                "cpu_sec": round(self.cpu[label], 6),
+                "mean_us": round(self.wall[label] / self.calls[label] * 1e6, 2),
+            }
+            for label in sorted(self.calls)
+        }
+
+
+class _PhaseClock:
+    """在阶段切换点之间累计进程 CPU 时间与墙钟时间。"""
+
+    def __init__(self) -> None:
+        self.cpu: dict[str, float] = defaultdict(float)
+        self.wall: dict[str, float] = defaultdict(float)
+        self.phase: str | None = None
+        self._cpu_mark = 0.0
+        self._wall_mark = 0.0
+
+    def switch(self, phase: str | None) -> str | None:
+        """切换到新阶段并返回原阶段；`None` 表示停止计时。"""
+        now_cpu, now_wall = time.process_time(), time.perf_counter()
+        if self.phase is not None:
+            self.cpu[self.phase] += now_cpu - self._cpu_mark
+            self.wall[self.phase] += now_wall - self._wall_mark
+        previous, self.phase = self.phase, phase
+        self._cpu_mark, self._wall_mark = now_cpu, now_wall
+        return previous
+
+
+class _AllocTracker:
+    """tracemalloc 开启时，按回合记录内存块与字节数的变化。"""
+
+    def __init__(self) -> None:
+        self.rounds: list[dict[str, Any]] = []
+        self.game: int | None = None
+        self._round: int | None = None
+        self._start: tuple[int, int] = (0, 0)
+
+    @staticmethod
+    def _sample() -> tuple[int, int]:
+        current, _ = tracemalloc.get_traced_memory()
+        return current, len(tracemalloc.take_snapshot().traces)
+
+    def start_round(self, round_num: int) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        self.end_round()
+        self._round = round_num
+        tracemalloc.reset_peak()
+        self._start = self._sample()
+
+    def end_round(self) -> None:
+        if self._round is None or not tracemalloc.is_tracing():
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        current, blocks = self._sample()
+        self.rounds.append({
+            "game": self.game,
+            "round": self._round,
+            "net_blocks": blocks - self._start[1],
+            "net_kib": round((current - self._start[0]) / 1024, 1),
+            "peak_kib": round((peak - self._start[0]) / 1024, 1),
+        })
+        self._round = None
+
+
+class _Probe:
+    """给引擎热点函数与阶段切换点打桩；退出时恢复原函数。"""
+
+    HOTSPOTS = ("_format_impression_context", "_extract_msg_fields")
+
+    def __init__(self) -> None:
+        self.timings = _Timings()
+        self.phases = _PhaseClock()
+        self.allocs = _AllocTracker()
+
+    def _timed(self, label: str, fn: Callable, before: Callable | None = None):
+        timings = self.timings
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if before:
+                before(*args, **kwargs)
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.add(label, time.perf_counter() - wall,
+                            time.thread_time() - cpu)
+        return wrapper
+
+    def _timed_async(self, label: str, fn: Callable):
+        timings = self.timings
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # 等待期间事件循环可能切到其他协程，CPU 时间仅供参考
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                timings.add(label, time.perf_counter() - wall,
+                            time.thread_time() - cpu)
+        return wrapper
+
+    def _reflection(self, fn: Callable):
+        phases = self.phases
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            previous = phases.switch("reflection")
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                phases.switch(previous)
+        return wrapper
+
+    @contextlib.contextmanager
+    def install(self) -> Iterator[None]:
+        # 阶段切换点：GameLogger 的回合/昼夜标记与反思阶段
+        hooks = {
+            "start_round": lambda _self, round_num: (
+                self.allocs.start_round(round_num)),
+            "start_night": lambda _self: self.phases.switch("night"),
+            "start_day": lambda _self: self.phases.switch("day"),
+            "close": lambda _self, *a, **k: (
+                self.allocs.end_round(), self.phases.switch("teardown")),
+        }
+        patches: list[tuple[Any, str, Any]] = [
+            (game_engine, name, self._timed(name, getattr(game_engine, name)))
+            for name in self.HOTSPOTS
+        ]
+        patches.append((game_engine, "_reflection_phase",
+                        self._reflection(game_engine._reflection_phase)))
+        patches.append((MsgHub, "broadcast",
+                        self._timed_async("MsgHub.broadcast", MsgHub.broadcast)))
+        for name, fn in vars(GameLogger).items():
+            # 私有辅助方法只在公开方法内部调用，不单独计时以免重复累计
+            if callable(fn) and (not name.startswith("_") or name == "__init__"):
+                patches.append((GameLogger, name, self._timed(
+                    f"GameLogger.{name}", fn, hooks.get(name))))
+
+        originals = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+        try:
+            for obj, name, patched in patches:
+                setattr(obj, name, patched)
+            yield
+        finally:
+            for obj, name, original in originals:
+                setattr(obj, name, original)
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KiB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _play(
+    probe: _Probe,
+    index: int,
+    benchmark_id: str,
+    seed: int,
+    verbose: bool,
+) -> dict[str, Any]:
+    """运行一局并记录墙钟与 CPU 时间。"""
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    probe.phases.switch("setup")
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(
+                stack.enter_context(open(os.devnull, "w", encoding="utf-8"))))
+        result = await run_game(
+            index, benchmark_id, asyncio.Semaphore(1), None, seed=seed + index)
+    probe.phases.switch(None)
+    return {
+        "index": index,
+        "wall_sec": round(time.perf_counter() - wall, 4),
+        "cpu_sec": round(time.process_time() - cpu, 4),
+        "rounds": result.get("rounds"),
+        "winner": result.get("winner"),
+        "model_calls": result.get("token_usage", {}).get("calls", 0),
+        "error": result.get("error"),
+    }
+
+
+async def run_benchmark(
+    n_games: int,
+    alloc_games: int,
+    seed: int,
+    verbose: bool = False,
+) -> dict[str, Any]:
+    """依次运行计时对局与内存分配对局，返回基准报告。"""
+
+    benchmark_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    timed = _Probe()
+    with timed.install():
+        wall = time.perf_counter()
+        games = [
+            await _play(timed, idx, benchmark_id, seed, verbose)
+            for idx in range(1, n_games + 1)
+        ]
+        wall = time.perf_counter() - wall
+
+    allocs = _Probe()
+    top_sites: list[dict[str, Any]] = []
+    if alloc_games:
+        tracemalloc.start()
+        try:
+            with allocs.install():
+                baseline = tracemalloc.take_snapshot()
+                for offset in range(1, alloc_games + 1):
+                    allocs.allocs.game = n_games + offset
+                    await _play(
+                        allocs, n_games + offset, benchmark_id, seed, verbose)
+                final = tracemalloc.take_snapshot()
+            top_sites = [
+                {"site": str(stat.traceback), "size_kib": round(stat.size_diff / 1024, 1),
+                 "blocks": stat.count_diff}
+                for stat in final.filter_traces(_IGNORE_TRACEMALLOC).compare_to(
+                    baseline.filter_traces(_IGNORE_TRACEMALLOC), "lineno")[:10]
+            ]
+        finally:
+            tracemalloc.stop()
+
+    finished = [g for g in games if not g["error"]]
+    calls = sum(g["model_calls"] for g in games)
+    rounds = allocs.allocs.rounds
+    return {
+        "benchmark_id": benchmark_id,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "games": n_games,
+        "completed": len(finished),
+        "errors": len(games) - len(finished),
+        "wall_sec": round(wall, 4),
+        "games_per_sec": round(n_games / wall, 4) if wall else None,
+        "model_calls_per_sec": round(calls / wall, 2) if wall else None,
+        "cpu_sec_per_game": round(
+            statistics.mean(g["cpu_sec"] for g in games), 4) if games else 0,
+        "wall_sec_per_game_p50": round(
+            statistics.median(g["wall_sec"] for g in games), 4) if games else 0,
+        "phases": {
+            phase: {
+                "cpu_sec": round(cpu, 4),
+                "wall_sec": round(timed.phases.wall[phase], 4),
+                "cpu_sec_per_game": round(cpu / n_games, 4),
+            }
+            for phase, cpu in timed.phases.cpu.items()
+        },
+        "hotspots": timed.timings.report(),
+        "game_logger_wall_sec": round(sum(
+            wall for label, wall in timed.timings.wall.items()
+            if label.startswith("GameLogger.")), 6),
+        "peak_rss_mb": _peak_rss_mb(),
+        "allocations": {
+            "games": alloc_games,
+            "per_round_mean": {
+                key: round(statistics.mean(r[key] for r in rounds), 1)
+                for key in ("net_blocks", "net_kib", "peak_kib")
+            } if rounds else {},
+            "rounds": rounds,
+            "top_sites": top_sites,
+        },
+        "per_game": games,
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f"对局: {report['completed']}/{report['games']}，"
+          f"{report['games_per_sec']} 局/秒，"
+          f"{report['model_calls_per_sec']} 次调用/秒，"
+          f"峰值 RSS {report['peak_rss_mb']} MB")
+    for phase, stats in report["phases"].items():
+        print(f"  阶段 {phase:<10} CPU {stats['cpu_sec_per_game']:.4f}s/局")
+    hotspots = sorted(
+        report["hotspots"].items(), key=lambda item: -item[1]["wall_sec"])
+    for label, stats in hotspots[:10]:
+        print(f"  {label:<40} {stats['calls']:>7} 次 {stats['wall_sec']:.4f}s")
+    print(f"  GameLogger 合计 {report['game_logger_wall_sec']:.4f}s")
+    per_round = report["allocations"]["per_round_mean"]
+    if per_round:
+        print(f"  每回合内存: 新增 {per_round['net_blocks']} 块 / "
+              f"{per_round['net_kib']} KiB，峰值 {per_round['peak_kib']} KiB")
+
+
+async def main() -> None:
+    args = _parse_args()
+    overrides = {**dict(item.split("=", 1) for item in args.set),
+                 **_BENCHMARK_CONFIG, "MOCK_SEED": str(args.seed)}
+
+    with tempfile.TemporaryDirectory() as scratch, config.overrides({
+        # 日志与经验文件写到临时目录，不污染正式数据
+        "LOG_DIR": scratch, "EXPERIENCE_DIR": scratch, **overrides,
+    }):
+        try:
+            report = await run_benchmark(
+                args.games, args.alloc_games, args.seed, verbose=args.verbose)
+        finally:
+            await close_http_clients()
+    report["config"] = overrides
+
+    out = Path(args.out) if args.out else (
+        Path(config.benchmark_dir) / f"benchmark_{report['benchmark_id']}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    _print_report(report)
+    print(f"\n✓ 基准结果已保存: {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
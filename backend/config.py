@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """配置管理模块 - 从 .env 文件读取配置"""
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 
@@ -40,6 +42,16 @@ class Config:
         """从 .env 数据中获取配置，优先 .env 而非系统环境变量"""
         return self._env.get(key, default)
 
+    @contextmanager
+    def overrides(self, values: dict[str, str]) -> Iterator[None]:
+        """临时覆盖配置项（如作业队列下发的单局配置），退出时恢复原值。"""
+        saved = dict(self._env)
+        self._env.update({key: str(value) for key, value in values.items()})
+        try:
+            yield
+        finally:
+            self._env = saved
+
     # ==================== API 配置 ====================
 
     @property
@@ -125,6 +137,38 @@ class Config:
 
         return [self._get_player_override("OPENAI_MODEL_NAME", i) or "" for i in range(1, 10)]
 
+    @property
+    def openai_pool(self) -> list[dict]:
+        """OpenAI 端点池成员列表（OPENAI_POOL_*_1..N，按序号连续读取）。
+
+        每个成员必须有 OPENAI_POOL_API_KEY_i；BASE_URL / MODEL_NAME 缺省时
+        使用全局配置，WEIGHT 默认 1，RPM（每分钟请求配额）默认 0 表示不限。
+        """
+
+        members: list[dict] = []
+        idx = 1
+        while self._get(f"OPENAI_POOL_API_KEY_{idx}"):
+            members.append({
+                "api_key": self._get(f"OPENAI_POOL_API_KEY_{idx}"),
+                "base_url": self._get(f"OPENAI_POOL_BASE_URL_{idx}") or self.openai_base_url,
+                "model_name": self._get(f"OPENAI_POOL_MODEL_NAME_{idx}") or self.openai_model_name,
+                "weight": float(self._get(f"OPENAI_POOL_WEIGHT_{idx}", "1")),
+                "rpm": int(self._get(f"OPENAI_POOL_RPM_{idx}", "0")),
+            })
+            idx += 1
+        return members
+
+    @property
+    def openai_pool_strategy(self) -> str:
+        """端点池路由策略: least_outstanding（默认）或 weighted"""
+        return (self._get("OPENAI_POOL_STRATEGY", "least_outstanding")
+                or "least_outstanding").lower()
+
+    @property
+    def openai_pool_cooldown(self) -> float:
+        """端点池成员收到 429 后暂停接收请求的秒数"""
+        return float(self._get("OPENAI_POOL_COOLDOWN", "10"))
+
     @property
     def openai_player_configs(self) -> list[dict[str, str]]:
         """组合每位玩家的 OpenAI 配置。
@@ -133,6 +177,7 @@ class Config:
         - 若 OPENAI_PLAYER_MODE=single，则忽略玩家级字段，9 人共用全局 OPENAI_*。
         - 若 OPENAI_PLAYER_MODE=per-player：
             * 需为 9 个玩家全部提供 API_KEY/Base_URL/Model 的独立字段；缺失即报错。
+        - 若 OPENAI_PLAYER_MODE=pool，则所有玩家按调用从端点池（OPENAI_POOL_*）中分流。
         """
 
         keys = self.openai_player_api_keys
@@ -141,8 +186,8 @@ class Config:
 
         mode = self.openai_player_mode
 
-        if mode not in {"single", "per-player"}:
-            raise ValueError("OPENAI_PLAYER_MODE 仅支持 single 或 per-player")
+        if mode not in {"single", "per-player", "pool"}:
+            raise ValueError("OPENAI_PLAYER_MODE 仅支持 single、per-player 或 pool")
 
         # single: 全部使用全局配置
         if mode == "single":
@@ -153,6 +198,20 @@ class Config:
             }
             return [shared] * 9
 
+        # pool: 所有玩家共用端点池，这里以第一个成员作为代表配置
+        if mode == "pool":
+            pool = self.openai_pool
+            if not pool:
+                raise ValueError(
+                    "OPENAI_PLAYER_MODE=pool 需要至少配置 OPENAI_POOL_API_KEY_1")
+            first = pool[0]
+            shared = {
+                "api_key": first["api_key"],
+                "base_url": first["base_url"],
+                "model_name": first["model_name"],
+            }
+            return [shared] * 9
+
         # per-player: 每人必须有完整三元组
         configs: list[dict[str, str]] = []
         for idx in range(9):
@@ -179,13 +238,324 @@ class Config:
         """Ollama Model Name"""
         return self._get("OLLAMA_MODEL_NAME", "qwen2.5:1.5b")
 
+    @property
+    def ollama_host(self) -> Optional[str]:
+        """Ollama 服务地址，未设置时使用 ollama 客户端默认值"""
+        return self._get("OLLAMA_HOST")
+
+    @property
+    def ollama_keep_alive(self) -> str:
+        """Ollama 模型在内存中的保留时长（如 30m、1h）"""
+        return self._get("OLLAMA_KEEP_ALIVE", "30m")
+
+    @property
+    def mock_seed(self) -> int:
+        """模拟模型（MODEL_PROVIDER=mock）的随机种子"""
+        return int(self._get("MOCK_SEED", "0"))
+
+    @property
+    def mock_latency(self) -> float:
+        """模拟模型每次调用的平均延迟（秒），0 表示立即返回"""
+        return float(self._get("MOCK_LATENCY", "0"))
+
+    @property
+    def mock_latency_jitter(self) -> float:
+        """模拟延迟的抖动（秒）：正态/对数正态分布的标准差，均匀分布的半宽"""
+        return float(self._get("MOCK_LATENCY_JITTER", "0"))
+
+    @property
+    def mock_latency_distribution(self) -> str:
+        """模拟延迟的分布: fixed, uniform, normal, exponential, lognormal"""
+        return self._get("MOCK_LATENCY_DISTRIBUTION", "fixed").lower()
+
     # ==================== 模型选择 ====================
 
     @property
     def model_provider(self) -> str:
-        """模型提供商: dashscope, openai, ollama"""
+        """模型提供商: dashscope, openai, ollama, mock（离线模拟）"""
         return self._get("MODEL_PROVIDER", "dashscope").lower()
 
+    # ==================== 限流配置 ====================
+
+    # 各提供商的默认限流参数：云端提供商默认不限速，并发上限足以让 9 名玩家
+    # 同时投票/反思，主要依靠 429 时的并发退避；本地 Ollama 与模拟模型不限制
+    _RATE_LIMIT_DEFAULTS = {
+        "dashscope": {"rps": 0.0, "max_concurrency": 16},
+        "openai": {"rps": 0.0, "max_concurrency": 16},
+        "ollama": {"rps": 0.0, "max_concurrency": 0},
+        "mock": {"rps": 0.0, "max_concurrency": 0},
+    }
+
+    @property
+    def rate_limit_enabled(self) -> bool:
+        """是否启用模型调用限流"""
+        return self._get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+    def rate_limit_settings(self, provider: str) -> dict[str, float]:
+        """返回指定提供商的限流参数。
+
+        优先读取 RATE_LIMIT_RPS_<PROVIDER> 等提供商级字段，其次读取全局
+        RATE_LIMIT_RPS / RATE_LIMIT_MAX_CONCURRENCY，最后使用内置默认值。
+        取值为 0 表示不限制。
+        """
+
+        defaults = self._RATE_LIMIT_DEFAULTS.get(
+            provider, {"rps": 0.0, "max_concurrency": 0})
+        suffix = provider.upper()
+
+        def _pick(key: str, default: float) -> float:
+            raw = self._get(f"{key}_{suffix}") or self._get(key)
+            return float(raw) if raw else default
+
+        return {
+            "rps": _pick("RATE_LIMIT_RPS", defaults["rps"]),
+            "burst": _pick("RATE_LIMIT_BURST", 3.0),
+            "max_concurrency": _pick(
+                "RATE_LIMIT_MAX_CONCURRENCY", defaults["max_concurrency"]),
+            "latency_spike_factor": _pick("RATE_LIMIT_LATENCY_SPIKE", 3.0),
+        }
+
+    @property
+    def rate_governor_enabled(self) -> bool:
+        """是否启用跨进程限流（多个对局/分析进程共享同一令牌桶）"""
+        return self._get("RATE_GOVERNOR_ENABLED", "false").lower() == "true"
+
+    @property
+    def rate_governor_dir(self) -> str:
+        """跨进程令牌桶状态文件目录（同一目录下的进程共享配额）"""
+        return str(self._resolve_path(
+            self._get("RATE_GOVERNOR_DIR", "data/rate_governor")))
+
+    # 跨进程限流的默认每秒请求数；本地 Ollama 与模拟模型默认不限制
+    _RATE_GOVERNOR_RPS_DEFAULTS = {
+        "dashscope": 5.0,
+        "openai": 5.0,
+    }
+
+    def rate_governor_settings(self, provider: str) -> dict[str, float]:
+        """跨进程限流参数：所有进程合计的每秒请求数、突发容量与每分钟 token 数。
+
+        与 rate_limit_settings 相同，可用 RATE_GOVERNOR_RPS_<PROVIDER> 等字段
+        按提供商覆盖；RPS 与 TPM 为 0 表示不限制，两者都为 0 时不接入。
+        """
+        suffix = provider.upper()
+
+        def _pick(key: str, default: float) -> float:
+            raw = self._get(f"{key}_{suffix}") or self._get(key)
+            return float(raw) if raw else default
+
+        return {
+            "rps": _pick(
+                "RATE_GOVERNOR_RPS", self._RATE_GOVERNOR_RPS_DEFAULTS.get(provider, 0.0)),
+            "burst": _pick("RATE_GOVERNOR_BURST", 5.0),
+            "tpm": _pick("RATE_GOVERNOR_TPM", 0.0),
+        }
+
+    @property
+    def background_decision_kinds(self) -> set[str]:
+        """以后台优先级排队的决策类型，只使用关键路径剩余的并发槽位"""
+        raw = self._get(
+            "RATE_LIMIT_BACKGROUND_KINDS", "reflection,knowledge,summary,analysis")
+        return {kind.strip().lower() for kind in (raw or "").split(",") if kind.strip()}
+
+    @property
+    def rate_limit_critical_reserve(self) -> int:
+        """为关键路径请求保留的并发槽位数（后台请求不可占用）"""
+        return int(self._get("RATE_LIMIT_CRITICAL_RESERVE", "1"))
+
+    # ==================== 请求对冲配置 ====================
+
+    @property
+    def hedge_enabled(self) -> bool:
+        """是否在并行阶段（投票、PK 投票、反思）对慢请求发起对冲"""
+        return self._get("HEDGE_ENABLED", "false").lower() == "true"
+
+    @property
+    def hedge_percentile(self) -> float:
+        """触发对冲的延迟分位数（0~1），基于最近调用的滚动窗口"""
+        percentile = float(self._get("HEDGE_PERCENTILE", "0.9"))
+        if not 0 < percentile < 1:
+            raise ValueError("HEDGE_PERCENTILE 必须在 (0, 1) 范围内")
+        return percentile
+
+    @property
+    def hedge_min_delay(self) -> float:
+        """发起对冲前的最短等待秒数，避免对本就很快的调用重复请求"""
+        return float(self._get("HEDGE_MIN_DELAY", "2.0"))
+
+    @property
+    def hedge_window(self) -> int:
+        """延迟滚动窗口大小"""
+        return int(self._get("HEDGE_WINDOW", "50"))
+
+    @property
+    def hedge_min_samples(self) -> int:
+        """窗口内样本不足该数量时不触发对冲"""
+        return int(self._get("HEDGE_MIN_SAMPLES", "8"))
+
+    @property
+    def hedge_to_fallback(self) -> bool:
+        """对冲请求是否发往 FALLBACK_* 备用端点（未配置备用端点时仍发往原模型）"""
+        return self._get("HEDGE_TO_FALLBACK", "false").lower() == "true"
+
+    # ==================== 录制/回放配置 ====================
+
+    @property
+    def replay_mode(self) -> str:
+        """模型响应录制/回放模式: off, record, replay"""
+        mode = self._get("REPLAY_MODE", "off").lower()
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"REPLAY_MODE 不支持: {mode}")
+        return mode
+
+    @property
+    def replay_dir(self) -> str:
+        """录制的模型响应存储目录"""
+        return str(self._resolve_path(self._get("REPLAY_DIR", "data/replay")))
+
+    @property
+    def replay_fallthrough(self) -> bool:
+        """回放未命中时是否改为调用真实模型（并补录），否则报错"""
+        return self._get("REPLAY_FALLTHROUGH", "false").lower() == "true"
+
+    # ==================== 连接池配置 ====================
+
+    @property
+    def http_pool_enabled(self) -> bool:
+        """同一 OpenAI 兼容端点的玩家是否共享 HTTP 连接池"""
+        return self._get("HTTP_POOL_ENABLED", "true").lower() == "true"
+
+    @property
+    def http_pool_max_connections(self) -> int:
+        """每个端点的最大连接数"""
+        return int(self._get("HTTP_POOL_MAX_CONNECTIONS", "20"))
+
+    @property
+    def http_pool_max_keepalive(self) -> int:
+        """每个端点保持的最大空闲长连接数"""
+        return int(self._get("HTTP_POOL_MAX_KEEPALIVE", "10"))
+
+    @property
+    def http_keepalive_expiry(self) -> float:
+        """空闲长连接的保活秒数"""
+        return float(self._get("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+    @property
+    def http2_enabled(self) -> bool:
+        """是否尝试使用 HTTP/2（需安装 h2，未安装时自动使用 HTTP/1.1）"""
+        return self._get("HTTP2_ENABLED", "true").lower() == "true"
+
+    # ==================== 预热配置 ====================
+
+    @property
+    def warmup_enabled(self) -> bool:
+        """是否在分配角色时并行预热模型端点"""
+        return self._get("WARMUP_ENABLED", "true").lower() == "true"
+
+    @property
+    def warmup_timeout(self) -> float:
+        """第一夜开始前最多等待预热的秒数"""
+        return float(self._get("WARMUP_TIMEOUT", "20"))
+
+    @property
+    def warmup_connections(self) -> int:
+        """每个 OpenAI 兼容端点预先建立的连接数"""
+        return int(self._get("WARMUP_CONNECTIONS", "4"))
+
+    # ==================== 容错配置 ====================
+
+    @property
+    def retry_enabled(self) -> bool:
+        """是否启用模型调用的重试与熔断"""
+        return self._get("RETRY_ENABLED", "true").lower() == "true"
+
+    @property
+    def retry_max_attempts(self) -> int:
+        """单次调用的最大重试次数（不含首次请求）"""
+        return int(self._get("RETRY_MAX_ATTEMPTS", "3"))
+
+    @property
+    def retry_base_delay(self) -> float:
+        """指数退避的基础等待秒数"""
+        return float(self._get("RETRY_BASE_DELAY", "1.0"))
+
+    @property
+    def retry_max_delay(self) -> float:
+        """指数退避的最大等待秒数"""
+        return float(self._get("RETRY_MAX_DELAY", "20"))
+
+    @property
+    def retry_budget_ratio(self) -> float:
+        """重试预算：重试请求量占正常请求量的最大比例"""
+        return float(self._get("RETRY_BUDGET_RATIO", "0.2"))
+
+    @property
+    def circuit_failure_threshold(self) -> int:
+        """端点连续失败多少次后熔断"""
+        return int(self._get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+
+    @property
+    def circuit_recovery_time(self) -> float:
+        """熔断后多少秒放行一次探测请求"""
+        return float(self._get("CIRCUIT_RECOVERY_TIME", "30"))
+
+    @property
+    def fallback_model_config(self) -> Optional[dict[str, str]]:
+        """备用端点配置；未设置 FALLBACK_MODEL_NAME 时返回 None。
+
+        备用提供商默认与 MODEL_PROVIDER 相同，消息格式需与主提供商兼容。
+        """
+        model_name = self._get("FALLBACK_MODEL_NAME")
+        if not model_name:
+            return None
+        return {
+            "provider": (self._get("FALLBACK_PROVIDER") or self.model_provider).lower(),
+            "model_name": model_name,
+            "api_key": self._get("FALLBACK_API_KEY"),
+            "base_url": self._get("FALLBACK_BASE_URL"),
+        }
+
+    # ==================== 模型路由配置 ====================
+
+    @property
+    def model_routes(self) -> dict[str, str]:
+        """决策类型到模型档位的路由表（MODEL_ROUTES=kind:tier,...）。
+
+        未出现在路由表中的决策类型使用玩家自身的模型。
+        """
+        raw = self._get("MODEL_ROUTES", "") or ""
+        routes: dict[str, str] = {}
+        for item in raw.split(","):
+            if not item.strip():
+                continue
+            kind, sep, tier = item.partition(":")
+            if not sep or not kind.strip() or not tier.strip():
+                raise ValueError(f"MODEL_ROUTES 格式错误: {item.strip()}（应为 kind:tier）")
+            routes[kind.strip().lower()] = tier.strip().lower()
+        for tier in set(routes.values()):
+            if self.model_tier(tier) is None:
+                raise ValueError(
+                    f"MODEL_ROUTES 引用了未定义的档位 {tier}，"
+                    f"请设置 MODEL_TIER_{tier.upper()}_MODEL_NAME"
+                )
+        return routes
+
+    def model_tier(self, tier: str) -> Optional[dict[str, str]]:
+        """模型档位配置（MODEL_TIER_<TIER>_*）；未设置 MODEL_NAME 时返回 None。
+
+        档位沿用玩家的提供商与格式化器，只替换模型名，以及可选的
+        Key / Base URL（如指向本地 Ollama 或 vLLM 的 OpenAI 兼容接口）。
+        """
+        prefix = f"MODEL_TIER_{tier.upper()}"
+        model_name = self._get(f"{prefix}_MODEL_NAME")
+        if not model_name:
+            return None
+        return {
+            "model_name": model_name,
+            "api_key": self._get(f"{prefix}_API_KEY"),
+            "base_url": self._get(f"{prefix}_BASE_URL"),
+        }
+
     # ==================== 游戏配置 ====================
 
     @property
@@ -193,11 +563,61 @@ class Config:
         """最大游戏轮数"""
         return int(self._get("MAX_GAME_ROUND", "30"))
 
+    @property
+    def game_seed(self) -> Optional[int]:
+        """对局随机种子（座位与角色分配），未设置时每局随机生成"""
+        raw = self._get("GAME_SEED")
+        return int(raw) if raw else None
+
     @property
     def max_discussion_round(self) -> int:
         """每个狼人的最大讨论轮数"""
         return int(self._get("MAX_DISCUSSION_ROUND", "3"))
 
+    @property
+    def wolf_discussion_quorum(self) -> float:
+        """狼人讨论提前结束所需的一致比例（0~1，1 表示全员提议同一目标）"""
+        quorum = float(self._get("WOLF_DISCUSSION_QUORUM", "1.0"))
+        if not 0 < quorum <= 1:
+            raise ValueError("WOLF_DISCUSSION_QUORUM 必须在 (0, 1] 范围内")
+        return quorum
+
+    @property
+    def reflection_mode(self) -> str:
+        """回合反思模式: separate（分两次调用，默认）或 combined（单次调用输出印象与经验）"""
+        mode = (self._get("REFLECTION_MODE", "separate") or "separate").lower()
+        if mode not in {"combined", "separate"}:
+            raise ValueError("REFLECTION_MODE 仅支持 combined 或 separate")
+        return mode
+
+    @property
+    def reflection_pipeline(self) -> bool:
+        """是否让回合反思在后台进行并与下一回合夜晚重叠（流水线模式）"""
+        return self._get("REFLECTION_PIPELINE", "false").lower() == "true"
+
+    @property
+    def witch_combined_decision(self) -> bool:
+        """女巫是否用一次调用同时决定解药与毒药（默认分两次询问）"""
+        return self._get("WITCH_COMBINED_DECISION", "false").lower() == "true"
+
+    def decision_timeout(self, kind: str) -> float:
+        """某类决策的超时秒数，0 表示不限制。
+
+        优先读取 DECISION_TIMEOUT_<KIND>（如 DECISION_TIMEOUT_VOTE），其次读取
+        全局 DECISION_TIMEOUT，默认不限制。
+        """
+        raw = self._get(f"DECISION_TIMEOUT_{kind.upper()}") or self._get(
+            "DECISION_TIMEOUT")
+        return float(raw) if raw else 0.0
+
+    @property
+    def decision_mode(self) -> str:
+        """结构化决策方式: react（ReAct 工具循环）或 direct（单次调用 + 本地校验）"""
+        mode = (self._get("DECISION_MODE", "react") or "react").lower()
+        if mode not in {"react", "direct"}:
+            raise ValueError("DECISION_MODE 仅支持 react 或 direct")
+        return mode
+
     # ==================== AgentScope Studio 配置 ====================
 
     @property
@@ -242,6 +662,44 @@ class Config:
         raw_path = self._get("LOG_DIR", "data/game_logs")
         return str(self._resolve_path(raw_path))
 
+    @property
+    def tournament_dir(self) -> str:
+        """锦标赛结果清单目录。"""
+        raw_path = self._get("TOURNAMENT_DIR", "data/tournaments")
+        return str(self._resolve_path(raw_path))
+
+    @property
+    def benchmark_dir(self) -> str:
+        """引擎性能基准结果目录。"""
+        raw_path = self._get("BENCHMARK_DIR", "data/benchmarks")
+        return str(self._resolve_path(raw_path))
+
+    @property
+    def tournament_concurrency(self) -> int:
+        """锦标赛同时进行的对局数上限"""
+        return int(self._get("TOURNAMENT_CONCURRENCY", "2"))
+
+    @property
+    def job_queue_path(self) -> str:
+        """分布式锦标赛作业队列（SQLite 文件），多机运行时应放在共享存储上。"""
+        raw_path = self._get("JOB_QUEUE_PATH", "data/tournaments/job_queue.sqlite3")
+        return str(self._resolve_path(raw_path))
+
+    @property
+    def job_lease_seconds(self) -> float:
+        """作业租约时长（秒），工作进程运行期间每 1/3 租约续约一次"""
+        return float(self._get("JOB_LEASE_SECONDS", "300"))
+
+    @property
+    def job_max_attempts(self) -> int:
+        """单个作业的最大尝试次数，超过后标记为失败"""
+        return int(self._get("JOB_MAX_ATTEMPTS", "3"))
+
+    @property
+    def tournament_workers(self) -> int:
+        """锦标赛分片使用的子进程数（1 表示在当前进程内运行）"""
+        return int(self._get("TOURNAMENT_WORKERS", "1"))
+
     def _resolve_path(self, raw_path: str) -> Path:
         """将相对路径解析为仓库根目录下的绝对路径。"""
         path = Path(raw_path)
@@ -275,9 +733,20 @@ class Config:
         elif self.model_provider == "ollama":
             # Ollama 不需要 API Key
             pass
+        elif self.model_provider == "mock":
+            if self.mock_latency_distribution not in (
+                "fixed", "uniform", "normal", "exponential", "lognormal",
+            ):
+                return False, (
+                    f"MOCK_LATENCY_DISTRIBUTION 不支持: {self.mock_latency_distribution}")
         else:
             return False, f"未知的模型提供商: {self.model_provider}"
 
+        try:
+            self.replay_mode
+        except ValueError as exc:
+            return False, str(exc)
+
         # if self.game_language not in ["zh", "en"]:
         #     return False, f"不支持的语言: {self.game_language}"
 
@@ -303,6 +772,11 @@ class Config:
             print(f"OpenAI Base URL: {self.openai_base_url}")
             print(f"OpenAI Model: {self.openai_model_name}")
             print(f"OpenAI Player Mode: {self.openai_player_mode}")
+            if self.openai_player_mode == "pool":
+                print(
+                    f"OpenAI 端点池: {len(self.openai_pool)} 个成员，"
+                    f"策略 {self.openai_pool_strategy}"
+                )
             try:
                 player_cfgs = self.openai_player_configs
                 model_list = [cfg.get("model_name", "") for cfg in player_cfgs]
@@ -311,10 +785,66 @@ class Config:
                 print("OpenAI Player Models: 配置错误")
         elif self.model_provider == "ollama":
             print(f"Ollama Model: {self.ollama_model_name}")
+        elif self.model_provider == "mock":
+            print(
+                f"模拟模型: 种子 {self.mock_seed}，延迟 {self.mock_latency:g}s"
+                f" ± {self.mock_latency_jitter:g}s ({self.mock_latency_distribution})"
+            )
 
         # print(f"游戏语言: {self.game_language}")
         print(f"最大游戏轮数: {self.max_game_round}")
+        if self.game_seed is not None:
+            print(f"对局随机种子: {self.game_seed}")
         print(f"最大讨论轮数: {self.max_discussion_round}")
+        print(f"狼人讨论一致比例: {self.wolf_discussion_quorum}")
+        print(f"回合反思模式: {self.reflection_mode}"
+              f"{' (后台流水线)' if self.reflection_pipeline else ''}")
+        print(f"结构化决策方式: {self.decision_mode}")
+        timeout = self.decision_timeout("default")
+        print(f"决策超时: {f'{timeout:g}s' if timeout else '不限制'}")
+        if self.rate_limit_enabled:
+            limits = self.rate_limit_settings(self.model_provider)
+            print(
+                f"模型限流: {limits['rps']:g} req/s, "
+                f"最大并发 {int(limits['max_concurrency'])} (0 表示不限)"
+            )
+        else:
+            print("模型限流: 关闭")
+        if self.retry_enabled:
+            fallback = self.fallback_model_config
+            print(
+                f"重试与熔断: 最多重试 {self.retry_max_attempts} 次，"
+                f"备用端点 {fallback['model_name'] if fallback else '未配置'}"
+            )
+        if self.rate_governor_enabled:
+            governor = self.rate_governor_settings(self.model_provider)
+            print(
+                f"跨进程限流: 合计 {governor['rps']:g} req/s, "
+                f"{governor['tpm']:g} tokens/min (0 表示不限)"
+            )
+        if self.rate_limit_enabled and self.background_decision_kinds:
+            print(
+                "后台优先级决策: "
+                + ", ".join(sorted(self.background_decision_kinds))
+                + f"（保留 {self.rate_limit_critical_reserve} 个关键槽位）"
+            )
+        if self.model_routes:
+            print("模型路由: " + ", ".join(
+                f"{kind}→{tier}({self.model_tier(tier)['model_name']})"
+                for kind, tier in self.model_routes.items()
+            ))
+        if self.hedge_enabled:
+            print(
+                f"请求对冲: P{self.hedge_percentile * 100:g} 延迟后触发 "
+                f"(至少等待 {self.hedge_min_delay:g}s)"
+                f"{'，发往备用端点' if self.hedge_to_fallback and self.fallback_model_config else ''}"
+            )
+        if self.replay_mode != "off":
+            print(
+                f"模型响应{'录制' if self.replay_mode == 'record' else '回放'}: "
+                f"{self.replay_dir}"
+                f"{'（未命中时调用真实模型）' if self.replay_fallthrough else ''}"
+            )
         print(f"启用 Studio: {self.enable_studio}")
         print(f"自动数据分析: {self.auto_analyze}")
         print(f"经验存档目录: {self.experience_dir}")
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""端点池：多个 API Key / Base URL 之间按调用分流。
+
+`OPENAI_PLAYER_MODE=pool` 时，9 名玩家不再各自绑定一个 Key，而是每次调用
+都从共享的端点池中挑选成员：`least_outstanding` 选择在途请求数（按权重
+折算）最少的成员，`weighted` 按权重随机选择。每个成员可设置每分钟请求
+配额（RPM），配额用尽或刚收到 429 的成员会被暂时跳过，整体吞吐随 Key 的
+数量线性扩展。
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+from core.rate_limiter import is_rate_limit_error
+
+
+class PoolMember:
+    """端点池中的一个成员（一个 Key + Base URL + 模型）。"""
+
+    def __init__(
+        self,
+        label: str,
+        model: ChatModelBase,
+        weight: float = 1.0,
+        rpm: int = 0,
+    ) -> None:
+        self.label = label  # 脱敏后的标识，用于日志
+        self.model = model
+        self.weight = max(weight, 0.01)
+        self.rpm = max(rpm, 0)
+        self.outstanding = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.cooldown_until = 0.0
+        self._window: deque[float] = deque()
+
+    def wait_time(self, now: float) -> float:
+        """距离该成员可再次接收请求还需等待的秒数，0 表示立即可用。"""
+        wait = max(self.cooldown_until - now, 0.0)
+        if self.rpm:
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.rpm:
+                wait = max(wait, 60 - (now - self._window[0]))
+        return wait
+
+    def start_request(self, now: float) -> None:
+        self.outstanding += 1
+        self.requests += 1
+        self._window.append(now)
+
+
+class EndpointPool:
+    """按策略在多个成员之间分配请求，并跟踪每个成员的配额。"""
+
+    STRATEGIES = ("least_outstanding", "weighted")
+
+    def __init__(
+        self,
+        members: list[PoolMember],
+        strategy: str = "least_outstanding",
+        cooldown: float = 10.0,
+    ) -> None:
+        if not members:
+            raise ValueError("端点池至少需要一个成员")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"不支持的端点池策略: {strategy}")
+        self.members = members
+        self.strategy = strategy
+        self.cooldown = cooldown
+
+    async def acquire(self) -> PoolMember:
+        """挑选一个可用成员；全部不可用时等待最早恢复的成员。"""
+        while True:
+            now = time.monotonic()
+            ready = [m for m in self.members if m.wait_time(now) == 0]
+            if ready:
+                member = self._pick(ready)
+                member.start_request(now)
+                return member
+            await asyncio.sleep(min(m.wait_time(now) for m in self.members))
+
+    def release(self, member: PoolMember, error: BaseException | None = None) -> None:
+        member.outstanding = max(member.outstanding - 1, 0)
+        if error is not None and is_rate_limit_error(error):
+            # 收到 429 的成员暂时移出候选，请求会落到其他 Key 上
+            member.rate_limited += 1
+            member.cooldown_until = time.monotonic() + self.cooldown
+
+    def _pick(self, candidates: list[PoolMember]) -> PoolMember:
+        if self.strategy == "weighted":
+            return random.choices(
+                candidates, weights=[m.weight for m in candidates])[0]
+        return min(
+            candidates,
+            key=lambda m: (m.outstanding / m.weight, m.requests / m.weight),
+        )
+
+    def summary(self) -> str:
+        """返回各成员的请求量与限流次数摘要。"""
+        return "；".join(
+            f"{m.label} 请求 {m.requests} 次（429: {m.rate_limited}）"
+            for m in self.members
+        )
+
+
+_POOLS: dict[str, EndpointPool] = {}
+
+
+def get_endpoint_pool(
+    name: str,
+    build: Callable[[], EndpointPool],
+) -> EndpointPool:
+    """按名称获取共享端点池，不存在时调用 `build` 创建。"""
+    pool = _POOLS.get(name)
+    if pool is None:
+        pool = build()
+        _POOLS[name] = pool
+    return pool
+
+
+def reset_endpoint_pools() -> None:
+    """丢弃所有共享端点池，之后按当前配置重新创建。"""
+    _POOLS.clear()
+
+
+def pool_summaries() -> list[str]:
+    """返回所有端点池的摘要，便于写入游戏日志。"""
+    return [f"端点池 {name}: {pool.summary()}" for name, pool in _POOLS.items()]
+
+
+class PooledChatModel(ChatModelBase):
+    """每次调用都从端点池挑选成员的模型。"""
+
+    def __init__(self, pool: EndpointPool) -> None:
+        first = pool.members[0].model
+        super().__init__(first.model_name, first.stream)
+        self.pool = pool
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        member = await self.pool.acquire()
+        try:
+            res = await member.model(*args, **kwargs)
+        except BaseException as exc:
+            self.pool.release(member, exc)
+            raise
+
+        if isinstance(res, AsyncGenerator):
+            return self._stream_and_release(res, member)
+        self.pool.release(member)
+        return res
+
+    async def _stream_and_release(
+        self,
+        res: AsyncGenerator,
+        member: PoolMember,
+    ) -> AsyncGenerator:
+        error: BaseException | None = None
+        try:
+            async for chunk in res:
+                yield chunk
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self.pool.release(member, error)
@@ -3,6 +3,8 @@
 """基于 agentscope 实现的狼人杀游戏。"""
 import asyncio
 import re
+import time
+from collections import Counter
 from typing import Any
 from datetime import datetime
 from agentscope.message._message_base import Msg
@@ -21,13 +23,21 @@ from core.utils import (
 )
 from core.knowledge_base import PlayerKnowledgeStore
 from core.game_logger import GameLogger
+from core.endpoint_pool import pool_summaries
+from core.hedging import hedged_phase, new_hedge_stats
+from core.usage import new_usage_stats
+from core.rate_limiter import RequestPriority, new_queue_waits, request_priority
+from core.replay_cache import new_replay_stats
+from core.warmup import start_warmup, wait_for_warmup
 from models.schemas import (
     DiscussionModel,
     get_vote_model,
     ReflectionModel,
     KnowledgeUpdateModel,
+    RoundReflectionModel,
 )
 from models.roles import (
+    TIMED_OUT,
     RoleFactory,
     Werewolf,
     Villager,
@@ -108,6 +118,38 @@ def _format_impression_context(
     return "\n".join(parts)
 
 
+def _spawn(pending: set[asyncio.Task], coro: Any) -> asyncio.Task:
+    """创建后台任务并登记到 pending，结束后自动移除，便于异常时统一取消。"""
+    return _track(pending, asyncio.create_task(coro))
+
+
+def _track(pending: set[asyncio.Task], task: asyncio.Task | None) -> asyncio.Task | None:
+    """将已创建的后台任务登记到 pending。"""
+    if task is not None:
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    return task
+
+
+def _discussion_consensus(
+    proposals: dict[str, str | None],
+    n_werewolves: int,
+    quorum: float,
+) -> str | None:
+    """根据每名狼人最新的提议目标判断夜聊是否已达成一致。
+
+    只有当所有狼人都至少发言一次、且提议同一目标的人数占比达到 `quorum`
+    时返回该目标，否则返回 None。
+    """
+    if len(proposals) < n_werewolves:
+        return None
+    counts = Counter(t for t in proposals.values() if t)
+    if not counts:
+        return None
+    target, n_votes = counts.most_common(1)[0]
+    return target if n_votes >= quorum * n_werewolves else None
+
+
 def _attach_context(prompt: Msg, context: str) -> Msg:
     """创建一个带有附加上下文的主持人消息。"""
     return Msg(prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
@@ -262,19 +304,97 @@ async def _process_last_words(
         await hub.broadcast(_make_public_msg(last_msg, speech, behavior, content_raw))
 
 
-async def _reflection_phase(
+async def _run_reflection_task(
+    role_obj: Any,
+    context: str,
+    moderator_agent: EchoAgent,
+    agent: ReActAgent | None = None,
+) -> dict[str, Any]:
+    """让单个玩家完成回合反思，返回印象更新、思考与长期经验。
+
+    指定 `agent`（本体的记忆快照）时在其上完成反思，返回值的 messages
+    为本次新增的问答，由调用方补记到本体记忆中。
+    """
+
+    agent = agent or role_obj.agent
+    base = len(await agent.memory.get_memory())
+
+    reflect_instruction = (
+        f"[{role_obj.name} ONLY] 本轮结束，请反思并更新你对其他存活玩家的印象。"
+        "只填写需要更新的玩家，未提及的保持不变。思考过程 thought 仅自己可见。"
+        f"{' 你作为狼人，清楚知道所有狼人队友（含已出局）。' if getattr(role_obj, 'role_name', '') == 'werewolf' else ''}"
+    )
+
+    if config.reflection_mode == "combined":
+        # 单次调用同时输出印象更新与长期经验，共用同一份上下文
+        prompt = await moderator_agent(
+            f"{reflect_instruction}"
+            "同时在不泄露本局具体发言/投票细节的前提下，总结可复用的游戏理解，"
+            "输出到 knowledge 字段，它会被保存为你的专属经验库并在未来行动时提供给你。",
+        )
+        msg_round = await role_obj.decide(
+            _attach_context(prompt, context),
+            structured_model=RoundReflectionModel,
+            agent=agent,
+            kind="reflection",
+            fallback={"knowledge": ""},
+        )
+        return {
+            "role": role_obj,
+            "updates": msg_round.metadata.get("impression_updates") or {},
+            "thought": msg_round.metadata.get("thought", ""),
+            "knowledge": msg_round.metadata.get("knowledge", ""),
+            "timed_out": bool(msg_round.metadata.get(TIMED_OUT)),
+            "messages": (await agent.memory.get_memory())[base:],
+        }
+
+    prompt = await moderator_agent(reflect_instruction)
+    msg_reflect = await role_obj.decide(
+        _attach_context(prompt, context),
+        structured_model=ReflectionModel,
+        agent=agent,
+        kind="reflection",
+    )
+
+    knowledge_prompt = await moderator_agent(
+        f"[{role_obj.name} ONLY] 在不泄露本局具体发言/投票细节的前提下，总结可复用的游戏理解。"
+        "输出到 knowledge 字段，它会被保存为你的专属经验库并在未来行动时提供给你。",
+    )
+    msg_knowledge = await role_obj.decide(
+        _attach_context(knowledge_prompt, context),
+        structured_model=KnowledgeUpdateModel,
+        agent=agent,
+        kind="knowledge",
+        fallback={"knowledge": ""},
+    )
+
+    return {
+        "role": role_obj,
+        "updates": msg_reflect.metadata.get("impression_updates") or {},
+        "thought": msg_reflect.metadata.get("thought", ""),
+        "knowledge": msg_knowledge.metadata.get("knowledge", ""),
+        "timed_out": bool(msg_knowledge.metadata.get(TIMED_OUT)),
+        "messages": (await agent.memory.get_memory())[base:],
+    }
+
+
+async def _reflection_coros(
     players: Players,
     vote_history: list[dict[str, Any]],
     round_public_records: list[dict[str, Any]],
     round_num: int,
     moderator_agent: EchoAgent,
-    logger: GameLogger,
-    knowledge_store: PlayerKnowledgeStore,
-) -> None:
-    """让每位存活玩家在回合结束后更新印象。"""
+    snapshot: bool = False,
+) -> dict[str, Any]:
+    """为每位存活玩家创建反思协程。
+
+    上下文在此处立即生成，之后即使进入下一回合、公共状态继续变化，
+    反思内容仍基于本回合结束时的局面。`snapshot` 为真时同时复制每位
+    玩家此刻的记忆，反思在副本上进行，看不到之后广播进本体的新消息。
+    """
 
-    async def _run_reflection_task(role_obj: Any) -> dict[str, Any]:
-        await asyncio.sleep(0.4)  # 控制并行调用节奏
+    coros: dict[str, Any] = {}
+    for role_obj in players.current_alive:
         context = _format_impression_context(
             role_obj.name,
             players,
@@ -283,64 +403,151 @@ async def _reflection_phase(
             round_num,
             "回合反思",
         )
+        agent = await role_obj.fork_agent() if snapshot else None
+        coros[role_obj.name] = _run_reflection_task(
+            role_obj, context, moderator_agent, agent)
+    return coros
 
-        prompt = await moderator_agent(
-            f"[{role_obj.name} ONLY] 本轮结束，请反思并更新你对其他存活玩家的印象。"
-            "只填写需要更新的玩家，未提及的保持不变。思考过程 thought 仅自己可见。"
-            f"{' 你作为狼人，清楚知道所有狼人队友（含已出局）。' if getattr(role_obj, 'role_name', '') == 'werewolf' else ''}",
-        )
-        msg_reflect = await role_obj.agent(
-            _attach_context(prompt, context),
-            structured_model=ReflectionModel,
-        )
 
-        knowledge_prompt = await moderator_agent(
-            f"[{role_obj.name} ONLY] 在不泄露本局具体发言/投票细节的前提下，总结可复用的游戏理解。"
-            "输出到 knowledge 字段，它会被保存为你的专属经验库并在未来行动时提供给你。",
-        )
-        msg_knowledge = await role_obj.agent(
-            _attach_context(knowledge_prompt, context),
-            structured_model=KnowledgeUpdateModel,
-        )
+def _commit_reflection(
+    res: dict[str, Any],
+    round_num: int,
+    players: Players,
+    logger: GameLogger,
+    knowledge_store: PlayerKnowledgeStore,
+) -> None:
+    """将单个玩家的反思结果写入印象、日志与知识库（仅内存）。"""
+
+    role_obj = res["role"]
+    players.apply_impression_updates(role_obj.name, res.get("updates"))
+    logger.log_reflection(
+        round_num,
+        role_obj.name,
+        res.get("thought", ""),
+        players.get_impressions(role_obj.name, alive_only=True),
+    )
+    if res.get("timed_out"):
+        # 超时兜底没有新的经验，保留已有内容
+        return
+    knowledge_text = res.get("knowledge", "")
+    players.update_knowledge(role_obj.name, knowledge_text)
+    knowledge_store.update_player_knowledge(role_obj.name, knowledge_text)
 
-        return {
-            "role": role_obj,
-            "updates": msg_reflect.metadata.get("impression_updates") or {},
-            "thought": msg_reflect.metadata.get("thought", ""),
-            "knowledge": msg_knowledge.metadata.get("knowledge", ""),
-        }
 
-    reflection_results = await asyncio.gather(
-        *(_run_reflection_task(role) for role in players.current_alive),
+async def _reflection_phase(
+    players: Players,
+    vote_history: list[dict[str, Any]],
+    round_public_records: list[dict[str, Any]],
+    round_num: int,
+    moderator_agent: EchoAgent,
+    logger: GameLogger,
+    knowledge_store: PlayerKnowledgeStore,
+) -> None:
+    """让每位存活玩家在回合结束后更新印象。"""
+
+    coros = await _reflection_coros(
+        players,
+        vote_history,
+        round_public_records,
+        round_num,
+        moderator_agent,
     )
+    # 并行调用的节奏由模型外层的共享限流器（core.rate_limiter）统一控制
+    with hedged_phase():
+        reflection_results = await asyncio.gather(*coros.values())
 
     for res in reflection_results:
-        role_obj = res["role"]
-        players.apply_impression_updates(role_obj.name, res.get("updates"))
-        logger.log_reflection(
-            round_num,
-            role_obj.name,
-            res.get("thought", ""),
-            players.get_impressions(role_obj.name, alive_only=True),
-        )
-        knowledge_text = res.get("knowledge", "")
-        players.update_knowledge(role_obj.name, knowledge_text)
-        knowledge_store.update_player_knowledge(role_obj.name, knowledge_text)
+        _commit_reflection(res, round_num, players, logger, knowledge_store)
 
     # 持久化最新知识以便异常时不丢失（集中写入减少磁盘开销）
     knowledge_store.save()
 
 
+class _PendingReflections:
+    """在后台进行的回合反思（流水线模式）。
+
+    反思任务在回合结束时启动，与下一回合的夜晚并行执行；每位玩家在
+    新回合第一次被提问前调用 `ensure`，只等待自己的反思并提交结果。
+    反思在回合结束时的记忆快照上进行，提交时才把问答补记到本体记忆，
+    因此补记位置只取决于 `ensure` 的调用时机，与后台任务的完成顺序无关。
+    反思按后台优先级排队，`ensure` 开始等待时提升为关键优先级。
+    """
+
+    def __init__(
+        self,
+        tasks: dict[str, asyncio.Task],
+        round_num: int,
+        players: Players,
+        logger: GameLogger,
+        knowledge_store: PlayerKnowledgeStore,
+        priorities: dict[str, RequestPriority] | None = None,
+    ) -> None:
+        self.tasks = tasks
+        self.priorities = priorities or {}
+        self.round_num = round_num
+        self.players = players
+        self.logger = logger
+        self.knowledge_store = knowledge_store
+        self._committing = 0  # 已取出但尚未提交完毕的任务数
+
+    async def ensure(self, player_name: str) -> None:
+        """等待并提交指定玩家的反思；无待处理任务时立即返回。"""
+        task = self.tasks.pop(player_name, None)
+        if task is None:
+            return
+        priority = self.priorities.pop(player_name, None)
+        if priority is not None:
+            priority.promote()
+        self._committing += 1
+        try:
+            res = await task
+            await res["role"].agent.memory.add(res["messages"])
+            _commit_reflection(
+                res,
+                self.round_num,
+                self.players,
+                self.logger,
+                self.knowledge_store,
+            )
+        finally:
+            self._committing -= 1
+        # 其他 `ensure` 取出的任务可能仍在等待，全部提交后才落盘
+        if not self.tasks and not self._committing:
+            self.knowledge_store.save()
+
+    async def drain(self) -> None:
+        """按座位顺序提交所有剩余的反思。"""
+        for name in list(self.tasks):
+            await self.ensure(name)
+
+
 async def werewolves_game(
     agents: list[ReActAgent],
     knowledge_store: PlayerKnowledgeStore | None = None,
     player_model_map: dict[str, str] | None = None,
+    warmup: asyncio.Task | None = None,
+    game_id: str | None = None,
+    results: dict[str, Any] | None = None,
+    seed: int | None = None,
 ) -> tuple[str, str]:
     """狼人杀游戏的主入口
 
     Args:
         agents (`list[ReActAgent]`):
             9个智能体的列表。
+        warmup (`asyncio.Task | None`):
+            调用方已启动的端点预热任务；未提供时在此处启动，
+            与角色分配并行进行，并在第一夜开始前等待其结束。
+        game_id (`str | None`):
+            日志文件使用的游戏 ID，默认取当前时间；同一进程并发多局时
+            需由调用方保证唯一。
+        results (`dict | None`):
+            若提供，游戏结束（含异常终止）时写入胜方、回合数、角色分配、
+            耗时与 token 用量等结果，供锦标赛等批量运行汇总。
+        seed (`int | None`):
+            本局的随机种子，决定座位与角色分配等引擎内的随机行为；
+            未提供时随机生成。种子写入日志头部与经验文件，配合相同的
+            配置（及录制的模型响应）即可复现对局。
 
     Returns:
         tuple[str, str]: (log_file_path, experience_file_path)
@@ -354,9 +561,17 @@ async def werewolves_game(
     )
     knowledge_store.load()
 
+    # 本局独立的随机数生成器，同一进程内并发的多局互不影响
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    rng = np.random.default_rng(seed)
+    knowledge_store.set_game_seed(seed)
+    knowledge_store.save()
+
     # 初始化游戏日志
-    game_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    logger = GameLogger(game_id)
+    game_id = game_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    logger = GameLogger(game_id, seed=seed)
+    started_at = time.monotonic()
 
     # 记录可公开的投票历史，供后续回合参考
     vote_history: list[dict[str, Any]] = []
@@ -372,14 +587,18 @@ async def werewolves_game(
             ),
         )
 
+    # 端点预热与角色分配并行进行
+    warmup = warmup or start_warmup()
+
     # 给智能体分配角色
     roles = ["werewolf"] * 3 + ["villager"] * 3 + ["seer", "witch", "hunter"]
-    np.random.shuffle(agents)
-    np.random.shuffle(roles)
+    rng.shuffle(agents)
+    rng.shuffle(roles)
 
     for agent, role_name in zip(agents, roles):
         # 创建角色对象
         role_obj = RoleFactory.create_role(agent, role_name)
+        role_obj.logger = logger
 
         # 告知智能体其角色
         await agent.observe(
@@ -407,7 +626,25 @@ async def werewolves_game(
                     for name, role in players.name_to_role.items()]
     logger.log_players(players_info, model_map=player_model_map)
 
+    # 第一夜开始前等待预热结束（有超时上限）
+    await wait_for_warmup(warmup)
+
     game_status = "正常结束"
+    # 与主流程并行执行的后台任务（如预言家查验），异常退出时统一取消
+    pending_tasks: set[asyncio.Task] = set()
+    # 本局的请求对冲统计，游戏结束时写入日志
+    hedge_stats = new_hedge_stats()
+    # 本局的模型 token 用量
+    usage = new_usage_stats()
+    # 本局的录制/回放命中统计（同时决定重复请求的出现序号）
+    replay_stats = new_replay_stats()
+    # 本局请求在限流器中的排队等待（限流器本身跨对局共享）
+    queue_waits = new_queue_waits()
+    winner: str | None = None
+    round_num = 0
+    # 流水线模式下尚未提交的上一回合反思
+    pending_reflections = _PendingReflections(
+        {}, 0, players, logger, knowledge_store)
 
     try:
         # 游戏开始！
@@ -430,6 +667,29 @@ async def werewolves_game(
                 )
                 killed_player, poisoned_player, shot_player = None, None, None
 
+                # 预言家查验不依赖狼人的选择，私下与狼人讨论并行发起，女巫回合前合并结果
+                async def _seer_check(seer: Seer) -> dict:
+                    await pending_reflections.ensure(seer.name)
+                    game_state = {
+                        "alive_players": players.current_alive,
+                        "moderator": moderator,
+                        "name_to_role": players.name_to_role,
+                        "context": _format_impression_context(
+                            seer.name,
+                            players,
+                            vote_history,
+                            round_public_records,
+                            round_num,
+                            "预言家行动",
+                        ),
+                    }
+                    return await seer.night_action(game_state)
+
+                seer_tasks = [
+                    (seer, _spawn(pending_tasks, _seer_check(seer)))
+                    for seer in players.seer
+                ]
+
                 # 狼人讨论
                 werewolf_agents = [w.agent for w in players.werewolves]
                 async with MsgHub(
@@ -443,10 +703,12 @@ async def werewolves_game(
                     ),
                     name="werewolves",
                 ) as werewolves_hub:
-                    # 讨论
+                    # 讨论：记录每名狼人最新提议的目标，达成一致即提前结束
                     n_werewolves = len(players.werewolves)
+                    proposals: dict[str, str | None] = {}
                     for _ in range(1, MAX_DISCUSSION_ROUND * n_werewolves + 1):
                         werewolf = players.werewolves[_ % n_werewolves]
+                        await pending_reflections.ensure(werewolf.name)
                         context = _format_impression_context(
                             werewolf.name,
                             players,
@@ -464,7 +726,9 @@ async def werewolves_game(
                                 ),
                                 context,
                             ),
+                            alive_players=players.current_alive,
                         )
+                        proposals[werewolf.name] = res.metadata.get("target")
                         # 记录狼人讨论
                         speech, behavior, thought, content_raw = _extract_msg_fields(
                             res)
@@ -490,6 +754,16 @@ async def werewolves_game(
                             behavior=behavior,
                             thought=thought,
                         )
+                        consensus = _discussion_consensus(
+                            proposals,
+                            n_werewolves,
+                            config.wolf_discussion_quorum,
+                        )
+                        if consensus:
+                            logger.log_announcement(
+                                f"狼人意见一致（目标：{consensus}），提前结束讨论",
+                            )
+                            break
                         if _ % n_werewolves == 0 and res.metadata.get(
                             "reach_agreement",
                         ):
@@ -500,7 +774,20 @@ async def werewolves_game(
                 werewolves_hub.set_auto_broadcast(False)
                 vote_prompt = await moderator(content=Prompts.to_wolves_vote)
                 wolf_votes_for_majority: list[str | None] = []
-                for werewolf in players.werewolves:
+                # 投票超时的狼人改投夜聊中提议最多的目标，无提议时投第一个好人
+                proposed = Counter(
+                    t for t in proposals.values() if t).most_common(1)
+                wolf_fallback_target = proposed[0][0] if proposed else next(
+                    (
+                        p.name
+                        for p in players.current_alive
+                        if not players.is_werewolf(p.name)
+                    ),
+                    None,
+                )
+
+                async def _wolf_vote_task(werewolf: Werewolf) -> tuple[Werewolf, Msg | None]:
+                    await pending_reflections.ensure(werewolf.name)
                     context = _format_impression_context(
                         werewolf.name,
                         players,
@@ -512,7 +799,17 @@ async def werewolves_game(
                     msg = await werewolf.team_vote(
                         _attach_context(vote_prompt, context),
                         players.current_alive,
+                        fallback_target=wolf_fallback_target,
                     )
+                    return werewolf, msg
+
+                # 自动广播已关闭，狼人投票互不可见，可并行发起；结果按座位顺序记录
+                with hedged_phase():
+                    wolf_vote_results = await asyncio.gather(
+                        *(_wolf_vote_task(werewolf) for werewolf in players.werewolves),
+                    )
+
+                for werewolf, msg in wolf_vote_results:
                     if not msg:
                         wolf_votes_for_majority.append(None)
                         logger.log_message_detail(
@@ -573,6 +870,55 @@ async def werewolves_game(
                     await moderator(wolves_res_prompt),
                 )
 
+            async def _speculate_shot(hunter: Hunter, dead: set[str]) -> None:
+                """猎人死亡已确定时，按后台优先级预先计算开枪决定。"""
+                await pending_reflections.ensure(hunter.name)
+                _track(
+                    pending_tasks,
+                    hunter.start_speculative_shot(
+                        [p for p in players.current_alive if p.name not in dead],
+                        moderator,
+                        _format_impression_context(
+                            hunter.name,
+                            players,
+                            vote_history,
+                            round_public_records,
+                            round_num,
+                            "猎人开枪",
+                        ),
+                    ),
+                )
+
+            # 猎人被刀且女巫无解药可用时，其死亡已确定：在女巫回合期间预先计算
+            if killed_player and not any(w.has_healing for w in players.witch):
+                for hunter in players.hunter:
+                    if hunter.name == killed_player:
+                        await _speculate_shot(hunter, {killed_player})
+
+            # 合并预言家查验结果；公开的预言家回合提示仍在狼人回合之后播报
+            seer_results = [(seer, await seer_task) for seer, seer_task in seer_tasks]
+            await alive_players_hub.broadcast(
+                await moderator(Prompts.to_all_seer_turn),
+            )
+            for seer, result in seer_results:
+
+                # Log speech/behavior/thought
+                logger.log_message_detail(
+                    "预言家行动",
+                    seer.name,
+                    speech=result.get("speech"),
+                    behavior=result.get("behavior"),
+                    thought=result.get("thought"),
+                )
+
+                # 记录预言家查验
+                if result and result.get("action") == "check":
+                    checked_player = result.get("target")
+                    role_result = result.get("result")
+                    if checked_player and role_result:
+                        logger.log_action(
+                            "预言家查验", f"查验 {checked_player}, 结果: {role_result}")
+
             night_hunter_candidates: list[Hunter] = []
 
             # 女巫回合
@@ -580,10 +926,12 @@ async def werewolves_game(
                 await moderator(Prompts.to_all_witch_turn),
             )
             for witch in players.witch:
+                await pending_reflections.ensure(witch.name)
                 game_state = {
                     "killed_player": killed_player,
                     "alive_players": players.current_alive,
                     "moderator": moderator,
+                    "combined_decision": config.witch_combined_decision,
                     "context": _format_impression_context(
                         witch.name,
                         players,
@@ -596,29 +944,39 @@ async def werewolves_game(
 
                 result = await witch.night_action(game_state)
 
-                # Log resurrect speech
-                r_speech = result.get("resurrect_speech")
-                r_behavior = result.get("resurrect_behavior")
-                r_thought = result.get("resurrect_thought")
-                logger.log_message_detail(
-                    "女巫行动(解药)",
-                    witch.name,
-                    speech=r_speech,
-                    behavior=r_behavior,
-                    thought=r_thought,
-                )
+                if result.get("combined"):
+                    # 合并决策只有一次发言
+                    logger.log_message_detail(
+                        "女巫行动",
+                        witch.name,
+                        speech=result.get("speech"),
+                        behavior=result.get("behavior"),
+                        thought=result.get("thought"),
+                    )
+                else:
+                    # Log resurrect speech
+                    r_speech = result.get("resurrect_speech")
+                    r_behavior = result.get("resurrect_behavior")
+                    r_thought = result.get("resurrect_thought")
+                    logger.log_message_detail(
+                        "女巫行动(解药)",
+                        witch.name,
+                        speech=r_speech,
+                        behavior=r_behavior,
+                        thought=r_thought,
+                    )
 
-                # Log poison speech
-                p_speech = result.get("poison_speech")
-                p_behavior = result.get("poison_behavior")
-                p_thought = result.get("poison_thought")
-                logger.log_message_detail(
-                    "女巫行动(毒药)",
-                    witch.name,
-                    speech=p_speech,
-                    behavior=p_behavior,
-                    thought=p_thought,
-                )
+                    # Log poison speech
+                    p_speech = result.get("poison_speech")
+                    p_behavior = result.get("poison_behavior")
+                    p_thought = result.get("poison_thought")
+                    logger.log_message_detail(
+                        "女巫行动(毒药)",
+                        witch.name,
+                        speech=p_speech,
+                        behavior=p_behavior,
+                        thought=p_thought,
+                    )
 
                 # 处理解药
                 if result.get("resurrect"):
@@ -635,46 +993,16 @@ async def werewolves_game(
                 hunter for hunter in players.hunter
                 if killed_player == hunter.name and poisoned_player != hunter.name
             ]
+            for hunter in players.hunter:
+                if hunter in night_hunter_candidates:
+                    # 女巫未救时死亡此刻才确定，预计算与其余反思的提交重叠
+                    await _speculate_shot(hunter, {killed_player, poisoned_player})
+                else:
+                    # 被毒杀的猎人不能开枪，丢弃预计算（不记录其决策）
+                    hunter.discard_speculative_shot()
 
-            # 预言家回合
-            await alive_players_hub.broadcast(
-                await moderator(Prompts.to_all_seer_turn),
-            )
-            for seer in players.seer:
-                game_state = {
-                    "alive_players": players.current_alive,
-                    "moderator": moderator,
-                    "name_to_role": players.name_to_role,
-                    "context": _format_impression_context(
-                        seer.name,
-                        players,
-                        vote_history,
-                        round_public_records,
-                        round_num,
-                        "预言家行动",
-                    ),
-                }
-
-                result = await seer.night_action(game_state)
-
-                # Log speech/behavior/thought
-                logger.log_message_detail(
-                    "预言家行动",
-                    seer.name,
-                    speech=result.get("speech"),
-                    behavior=result.get("behavior"),
-                    thought=result.get("thought"),
-                )
-
-                # 记录预言家查验
-                if result and result.get("action") == "check":
-                    checked_player = result.get("target")
-                    role_result = result.get("result")
-                    if checked_player and role_result:
-                        logger.log_action(
-                            "预言家查验", f"查验 {checked_player}, 结果: {role_result}")
-
-            # 白天阶段
+            # 白天阶段：其余玩家的上一回合反思需在白天发言前全部提交
+            await pending_reflections.drain()
             logger.start_day()
 
             # 天亮后、公布夜间淘汰前，处理夜晚被狼人击杀的猎人开枪（仅狼刀且未被毒）
@@ -770,6 +1098,7 @@ async def werewolves_game(
             # 检查胜利条件
             res = players.check_winning()
             if res:
+                winner = "werewolf" if players.werewolves else "villager"
                 logger.log_announcement(f"游戏结束: {res}")
                 await moderator(res)
                 break
@@ -833,7 +1162,6 @@ async def werewolves_game(
             day_votes_for_majority: list[str | None] = []
 
             async def _vote_task(role_obj: Any) -> tuple[Any, Msg | None]:
-                await asyncio.sleep(0.4)  # 控制并行调用节奏
                 context = _format_impression_context(
                     role_obj.name,
                     players,
@@ -848,9 +1176,10 @@ async def werewolves_game(
                 )
                 return role_obj, msg
 
-            vote_results = await asyncio.gather(
-                *(_vote_task(role) for role in players.current_alive),
-            )
+            with hedged_phase():
+                vote_results = await asyncio.gather(
+                    *(_vote_task(role) for role in players.current_alive),
+                )
 
             for role_obj, msg in vote_results:
                 if not msg:
@@ -970,7 +1299,6 @@ async def werewolves_game(
                 ]
 
                 async def _pk_vote_task(role_obj: Any) -> tuple[Any, Msg | None]:
-                    await asyncio.sleep(0.4)  # 控制并行调用节奏
                     context = _format_impression_context(
                         role_obj.name,
                         players,
@@ -979,19 +1307,31 @@ async def werewolves_game(
                         round_num,
                         f"PK投票#{pk_round}",
                     )
-                    vote_msg = await role_obj.agent(
+                    vote_msg = await role_obj.decide(
                         _attach_context(pk_vote_prompt, context),
                         structured_model=get_vote_model(
                             pk_vote_targets,
                             allow_abstain=False,
                         ),
+                        kind="vote",
+                        fallback={
+                            "vote": next(
+                                (
+                                    t.name
+                                    for t in pk_vote_targets
+                                    if t.name != role_obj.name
+                                ),
+                                pk_vote_targets[0].name,
+                            ),
+                        },
                     )
                     return role_obj, vote_msg
 
                 pk_votes_for_majority: list[str | None] = []
-                pk_vote_results = await asyncio.gather(
-                    *(_pk_vote_task(role) for role in players.current_alive),
-                )
+                with hedged_phase():
+                    pk_vote_results = await asyncio.gather(
+                        *(_pk_vote_task(role) for role in players.current_alive),
+                    )
 
                 for role_obj, vote_msg in pk_vote_results:
                     if vote_msg:
@@ -1110,6 +1450,25 @@ async def werewolves_game(
             # 投票结束后公开当轮票型，供后续回合引用
             vote_history.extend(round_vote_records)
 
+            # 被投出的猎人死亡已确定：与遗言并行预先计算开枪决定
+            for hunter in players.hunter:
+                if voted_player == hunter.name:
+                    _track(
+                        pending_tasks,
+                        hunter.start_speculative_shot(
+                            players.current_alive,
+                            moderator,
+                            _format_impression_context(
+                                hunter.name,
+                                players,
+                                vote_history,
+                                round_public_records,
+                                round_num,
+                                "猎人开枪",
+                            ),
+                        ),
+                    )
+
             # 一起广播投票消息以避免相互影响
             voting_res_prompt = (
                 Prompts.to_all_res.format(votes, voted_player)
@@ -1181,15 +1540,42 @@ async def werewolves_game(
             players.update_players(dead_today)
 
             # 回合结束，存活玩家更新印象
-            await _reflection_phase(
-                players,
-                vote_history,
-                round_public_records,
-                round_num,
-                moderator,
-                logger,
-                knowledge_store,
-            )
+            if config.reflection_pipeline:
+                # 流水线模式：反思在后台进行，与下一回合的夜晚重叠
+                reflection_coros = await _reflection_coros(
+                    players,
+                    vote_history,
+                    round_public_records,
+                    round_num,
+                    moderator,
+                    snapshot=True,
+                )
+                reflection_tasks = {}
+                reflection_priorities = {}
+                with hedged_phase():
+                    for name, coro in reflection_coros.items():
+                        priority = RequestPriority()
+                        with request_priority(priority):
+                            reflection_tasks[name] = _spawn(pending_tasks, coro)
+                        reflection_priorities[name] = priority
+                pending_reflections = _PendingReflections(
+                    reflection_tasks,
+                    round_num,
+                    players,
+                    logger,
+                    knowledge_store,
+                    reflection_priorities,
+                )
+            else:
+                await _reflection_phase(
+                    players,
+                    vote_history,
+                    round_public_records,
+                    round_num,
+                    moderator,
+                    logger,
+                    knowledge_store,
+                )
 
             # 记录回合结束时的存活玩家名单，便于回溯局势
             logger.log_alive_players(
@@ -1200,6 +1586,9 @@ async def werewolves_game(
             # 检查胜利条件
             res = players.check_winning()
             if res:
+                winner = "werewolf" if players.werewolves else "villager"
+                # 全员广播会开启自动广播，需先等待后台反思结束，避免私密内容外泄
+                await pending_reflections.drain()
                 logger.log_announcement(f"游戏结束: {res}")
                 async with MsgHub(players.all_players) as all_players_hub:
                     res_msg = await moderator(res)
@@ -1207,6 +1596,7 @@ async def werewolves_game(
                 break
 
         # 游戏结束，每位玩家发表感言
+        await pending_reflections.drain()
         final_prompt = await moderator(Prompts.to_all_reflect)
         for role in players.all_roles:
             context = _format_impression_context(
@@ -1217,8 +1607,9 @@ async def werewolves_game(
                 round_num,
                 "游戏总结",
             )
-            await role.agent(
+            await role.decide(
                 _attach_context(final_prompt, context),
+                kind="summary",
             )
 
         # 持久化本局累计的知识
@@ -1232,5 +1623,31 @@ async def werewolves_game(
         logger.log_announcement(f"游戏异常终止: {exc}")
         raise
     finally:
+        for task in list(pending_tasks):
+            task.cancel()
         # 确保日志文件关闭并标记状态
-        logger.close(status=game_status)
+        # 端点池在同一进程的多局之间共享，其统计含其他并发对局，单独标注
+        summary = [f"{line}（本进程累计）" for line in pool_summaries()]
+        summary += queue_waits.summaries()
+        if config.hedge_enabled:
+            summary.append(f"请求对冲: {hedge_stats.summary()}")
+        summary.append(f"Token 用量: {usage.summary()}")
+        if config.replay_mode != "off":
+            mode_label = "回放" if config.replay_mode == "replay" else "录制"
+            summary.append(f"模型响应{mode_label}: {replay_stats.summary()}")
+        logger.close(status=game_status, summary=summary)
+
+        if results is not None:
+            results.update({
+                "game_id": game_id,
+                "seed": seed,
+                "status": game_status,
+                "winner": winner,
+                "rounds": round_num,
+                "roles": dict(players.name_to_role),
+                "duration_sec": round(time.monotonic() - started_at, 2),
+                "token_usage": usage.as_dict(),
+                "replay": replay_stats.as_dict(),
+                "log_path": str(logger.log_file),
+                "experience_path": str(knowledge_store.path),
+            })
@@ -10,14 +10,21 @@ from config import config
 class GameLogger:
     """狼人杀游戏日志记录器"""
 
-    def __init__(self, game_id: str, log_dir: Optional[str] = None):
+    def __init__(
+        self,
+        game_id: str,
+        log_dir: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
         """初始化日志记录器
 
         Args:
             game_id: 游戏ID（格式：YYYYMMDD_HHMMSS）
             log_dir: 日志文件存储目录（相对于 backend 目录）
+            seed: 本局的随机种子，写入日志头部以便复现
         """
         self.game_id = game_id
+        self.seed = seed
         resolved_dir = Path(log_dir) if log_dir else Path(config.log_dir)
         self.log_dir = resolved_dir
         self.log_file = resolved_dir / f"game_{game_id}.log"
@@ -38,6 +45,8 @@ class GameLogger:
             f.write("狼人杀游戏日志\n")
             f.write(f"游戏ID: {self.game_id}\n")
             f.write(f"开始时间: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            if self.seed is not None:
+                f.write(f"随机种子: {self.seed}\n")
             f.write("=" * 80 + "\n")
 
     def log_players(
@@ -96,6 +105,7 @@ class GameLogger:
         "白天死亡": "💀 白天死亡",
         "投票结果": "📊 投票结果",
         "狼人投票结果": "📊 狼人投票结果",
+        "超时兜底": "⏱️ 超时兜底",
     }
 
     def _get_category_display(self, category: str) -> str:
@@ -235,8 +245,8 @@ class GameLogger:
             self._write_field(f, "印象", impression_text)
             f.write("\n")
 
-    def close(self, status: str = "正常结束"):
-        """关闭日志文件并写入最终状态。"""
+    def close(self, status: str = "正常结束", summary: Optional[list[str]] = None):
+        """关闭日志文件并写入最终状态及可选的运行统计。"""
         if self.closed:
             return
         self.closed = True
@@ -245,4 +255,6 @@ class GameLogger:
             f.write(
                 f"游戏结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"游戏状态: {status}\n")
+            for line in summary or []:
+                f.write(f"{line}\n")
             f.write("=" * 80 + "\n")
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""请求对冲：并行阶段中为拖慢整体进度的慢请求补发一次请求。
+
+白天投票、PK 投票与回合反思都用 `asyncio.gather` 等待所有玩家，整体耗时
+取决于最慢的那次调用。`HedgedChatModel` 在 `hedged_phase()` 作用域内生效：
+若某次调用超过近期延迟的指定分位数仍未返回，就再发一次相同请求，取先完成
+的结果并取消另一个。对冲次数与胜出次数记录在 `HedgeStats` 中。
+"""
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+from config import config
+
+
+@dataclass
+class HedgeStats:
+    """一局游戏内的对冲统计。"""
+
+    calls: int = 0  # 对冲作用域内的调用数
+    hedges: int = 0  # 发起的对冲请求数
+    wins: int = 0  # 对冲请求先于原请求完成的次数
+
+    def summary(self) -> str:
+        """返回适合写入日志的一行摘要。"""
+        return (
+            f"并行阶段调用 {self.calls} 次，发起对冲 {self.hedges} 次，"
+            f"对冲胜出 {self.wins} 次"
+        )
+
+
+# 对冲只在并行阶段启用；统计对象按上下文隔离，便于多局游戏同时运行
+_HEDGE_ACTIVE: ContextVar[bool] = ContextVar("hedge_active", default=False)
+_HEDGE_STATS: ContextVar[HedgeStats | None] = ContextVar(
+    "hedge_stats", default=None)
+
+
+@contextmanager
+def hedged_phase() -> Iterator[None]:
+    """在该作用域内创建的模型调用（含 gather 派生的任务）允许对冲。"""
+    token = _HEDGE_ACTIVE.set(config.hedge_enabled)
+    try:
+        yield
+    finally:
+        _HEDGE_ACTIVE.reset(token)
+
+
+def new_hedge_stats() -> HedgeStats:
+    """为当前上下文（通常是一局游戏所在的任务）创建独立的对冲统计。"""
+    stats = HedgeStats()
+    _HEDGE_STATS.set(stats)
+    return stats
+
+
+class LatencyWindow:
+    """最近若干次成功调用的延迟滚动窗口。"""
+
+    def __init__(self, size: int, min_samples: int) -> None:
+        self._samples: deque[float] = deque(maxlen=max(size, 1))
+        self.min_samples = min_samples
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> float | None:
+        """返回第 q 分位的延迟；样本不足时返回 None。"""
+        if len(self._samples) < max(self.min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_WINDOWS: dict[str, LatencyWindow] = {}
+
+
+def get_latency_window(model_name: str) -> LatencyWindow:
+    """按模型名获取共享的延迟窗口，同一模型的所有玩家共用统计。"""
+    window = _WINDOWS.get(model_name)
+    if window is None:
+        window = LatencyWindow(config.hedge_window, config.hedge_min_samples)
+        _WINDOWS[model_name] = window
+    return window
+
+
+class HedgedChatModel(ChatModelBase):
+    """为慢请求补发对冲请求的包装模型。
+
+    对冲请求默认发往同一模型；HEDGE_TO_FALLBACK=true 时由工厂传入备用端点作为 `hedge_model`。
+    流式模型在对冲时会先完整收取结果，再以单块生成器的形式返回。
+    """
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        hedge_model: ChatModelBase | None = None,
+    ) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.hedge_model = hedge_model or model
+        self.window = get_latency_window(model.model_name)
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        delay = self._hedge_delay() if _HEDGE_ACTIVE.get() else None
+        if delay is None:
+            start = time.monotonic()
+            res = await self.model(*args, **kwargs)
+            if isinstance(res, AsyncGenerator):
+                return self._observe_stream(res, start)
+            self.window.add(time.monotonic() - start)
+            return res
+
+        stats = _HEDGE_STATS.get()
+        if stats is not None:
+            stats.calls += 1
+
+        primary = asyncio.create_task(self._complete(self.model, args, kwargs))
+        hedge: asyncio.Task | None = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if primary in done:
+                return self._deliver(primary.result())
+
+            if stats is not None:
+                stats.hedges += 1
+            hedge = asyncio.create_task(
+                self._complete(self.hedge_model, args, kwargs))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    if task is hedge and stats is not None:
+                        stats.wins += 1
+                    return self._deliver(task.result())
+            # 两个请求都失败时抛出原请求的异常
+            return self._deliver(primary.result())
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _hedge_delay(self) -> float | None:
+        threshold = self.window.percentile(config.hedge_percentile)
+        if threshold is None:
+            return None
+        return max(threshold, config.hedge_min_delay)
+
+    async def _complete(
+        self,
+        model: ChatModelBase,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        """完成一次调用并返回最终响应；流式输出只保留最后一个累积分块。"""
+        start = time.monotonic()
+        res = await model(*args, **kwargs)
+        if isinstance(res, AsyncGenerator):
+            last = None
+            try:
+                async for chunk in res:
+                    last = chunk
+            finally:
+                await res.aclose()
+            res = last
+        self.window.add(time.monotonic() - start)
+        return res
+
+    def _deliver(self, res: Any) -> Any:
+        if not self.stream:
+            return res
+        return self._replay(res)
+
+    @staticmethod
+    async def _replay(res: Any) -> AsyncGenerator:
+        yield res
+
+    async def _observe_stream(
+        self,
+        res: AsyncGenerator,
+        start: float,
+    ) -> AsyncGenerator:
+        async for chunk in res:
+            yield chunk
+        self.window.add(time.monotonic() - start)
+
+
+def with_hedging(
+    model: ChatModelBase,
+    hedge_model: ChatModelBase | None = None,
+) -> ChatModelBase:
+    """为模型加上请求对冲；未启用对冲时原样返回。"""
+
+    if not config.hedge_enabled:
+        return model
+    return HedgedChatModel(model, hedge_model)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""共享 HTTP 连接池：同一端点的所有模型客户端复用一个长连接客户端。
+
+9 名玩家通常访问同一个 OPENAI_BASE_URL，若各自创建客户端就会各有一个
+连接池与 TLS 会话，并行投票时要重复握手。这里按 (提供商, base_url, API Key)
+缓存 `httpx.AsyncClient`，连接池大小可配置；安装了 `h2` 时启用 HTTP/2。
+
+目前只有 OpenAI 兼容端点接入了共享连接池：DashScope SDK 自行管理连接，
+Ollama 客户端只接受创建参数、无法注入已有客户端，二者仍按玩家各建客户端
+（Ollama 通常在本机，握手开销可以忽略）。
+"""
+import httpx
+
+from config import config
+
+
+_CLIENTS: dict[tuple[str, str, str], httpx.AsyncClient] = {}
+
+
+def http2_available() -> bool:
+    """是否可以启用 HTTP/2（需要可选依赖 h2）。"""
+    try:
+        import h2  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client(
+    provider: str,
+    base_url: str | None,
+    api_key: str | None,
+) -> httpx.AsyncClient:
+    """获取指定端点的共享 HTTP 客户端，不存在则按配置创建。"""
+
+    key = (provider, base_url or "", api_key or "")
+    client = _CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.http_pool_max_connections,
+                max_keepalive_connections=config.http_pool_max_keepalive,
+                keepalive_expiry=config.http_keepalive_expiry,
+            ),
+            http2=config.http2_enabled and http2_available(),
+            # 单次请求的超时由 SDK 按请求传入，这里只作为兜底
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+        _CLIENTS[key] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """关闭所有共享客户端（连接绑定在事件循环上，退出前应调用）。"""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""基于 SQLite 的持久化对局作业队列，用于多机分布式锦标赛。
+
+协调端把每局游戏写成一条作业（座位模型、种子、配置覆盖），任意机器上的
+工作进程通过共享存储上的同一个 SQLite 文件领取作业。领取时设置租约，
+运行期间定期续约；工作进程崩溃导致租约过期后，作业会被其他进程重新领取，
+超过最大尝试次数则标记为失败。完成结果只有租约持有者才能提交，保证同一
+局不会被重复计入。日志与经验文件以附件形式写回队列，由协调端统一导出。
+"""
+import json
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tournament_id TEXT NOT NULL,
+    game_index INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (tournament_id, game_index)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+
+class JobQueue:
+    """对局作业队列（pending → leased → done / failed）。"""
+
+    def __init__(self, path: str | Path, busy_timeout: float = 30.0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 每次操作单独建连接：共享存储上的文件不适合长连接与 WAL
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务：BEGIN IMMEDIATE 立即取得写锁，避免两个进程领取同一作业。"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        tournament_id: str,
+        payloads: list[dict[str, Any]],
+        max_attempts: int = 3,
+    ) -> int:
+        """写入一批作业，`game_index` 从 1 开始编号；返回写入数量。"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (tournament_id, game_index, payload, "
+                "max_attempts, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (tournament_id, idx, json.dumps(payload, ensure_ascii=False),
+                     max_attempts, now)
+                    for idx, payload in enumerate(payloads, start=1)
+                ],
+            )
+        return len(payloads)
+
+    def lease(self, worker_id: str, lease_seconds: float) -> dict[str, Any] | None:
+        """领取一个待运行或租约已过期的作业；没有可领取的作业时返回 None。"""
+        now = time.time()
+        with self._transaction() as conn:
+            # 租约过期且已用完尝试次数的作业直接标记失败
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, "
+                "error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? "
+                "AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """续约；租约已被他人接管时返回 False。"""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def complete(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: dict[str, Any],
+        artifacts: dict[str, bytes] | None = None,
+    ) -> bool:
+        """提交结果与附件；只有当前租约持有者的提交有效。"""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(),
+                 job_id, worker_id),
+            )
+            if cur.rowcount != 1:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (job_id, name, content) "
+                "VALUES (?, ?, ?)",
+                [(job_id, name, content)
+                 for name, content in (artifacts or {}).items()],
+            )
+            return True
+
+    def release(self, job_id: int, worker_id: str) -> bool:
+        """归还尚未开始运行的作业，不计入尝试次数。"""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = attempts - 1, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time(), job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """报告失败：未用完尝试次数时放回队列重试，否则标记为失败。"""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts "
+                "THEN 'failed' ELSE 'pending' END, error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (error, time.time(), job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def counts(self, tournament_id: str | None = None) -> dict[str, int]:
+        """按状态统计作业数量。"""
+        query = "SELECT status, COUNT(*) AS n FROM jobs"
+        params: tuple = ()
+        if tournament_id:
+            query += " WHERE tournament_id = ?"
+            params = (tournament_id,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " GROUP BY status", params).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def jobs(self, tournament_id: str) -> list[dict[str, Any]]:
+        """返回某次锦标赛的全部作业（结果已解析为字典）。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE tournament_id = ? ORDER BY game_index",
+                (tournament_id,),
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["payload"] = json.loads(job["payload"])
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+            jobs.append(job)
+        return jobs
+
+    def artifacts(self, job_id: int) -> dict[str, bytes]:
+        """返回某个作业回传的附件（文件名 → 内容）。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, content FROM artifacts WHERE job_id = ?",
+                (job_id,),
+            ).fetchall()
+        return {row["name"]: bytes(row["content"]) for row in rows}
@@ -70,6 +70,13 @@ class PlayerKnowledgeStore:
             name: f"({model})" for name, model in model_map.items()
         }
 
+    def set_game_seed(self, seed: int) -> None:
+        """记录本局的随机种子，便于用同一种子复现对局。"""
+
+        if not isinstance(self._data, dict):
+            self._data = {"session_id": self.session_id, "players": {}}
+        self._data["seed"] = seed
+
     def bulk_update(self, knowledge_map: Dict[str, str]) -> None:
         """批量替换或合并多名玩家的知识条目。"""
         for name, knowledge in knowledge_map.items():
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""离线模拟模型（MODEL_PROVIDER=mock）：不依赖任何模型服务即可完整跑通对局。
+
+模拟模型按请求中的 JSON Schema 生成合法的结构化输出（投票、查验、用药、
+开枪、反思等），并识别数据分析的 JSON 任务生成对应结构。随机性来自
+MOCK_SEED 与请求内容的哈希，同样的提示词总是得到同样的回复，与并发调度
+顺序无关。可按指定分布模拟延迟与抖动，用于对引擎本身做性能测试。
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Any
+
+from agentscope.message import TextBlock, ToolUseBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.model._model_usage import ChatUsage
+from pydantic import BaseModel
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "exponential", "lognormal")
+
+_SELF_NAME = re.compile(r"名为(\w+?)的")
+_PLAYER_NAME = re.compile(r"Player\d+")
+_ABSTAIN = {"abstain", "弃权"}
+_ANALYSIS_METRIC_TITLES = {
+    "cognitiveConsistency": "认知一致性",
+    "deceptionScore": "欺骗指数",
+    "strategyPurity": "策略纯度",
+    "stressResponse": "压力反应",
+    "trustRelations": "信任关系",
+    "suspectRelations": "怀疑关系",
+    "echoChamber": "回音室效应",
+    "avgTrust": "平均信任度",
+}
+
+
+def _text_of(message: dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            str(block.get("text", ""))
+            for block in content
+            if isinstance(block, dict)
+        )
+    return ""
+
+
+def sample_latency(
+    rng: random.Random,
+    mean: float,
+    jitter: float,
+    distribution: str,
+) -> float:
+    """按分布采样一次延迟（秒），`jitter` 为标准差或均匀分布的半宽。"""
+    if mean <= 0 and jitter <= 0:
+        return 0.0
+    if distribution == "uniform":
+        value = rng.uniform(mean - jitter, mean + jitter)
+    elif distribution == "normal":
+        value = rng.gauss(mean, jitter)
+    elif distribution == "exponential":
+        value = rng.expovariate(1 / mean) if mean > 0 else 0.0
+    elif distribution == "lognormal":
+        if mean <= 0:
+            return 0.0
+        sigma2 = math.log(1 + (jitter / mean) ** 2)
+        value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+    else:
+        value = mean
+    return max(value, 0.0)
+
+
+class _Generator:
+    """一次调用内的结构化输出生成器。"""
+
+    def __init__(self, rng: random.Random, self_name: str | None, names: list[str]):
+        self.rng = rng
+        self.self_name = self_name
+        self.names = [n for n in names if n != self_name] or names
+
+    # ---------- JSON Schema ----------
+
+    def from_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        data = self._value(schema, schema, "")
+        data = data if isinstance(data, dict) else {}
+        # 语义约束：同一晚最多一瓶药；开枪/毒人时必须有目标，否则目标留空
+        if data.get("resurrect") and data.get("poison"):
+            data["poison"] = False
+        for flag in ("poison", "shoot"):
+            if flag in data and "name" in data:
+                if not data[flag]:
+                    data["name"] = None
+                elif data["name"] is None:
+                    data[flag] = False
+        return data
+
+    def _resolve(self, root: dict, schema: dict) -> dict:
+        ref = schema.get("$ref")
+        if not ref:
+            return schema
+        node: Any = root
+        for part in ref.lstrip("#/").split("/"):
+            node = node.get(part, {})
+        return node
+
+    def _value(self, root: dict, schema: dict, field: str) -> Any:
+        schema = self._resolve(root, schema)
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            return self._choice(schema["enum"])
+        if "anyOf" in schema or "oneOf" in schema:
+            options = schema.get("anyOf") or schema.get("oneOf")
+            nullable = any(o.get("type") == "null" for o in options)
+            concrete = [o for o in options if o.get("type") != "null"]
+            if not concrete or (nullable and self.rng.random() < 0.2):
+                return None
+            return self._value(root, concrete[0], field)
+
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            props = schema.get("properties", {})
+            required = set(schema.get("required", props))
+            obj = {
+                key: self._value(root, sub, key)
+                for key, sub in props.items()
+                if key in required or self.rng.random() < 0.8
+            }
+            extra = schema.get("additionalProperties")
+            if not props and isinstance(extra, dict):
+                for name in self.rng.sample(self.names, min(2, len(self.names))):
+                    obj[name] = self._value(root, extra, field)
+            return obj
+        if kind == "array":
+            return [
+                self._value(root, schema.get("items", {}), field)
+                for _ in range(self.rng.randint(0, 2))
+            ]
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind in ("integer", "number"):
+            low = schema.get("minimum", 0)
+            high = schema.get("maximum", max(low, 1))
+            value = self.rng.uniform(low, high)
+            return int(value) if kind == "integer" else round(value, 3)
+        return self._text(field)
+
+    def _choice(self, options: list[Any]) -> Any:
+        # 投票/查验等不选自己，也尽量不弃权
+        preferred = [
+            o for o in options if o != self.self_name and o not in _ABSTAIN
+        ]
+        return self.rng.choice(preferred or options)
+
+    def _text(self, field: str) -> str:
+        target = self.rng.choice(self.names) if self.names else "大家"
+        if field == "speech":
+            return self.rng.choice([
+                f"我是好人，我觉得{target}的发言有些问题。",
+                f"目前信息不多，我先听听{target}怎么说。",
+                f"我比较信任{target}，建议大家关注其他人。",
+            ])
+        if field == "behavior":
+            return self.rng.choice(["语气平稳", "略显犹豫", "目光扫过众人", "手指轻敲桌面"])
+        if field == "thought":
+            return f"（模拟思考）根据目前的发言，{target}值得关注。"
+        if field == "knowledge":
+            return "（模拟经验）留意发言与投票不一致的玩家。"
+        return f"（模拟{field or '内容'}）关于{target}的分析。"
+
+    # ---------- 数据分析任务 ----------
+
+    def analysis(self, task: dict[str, Any]) -> dict[str, Any]:
+        required = task.get("required", {})
+        players = list(required.get("players") or self.names)
+        if task.get("task") == "psychology":
+            metrics = list(required.get("metrics", []))
+            stats_keys = required.get("analysisTexts", {}).get("stats_keys", [])
+            return {
+                "psychology": {
+                    "metrics": metrics,
+                    "players": {
+                        p: {m: round(self.rng.random(), 2) for m in metrics}
+                        for p in players
+                    },
+                },
+                "analysisTexts": {
+                    "stats": {k: self._section(k) for k in stats_keys},
+                    "players": {p: self._section(p) for p in players},
+                },
+            }
+        if task.get("task") == "network":
+            roles = self._roles_from_context(task.get("context"))
+            link_types = required.get("link_types", ["trust", "suspect", "ally"])
+            links = []
+            for _ in range(min(12, len(players) * 2)):
+                source, target = self.rng.sample(players, 2)
+                link_type = self.rng.choice(link_types)
+                value = round(self.rng.uniform(0.1, 1.0), 2)
+                links.append({
+                    "source": source,
+                    "target": target,
+                    "value": -value if link_type == "suspect" else value,
+                    "type": link_type,
+                })
+            return {
+                "network": {
+                    "nodes": [
+                        {"id": p, "group": roles.get(p, "villager"),
+                         "trust": round(self.rng.random(), 2)}
+                        for p in players
+                    ],
+                    "links": links,
+                },
+                "analysisTexts": {
+                    "network": {
+                        k: self._section(k)
+                        for k in required.get("analysisTexts", [])
+                    },
+                },
+            }
+        return {}
+
+    def _section(self, key: str) -> dict[str, str]:
+        title = _ANALYSIS_METRIC_TITLES.get(key, key)
+        return {"title": title, "content": f"（模拟分析）{title}整体平稳。"}
+
+    @staticmethod
+    def _roles_from_context(context: Any) -> dict[str, str]:
+        roles: dict[str, str] = {}
+        text = json.dumps(context, ensure_ascii=False) if context else ""
+        for name, role in re.findall(
+            r'"(Player\d+)"[^{}]*?"(werewolf|villager|seer|witch|hunter)"', text,
+        ):
+            roles.setdefault(name, role)
+        return roles
+
+
+def _find_analysis_task(text: str) -> dict[str, Any] | None:
+    """在提示词中查找数据分析任务的 JSON（含 "task" 字段）。"""
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            obj, _ = decoder.raw_decode(text, start)
+        except ValueError:
+            obj = None
+        if isinstance(obj, dict) and "task" in obj:
+            return obj
+        start = text.find("{", start + 1)
+    return None
+
+
+class MockChatModel(ChatModelBase):
+    """按 JSON Schema 生成合法输出的离线模拟模型。"""
+
+    def __init__(
+        self,
+        model_name: str = "mock",
+        seed: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        distribution: str = "fixed",
+    ) -> None:
+        super().__init__(model_name, stream=False)
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"不支持的延迟分布: {distribution}")
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+
+    async def __call__(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict] | None = None,
+        tool_choice: str | None = None,
+        structured_model: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        start = time.monotonic()
+        texts = [_text_of(m) for m in messages]
+        prompt = "\n".join(texts)
+        digest = hashlib.sha256(
+            f"{self.seed}|{self.model_name}|{prompt}".encode()).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+
+        system = next(
+            (t for m, t in zip(messages, texts) if m.get("role") == "system"), "")
+        match = _SELF_NAME.search(system)
+        gen = _Generator(
+            rng,
+            match.group(1) if match else None,
+            sorted(set(_PLAYER_NAME.findall(prompt))),
+        )
+
+        metadata = None
+        content: list = []
+        finish_tool = next(
+            (t["function"] for t in tools or []
+             if t.get("function", {}).get("name") == "generate_response"),
+            None,
+        )
+        if structured_model is not None:
+            metadata = gen.from_schema(structured_model.model_json_schema())
+            content.append(TextBlock(
+                type="text", text=json.dumps(metadata, ensure_ascii=False)))
+        elif finish_tool is not None and tool_choice != "none":
+            args = gen.from_schema(finish_tool.get("parameters", {}))
+            # 同时给出文本，ReAct 一轮即可结束
+            content.append(TextBlock(type="text", text=args.get("speech") or "..."))
+            content.append(ToolUseBlock(
+                type="tool_use", id=f"mock_{digest[:12]}",
+                name="generate_response", input=args,
+            ))
+        else:
+            task = _find_analysis_task(texts[-1] if texts else "")
+            text = (
+                json.dumps(gen.analysis(task), ensure_ascii=False)
+                if task else gen._text("speech")  # pylint: disable=protected-access
+            )
+            content.append(TextBlock(type="text", text=text))
+
+        await asyncio.sleep(
+            sample_latency(rng, self.latency, self.jitter, self.distribution))
+
+        output = "".join(
+            b.get("text", "") or json.dumps(b.get("input", {}), ensure_ascii=False)
+            for b in content
+        )
+        return ChatResponse(
+            content=content,
+            usage=ChatUsage(
+                # 粗略估算：约 2 个字符 1 个 token
+                input_tokens=len(prompt) // 2,
+                output_tokens=len(output) // 2,
+                time=time.monotonic() - start,
+            ),
+            metadata=metadata,
+        )
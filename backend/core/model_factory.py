@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""模型与格式化器的统一构建入口。
+
+玩家智能体与分析智能体都通过这里创建模型，依次套上：
+限流（core.rate_limiter）→ [端点池（core.endpoint_pool）] →
+重试与熔断（core.resilience）→ 请求对冲（core.hedging）→
+[按决策类型路由（core.model_router）] → [录制/回放（core.replay_cache）]。
+"""
+from typing import Any
+
+from agentscope.formatter import (
+    DashScopeMultiAgentFormatter,
+    OpenAIMultiAgentFormatter,
+    OllamaMultiAgentFormatter,
+)
+from agentscope.model import (
+    ChatModelBase,
+    DashScopeChatModel,
+    OpenAIChatModel,
+    OllamaChatModel,
+)
+
+from config import config
+from core.endpoint_pool import (
+    EndpointPool,
+    PoolMember,
+    PooledChatModel,
+    get_endpoint_pool,
+)
+from core.hedging import with_hedging
+from core.http_pool import get_http_client
+from core.mock_model import MockChatModel
+from core.model_router import RoutedChatModel
+from core.rate_limiter import with_rate_limit
+from core.replay_cache import with_replay
+from core.resilience import ResilientChatModel, with_resilience
+from core.usage import UsageTrackingChatModel
+
+
+def _resolve_api_key(provider: str, api_key: str | None) -> str | None:
+    if provider == "dashscope":
+        return api_key or config.dashscope_api_key
+    if provider == "openai":
+        return api_key or config.openai_api_key
+    return api_key
+
+
+def _raw_chat_model(
+    provider: str,
+    api_key: str | None,
+    model_name: str | None,
+    base_url: str | None,
+) -> ChatModelBase:
+    """创建提供商模型，并按对局统计 token 用量。"""
+    if provider == "dashscope":
+        return UsageTrackingChatModel(DashScopeChatModel(
+            api_key=_resolve_api_key(provider, api_key),
+            model_name=model_name or config.dashscope_model_name,
+        ))
+    if provider == "openai":
+        api_key = _resolve_api_key(provider, api_key)
+        base_url = base_url or config.openai_base_url
+        client_kwargs: dict[str, Any] = {"base_url": base_url}
+        if config.http_pool_enabled:
+            # 同一端点的玩家共享连接池，避免每个客户端单独握手
+            client_kwargs["http_client"] = get_http_client(
+                provider, base_url, api_key)
+        return UsageTrackingChatModel(OpenAIChatModel(
+            api_key=api_key,
+            model_name=model_name or config.openai_model_name,
+            client_kwargs=client_kwargs,
+        ))
+    if provider == "ollama":
+        return UsageTrackingChatModel(OllamaChatModel(
+            model_name=model_name or config.ollama_model_name,
+            host=base_url or config.ollama_host,
+            keep_alive=config.ollama_keep_alive,
+        ))
+    if provider == "mock":
+        return UsageTrackingChatModel(MockChatModel(
+            model_name=model_name or "mock",
+            seed=config.mock_seed,
+            latency=config.mock_latency,
+            jitter=config.mock_latency_jitter,
+            distribution=config.mock_latency_distribution,
+        ))
+    raise ValueError(f"不支持的模型提供商: {provider}")
+
+
+def _endpoint_key(provider: str, model_name: str, base_url: str | None) -> str:
+    return f"{provider}|{base_url or ''}|{model_name}"
+
+
+def _build_fallback() -> ResilientChatModel | None:
+    """按 FALLBACK_* 配置构建备用端点模型（自身不再有备用）。"""
+    cfg = config.fallback_model_config
+    if not cfg or not config.retry_enabled:
+        return None
+    raw = _raw_chat_model(
+        cfg["provider"], cfg["api_key"], cfg["model_name"], cfg["base_url"])
+    return ResilientChatModel(
+        with_rate_limit(
+            raw,
+            cfg["provider"],
+            _resolve_api_key(cfg["provider"], cfg["api_key"]),
+        ),
+        _endpoint_key(cfg["provider"], raw.model_name, cfg["base_url"]),
+    )
+
+
+def _hedged(model: ChatModelBase) -> ChatModelBase:
+    """加上请求对冲；HEDGE_TO_FALLBACK=true 时对冲请求发往备用端点。"""
+    hedge_model = _build_fallback() if config.hedge_to_fallback else None
+    return with_hedging(model, hedge_model)
+
+
+def _build_openai_pool() -> EndpointPool:
+    """按 OPENAI_POOL_* 配置构建端点池，每个成员有独立的限流器。"""
+    members = []
+    for idx, cfg in enumerate(config.openai_pool, start=1):
+        raw = _raw_chat_model(
+            "openai", cfg["api_key"], cfg["model_name"], cfg["base_url"])
+        members.append(PoolMember(
+            f"#{idx} {cfg['model_name']}@{cfg['base_url']} (...{cfg['api_key'][-4:]})",
+            with_rate_limit(raw, "openai", cfg["api_key"]),
+            weight=cfg["weight"],
+            rpm=cfg["rpm"],
+        ))
+    return EndpointPool(
+        members,
+        strategy=config.openai_pool_strategy,
+        cooldown=config.openai_pool_cooldown,
+    )
+
+
+def _tier_models(provider: str, hedged: bool) -> dict[str, ChatModelBase]:
+    """按 MODEL_ROUTES 为每种决策类型构建档位模型（同一档位只建一次）。"""
+    tiers: dict[str, ChatModelBase] = {}
+    routes: dict[str, ChatModelBase] = {}
+    for kind, tier in config.model_routes.items():
+        if tier not in tiers:
+            cfg = config.model_tier(tier)
+            tiers[tier] = _create_chat_model(
+                provider,
+                api_key=cfg["api_key"],
+                model_name=cfg["model_name"],
+                base_url=cfg["base_url"],
+                hedged=hedged,
+            )
+        routes[kind] = tiers[tier]
+    return routes
+
+
+def create_chat_model(
+    provider: str | None = None,
+    api_key: str | None = None,
+    model_name: str | None = None,
+    base_url: str | None = None,
+    hedged: bool = False,
+    pooled: bool = False,
+    routed: bool = False,
+) -> ChatModelBase:
+    """创建带限流、重试/熔断（及可选对冲）的聊天模型。
+
+    Args:
+        provider: 模型提供商，默认使用 MODEL_PROVIDER
+        api_key / model_name / base_url: 覆盖对应提供商的全局配置
+        hedged: 是否允许在并行阶段对慢请求发起对冲
+        pooled: OPENAI_PLAYER_MODE=pool 时是否改为从端点池按调用分流
+        routed: 是否按 MODEL_ROUTES 把部分决策类型交给其他档位的模型
+    """
+    # 录制/回放在最外层：回放命中时不经过限流、重试与路由
+    return with_replay(_create_chat_model(
+        provider, api_key, model_name, base_url,
+        hedged=hedged, pooled=pooled, routed=routed,
+    ))
+
+
+def _create_chat_model(
+    provider: str | None = None,
+    api_key: str | None = None,
+    model_name: str | None = None,
+    base_url: str | None = None,
+    hedged: bool = False,
+    pooled: bool = False,
+    routed: bool = False,
+) -> ChatModelBase:
+    provider = (provider or config.model_provider).lower()
+    if routed and config.model_routes:
+        return RoutedChatModel(
+            _create_chat_model(
+                provider, api_key, model_name, base_url,
+                hedged=hedged, pooled=pooled,
+            ),
+            _tier_models(provider, hedged),
+        )
+
+    if pooled and provider == "openai" and config.openai_player_mode == "pool":
+        # 重试在端点池外层进行，每次重试都可能换到另一个 Key
+        pool = get_endpoint_pool("openai", _build_openai_pool)
+        model = with_resilience(
+            PooledChatModel(pool),
+            _endpoint_key(provider, "pool", None),
+            _build_fallback(),
+        )
+        return _hedged(model) if hedged else model
+
+    raw = _raw_chat_model(provider, api_key, model_name, base_url)
+    model = with_rate_limit(raw, provider, _resolve_api_key(provider, api_key))
+    model = with_resilience(
+        model,
+        _endpoint_key(provider, raw.model_name, base_url),
+        _build_fallback(),
+    )
+    return _hedged(model) if hedged else model
+
+
+def create_formatter(provider: str | None = None) -> Any:
+    """创建与提供商匹配的多智能体格式化器。"""
+    provider = (provider or config.model_provider).lower()
+    if provider == "dashscope":
+        return DashScopeMultiAgentFormatter()
+    if provider in ("openai", "mock"):
+        return OpenAIMultiAgentFormatter()
+    if provider == "ollama":
+        return OllamaMultiAgentFormatter()
+    raise ValueError(f"不支持的模型提供商: {provider}")
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""按决策类型路由模型：把低风险的记录类调用交给便宜、快速的模型。
+
+`BaseRole.decide` 在调用模型前用 `decision_kind()` 标记当前决策类型，
+`RoutedChatModel` 据此在 MODEL_ROUTES 路由表中查找档位，未命中时使用
+玩家自身的模型。决策类型保存在 contextvar 中，并行的多个决策互不影响。
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+
+_DECISION_KIND: ContextVar[str | None] = ContextVar("decision_kind", default=None)
+
+
+@contextmanager
+def decision_kind(kind: str) -> Iterator[None]:
+    """在该上下文内发起的模型调用按 `kind` 路由。"""
+    token = _DECISION_KIND.set(kind)
+    try:
+        yield
+    finally:
+        _DECISION_KIND.reset(token)
+
+
+def current_decision_kind() -> str | None:
+    return _DECISION_KIND.get()
+
+
+class RoutedChatModel(ChatModelBase):
+    """按当前决策类型选择模型的包装器。"""
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        routes: dict[str, ChatModelBase],
+    ) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.routes = routes
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        model = self.routes.get(current_decision_kind() or "", self.model)
+        return await model(*args, **kwargs)
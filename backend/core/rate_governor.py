@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""跨进程限流：同一台机器上的多个对局/分析进程共享一个令牌桶。
+
+进程内限流器（core.rate_limiter）只能约束单个进程；同时启动多个
+`backend/main.py` 时，各进程叠加起来仍会超出提供商配额。这里把令牌桶
+状态存放在本地文件中，每次取令牌都在文件锁（POSIX 用 fcntl，Windows 用
+msvcrt）保护下读改写，保证同一 (提供商, API Key) 的总请求速率与每分钟
+token 用量不超过配置值。加锁与文件读写是阻塞操作，放到线程中执行，
+不阻塞事件循环上的其他对局。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+from config import config
+from core.usage import usage_of
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """对 `path` 加独占锁（阻塞等待）。"""
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileTokenBucket:
+    """基于文件锁的跨进程令牌桶，同时约束请求速率与每分钟 token 用量。
+
+    `rate` 为每秒请求数，`tokens_per_minute` 为每分钟 token 数，为 0 表示不限制。
+    token 用量在调用结束后按实际消耗扣除（可以透支），透支期间新请求等待。
+    """
+
+    POLL_INTERVAL = 0.05  # 最短等待间隔，避免忙等
+
+    def __init__(
+        self,
+        state_path: Path,
+        rate: float,
+        burst: float,
+        tokens_per_minute: float = 0.0,
+    ) -> None:
+        self.state_path = state_path
+        self.lock_path = state_path.with_suffix(".lock")
+        self.rate = max(rate, 0.0)
+        self.burst = max(burst, 1.0)
+        self.tokens_per_minute = max(tokens_per_minute, 0.0)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.total_wait = 0.0
+
+    def _load(self, now: float) -> dict[str, float]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        requests = float(state.get("requests", self.burst))
+        budget = float(state.get("token_budget", self.tokens_per_minute))
+        elapsed = max(now - float(state.get("updated_at", now)), 0.0)
+        return {
+            "requests": min(self.burst, requests + elapsed * self.rate),
+            "token_budget": min(
+                self.tokens_per_minute,
+                budget + elapsed * self.tokens_per_minute / 60,
+            ),
+            "updated_at": now,
+        }
+
+    def _save(self, state: dict[str, float]) -> None:
+        tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def _try_take(self) -> float:
+        """尝试取一个请求令牌，成功返回 0，否则返回建议等待的秒数（阻塞）。"""
+        with _file_lock(self.lock_path):
+            now = time.time()
+            state = self._load(now)
+            wait = 0.0
+            if self.rate and state["requests"] < 1:
+                wait = (1 - state["requests"]) / self.rate
+            if self.tokens_per_minute and state["token_budget"] < 0:
+                wait = max(
+                    wait,
+                    -state["token_budget"] * 60 / self.tokens_per_minute,
+                )
+            if not wait:
+                state["requests"] -= 1
+            self._save(state)
+            return wait
+
+    async def acquire(self) -> None:
+        """等待直到取得一个请求令牌。"""
+        start = time.monotonic()
+        while True:
+            wait = await asyncio.to_thread(self._try_take)
+            if not wait:
+                break
+            await asyncio.sleep(max(wait, self.POLL_INTERVAL))
+        self.total_wait += time.monotonic() - start
+
+    async def record_usage(self, tokens: int) -> None:
+        """按实际消耗扣除 token 预算。"""
+        if not self.tokens_per_minute or tokens <= 0:
+            return
+        await asyncio.to_thread(self._deduct, tokens)
+
+    def _deduct(self, tokens: int) -> None:
+        with _file_lock(self.lock_path):
+            state = self._load(time.time())
+            state["token_budget"] -= tokens
+            self._save(state)
+
+
+_GOVERNORS: dict[tuple[str, str], FileTokenBucket] = {}
+
+
+def get_rate_governor(provider: str, api_key: str | None = None) -> FileTokenBucket:
+    """按 (提供商, API Key) 获取跨进程令牌桶；状态文件名为两者的哈希。"""
+
+    key = (provider, api_key or "")
+    governor = _GOVERNORS.get(key)
+    if governor is None:
+        digest = hashlib.sha256(f"{provider}|{api_key or ''}".encode()).hexdigest()
+        settings = config.rate_governor_settings(provider)
+        governor = FileTokenBucket(
+            Path(config.rate_governor_dir) / f"{provider}-{digest[:16]}.json",
+            rate=settings["rps"],
+            burst=settings["burst"],
+            tokens_per_minute=settings["tpm"],
+        )
+        _GOVERNORS[key] = governor
+    return governor
+
+
+def reset_rate_governors() -> None:
+    """丢弃所有跨进程令牌桶对象（状态文件保留），之后按当前配置重新创建。"""
+    _GOVERNORS.clear()
+
+
+class GovernedChatModel(ChatModelBase):
+    """调用前向跨进程令牌桶取令牌，调用后登记 token 用量。"""
+
+    def __init__(self, model: ChatModelBase, governor: FileTokenBucket) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.governor = governor
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        await self.governor.acquire()
+        res = await self.model(*args, **kwargs)
+        if isinstance(res, AsyncGenerator):
+            return self._stream_and_record(res)
+        await self.governor.record_usage(sum(usage_of(res)))
+        return res
+
+    async def _stream_and_record(self, res: AsyncGenerator) -> AsyncGenerator:
+        last = None
+        try:
+            async for chunk in res:
+                last = chunk
+                yield chunk
+        finally:
+            # 流式响应的用量在最后一个分块中
+            await self.governor.record_usage(sum(usage_of(last)))
+
+
+def with_rate_governor(
+    model: ChatModelBase,
+    provider: str,
+    api_key: str | None = None,
+) -> ChatModelBase:
+    """为模型接入跨进程令牌桶；未启用或该提供商不限制时原样返回。"""
+
+    if not config.rate_governor_enabled:
+        return model
+    settings = config.rate_governor_settings(provider)
+    if not settings["rps"] and not settings["tpm"]:
+        return model
+    return GovernedChatModel(model, get_rate_governor(provider, api_key))
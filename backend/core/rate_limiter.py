@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+"""模型调用限流：按 (提供商, API Key) 共享的自适应令牌桶。
+
+所有智能体的模型调用都通过 `RateLimitedChatModel` 进入同一个限流器，
+由令牌桶控制请求速率、由并发上限控制在途请求数。遇到 429 或延迟尖峰时
+按乘性减少速率与并发，成功调用后再逐步线性恢复（AIMD）。
+
+并发槽位按优先级分配：关键路径请求（白天发言、投票等决定对局时长的调用）
+优先取得槽位；后台请求（反思、知识更新、总结、分析）只在没有关键请求
+排队时使用剩余槽位，并且不占用为关键路径保留的槽位。优先级默认由决策
+类型决定，也可以用 `request_priority` 为一组后台任务绑定可变的优先级：
+推测性的调用以后台优先级启动，一旦关键路径开始等待它就提升为关键。
+"""
+import asyncio
+import re
+import time
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+from config import config
+from core.model_router import current_decision_kind
+from core.rate_governor import with_rate_governor
+
+
+CRITICAL = "critical"
+BACKGROUND = "background"
+PRIORITY_LABELS = {CRITICAL: "关键", BACKGROUND: "后台"}
+
+
+def current_priority() -> str:
+    """根据当前决策类型判断请求优先级。"""
+    kind = current_decision_kind()
+    if kind and kind in config.background_decision_kinds:
+        return BACKGROUND
+    return CRITICAL
+
+
+class RequestPriority:
+    """一组请求共享的可变优先级。
+
+    `level` 为 None 时按决策类型判断；`promote` 之后这组请求（含已在
+    限流器中排队的）都按关键优先级调度。
+    """
+
+    def __init__(self, level: str | None = None) -> None:
+        self.level = level
+        # 当前有本组请求在排队的限流器，提升时需要唤醒它们重新判断
+        self.queued_in: set["AdaptiveRateLimiter"] = set()
+
+    def promote(self) -> None:
+        if self.level == CRITICAL:
+            return
+        self.level = CRITICAL
+        for limiter in self.queued_in:
+            limiter.wake()
+
+    def resolve(self, default: str) -> str:
+        return self.level or default
+
+
+_REQUEST_PRIORITY: ContextVar[RequestPriority | None] = ContextVar(
+    "request_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[RequestPriority]:
+    """在该作用域内（含其中创建的任务）发出的模型调用使用 `priority`。"""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield priority
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+def _format_waits(queue_wait: dict[str, "QueueWaitStats"]) -> str:
+    parts = []
+    for priority, stats in queue_wait.items():
+        data = stats.as_dict()
+        if data["count"]:
+            parts.append(
+                f"{PRIORITY_LABELS[priority]} {data['count']} 次，"
+                f"平均等待 {data['avg_wait']:.2f}s，最长 {data['max_wait']:.2f}s"
+            )
+    return "；".join(parts)
+
+
+class QueueWaitStats:
+    """某一优先级的排队等待统计。"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_wait": round(self.total_wait / self.count, 3) if self.count else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+
+class GameQueueWaits:
+    """一局游戏内各限流器的排队等待统计。
+
+    限流器在同一进程的多局之间共享，其自身的统计是进程级的；这里只记录
+    当前对局发出的请求，供写入本局日志。
+    """
+
+    def __init__(self) -> None:
+        self.by_limiter: dict[str, dict[str, QueueWaitStats]] = {}
+
+    def record(self, label: str, priority: str, wait: float) -> None:
+        waits = self.by_limiter.setdefault(
+            label, {CRITICAL: QueueWaitStats(), BACKGROUND: QueueWaitStats()})
+        waits[priority].record(wait)
+
+    def summaries(self) -> list[str]:
+        lines = []
+        for label, waits in self.by_limiter.items():
+            summary = _format_waits(waits)
+            if summary:
+                lines.append(f"限流排队 {label}: {summary}")
+        return lines
+
+
+_QUEUE_WAITS: ContextVar[GameQueueWaits | None] = ContextVar(
+    "queue_waits", default=None)
+
+
+def new_queue_waits() -> GameQueueWaits:
+    """为当前对局创建独立的排队等待统计，并绑定到当前上下文。"""
+    waits = GameQueueWaits()
+    _QUEUE_WAITS.set(waits)
+    return waits
+
+
+# DashScope 把响应整体放进异常文本，只解析其中的状态码字段
+_STATUS_CODE_TEXT = re.compile(r"status_code['\"]?\s*[:=]\s*(\d{3})")
+
+
+def status_code_of(exc: BaseException) -> int | None:
+    """取异常携带的 HTTP 状态码（属性或 DashScope 文本中的 status_code 字段）。"""
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status
+    match = _STATUS_CODE_TEXT.search(str(exc))
+    return int(match.group(1)) if match else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """判断异常是否为提供商返回的限流错误（HTTP 429 或 SDK 的 RateLimitError）。"""
+
+    if status_code_of(exc) == 429:
+        return True
+    return any(cls.__name__ == "RateLimitError" for cls in type(exc).__mro__)
+
+
+class AdaptiveRateLimiter:
+    """令牌桶 + 最大在途请求数的自适应限流器。
+
+    `rate` 为 0 表示不限速，`max_concurrency` 为 0 表示不限制并发，
+    两者都为 0 时 `acquire` 直接返回，本地模型可以全速运行。
+    """
+
+    BACKOFF_ON_429 = 0.5  # 429 时速率/并发减半
+    BACKOFF_ON_SPIKE = 0.8  # 延迟尖峰时速率/并发降为 80%
+    RECOVERY_STEP = 0.05  # 每次成功恢复上限速率的 5%
+    LATENCY_ALPHA = 0.2  # 延迟 EWMA 平滑系数
+    MIN_LATENCY_SAMPLES = 5  # 样本不足时不判断尖峰
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_concurrency: int,
+        latency_spike_factor: float = 3.0,
+        min_rate: float = 0.2,
+        critical_reserve: int = 0,
+        label: str = "",
+    ) -> None:
+        self.label = label
+        self.max_rate = max(rate, 0.0)
+        self.rate = self.max_rate
+        self.min_rate = min(min_rate, self.max_rate) if self.max_rate else 0.0
+        self.burst = max(burst, 1.0)
+        self.max_concurrency = max(max_concurrency, 0)
+        self.concurrency = self.max_concurrency
+        self.latency_spike_factor = latency_spike_factor
+        self.critical_reserve = max(critical_reserve, 0)
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._successes = 0
+        self._latency_ewma: float | None = None
+        self._latency_samples = 0
+        # 条件变量绑定在事件循环上，首次使用时按当前循环创建
+        self._cond: asyncio.Condition | None = None
+        self._cond_loop: asyncio.AbstractEventLoop | None = None
+        self._waiting = {CRITICAL: 0, BACKGROUND: 0}
+        self._wakeups: set[asyncio.Task] = set()
+        self.queue_wait = {CRITICAL: QueueWaitStats(), BACKGROUND: QueueWaitStats()}
+
+        # 统计信息
+        self.total_requests = 0
+        self.rate_limited = 0
+        self.latency_spikes = 0
+
+    @property
+    def unlimited(self) -> bool:
+        """是否既不限速也不限制并发。"""
+        return not self.max_rate and not self.max_concurrency
+
+    def _condition(self) -> asyncio.Condition:
+        """返回绑定当前事件循环的条件变量。
+
+        限流器在进程内共享，而脚本可能多次调用 `asyncio.run`；换了事件循环时
+        重建条件变量，旧循环中的在途与排队计数随之作废。
+        """
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+            self._in_flight = 0
+            self._waiting = {CRITICAL: 0, BACKGROUND: 0}
+        return self._cond
+
+    def wake(self) -> None:
+        """唤醒所有排队者重新判断能否取得槽位（如排队中的请求被提升优先级）。"""
+        task = asyncio.get_running_loop().create_task(self._notify_all())
+        self._wakeups.add(task)
+        task.add_done_callback(self._wakeups.discard)
+
+    async def _notify_all(self) -> None:
+        cond = self._condition()
+        async with cond:
+            cond.notify_all()
+
+    def _slot_available(self, priority: str) -> bool:
+        if self._in_flight >= self.concurrency:
+            return False
+        if priority == CRITICAL:
+            return True
+        # 后台请求让出给排队中的关键请求，并且不占用保留槽位（至少留 1 个给后台）
+        reserve = min(self.critical_reserve, self.concurrency - 1)
+        return (
+            not self._waiting[CRITICAL]
+            and self._in_flight < self.concurrency - reserve
+        )
+
+    async def acquire(
+        self,
+        priority: str = CRITICAL,
+        override: RequestPriority | None = None,
+    ) -> None:
+        """按优先级占用一个并发槽位并取得一个令牌，必要时等待。
+
+        `override` 为可变优先级，排队期间被提升时按新的优先级继续排队。
+        """
+
+        self.total_requests += 1
+        level = override.resolve(priority) if override else priority
+        if self.unlimited:
+            self._record_wait(level, 0.0)
+            return
+
+        start = time.monotonic()
+        if self.max_concurrency:
+            cond = self._condition()
+
+            def ready() -> bool:
+                nonlocal level
+                current = override.resolve(priority) if override else priority
+                if current != level:
+                    self._waiting[level] -= 1
+                    self._waiting[current] += 1
+                    level = current
+                return self._slot_available(level)
+
+            async with cond:
+                self._waiting[level] += 1
+                if override:
+                    override.queued_in.add(self)
+                try:
+                    await cond.wait_for(ready)
+                finally:
+                    if override:
+                        override.queued_in.discard(self)
+                    self._waiting[level] -= 1
+                    # 关键请求离开队列后，被挡住的后台请求可能可以继续
+                    cond.notify_all()
+                self._in_flight += 1
+
+        if self.max_rate:
+            # 先预留令牌（允许为负），再按欠额睡眠，保证排队顺序且无惊群
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._last_refill) * self.rate,
+            )
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                try:
+                    await asyncio.sleep(-self._tokens / self.rate)
+                except asyncio.CancelledError:
+                    await self._release_slot()
+                    raise
+        self._record_wait(level, time.monotonic() - start)
+
+    def _record_wait(self, priority: str, wait: float) -> None:
+        self.queue_wait[priority].record(wait)
+        game_waits = _QUEUE_WAITS.get()
+        if game_waits is not None:
+            game_waits.record(self.label, priority, wait)
+
+    async def release(
+        self,
+        latency: float | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """归还并发槽位，并根据本次调用结果调整速率。"""
+
+        if self.unlimited:
+            return
+
+        if error is not None and is_rate_limit_error(error):
+            self.rate_limited += 1
+            self._backoff(self.BACKOFF_ON_429)
+        elif error is None and latency is not None:
+            self._observe_latency(latency)
+
+        await self._release_slot()
+
+    async def _release_slot(self) -> None:
+        if self.max_concurrency:
+            cond = self._condition()
+            async with cond:
+                self._in_flight = max(self._in_flight - 1, 0)
+                cond.notify_all()
+
+    def _observe_latency(self, latency: float) -> None:
+        """更新延迟 EWMA，尖峰时退避，否则线性恢复。"""
+
+        ewma = self._latency_ewma
+        self._latency_samples += 1
+        if (
+            ewma is not None
+            and self._latency_samples > self.MIN_LATENCY_SAMPLES
+            and latency > ewma * self.latency_spike_factor
+        ):
+            self.latency_spikes += 1
+            self._backoff(self.BACKOFF_ON_SPIKE)
+        else:
+            self._recover()
+
+        if ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma = (
+                self.LATENCY_ALPHA * latency + (1 - self.LATENCY_ALPHA) * ewma
+            )
+
+    def _backoff(self, factor: float) -> None:
+        # 默认不限速时只有并发窗口可调，尖峰与 429 都要收缩并发才有效果
+        self._successes = 0
+        if self.max_rate:
+            self.rate = max(self.min_rate, self.rate * factor)
+        if self.max_concurrency:
+            self.concurrency = max(1, int(self.concurrency * factor))
+
+    def _recover(self) -> None:
+        if self.max_rate and self.rate < self.max_rate:
+            self.rate = min(
+                self.max_rate,
+                self.rate + self.max_rate * self.RECOVERY_STEP,
+            )
+        if self.max_concurrency and self.concurrency < self.max_concurrency:
+            # 类似拥塞窗口：连续成功 concurrency 次后才放开一个槽位
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency += 1
+
+    def stats(self) -> dict[str, Any]:
+        """返回当前限流状态，便于日志与调试。"""
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "concurrency": self.concurrency,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "total_requests": self.total_requests,
+            "rate_limited": self.rate_limited,
+            "latency_spikes": self.latency_spikes,
+            "queue_wait": {
+                priority: stats.as_dict()
+                for priority, stats in self.queue_wait.items()
+            },
+        }
+
+    def summary(self) -> str:
+        """返回各优先级的排队等待摘要。"""
+        return _format_waits(self.queue_wait)
+
+
+_LIMITERS: dict[tuple[str, str], AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str, api_key: str | None = None) -> AdaptiveRateLimiter:
+    """按 (提供商, API Key) 获取共享限流器，不存在则按配置创建。"""
+
+    key = (provider, api_key or "")
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        settings = config.rate_limit_settings(provider)
+        limiter = AdaptiveRateLimiter(
+            rate=settings["rps"],
+            burst=settings["burst"],
+            max_concurrency=int(settings["max_concurrency"]),
+            latency_spike_factor=settings["latency_spike_factor"],
+            critical_reserve=config.rate_limit_critical_reserve,
+            label=_limiter_label(provider, api_key or ""),
+        )
+        _LIMITERS[key] = limiter
+    return limiter
+
+
+def reset_rate_limiters() -> None:
+    """丢弃所有共享限流器，之后按当前配置重新创建。"""
+    _LIMITERS.clear()
+
+
+def _limiter_label(provider: str, api_key: str) -> str:
+    """日志中的限流器名称（API Key 已脱敏）。"""
+    return f"{provider} (...{api_key[-4:]})" if api_key else provider
+
+
+def limiter_summaries() -> list[str]:
+    """返回所有限流器在本进程内的排队等待摘要。
+
+    单局日志应使用 `new_queue_waits` 返回的本局统计，这里汇总的是同一
+    进程内所有对局的请求。
+    """
+    lines = []
+    for limiter in _LIMITERS.values():
+        summary = limiter.summary()
+        if summary:
+            lines.append(f"限流排队 {limiter.label}: {summary}")
+    return lines
+
+
+class RateLimitedChatModel(ChatModelBase):
+    """在任意 ChatModel 外层套上限流器的包装模型。"""
+
+    def __init__(self, model: ChatModelBase, limiter: AdaptiveRateLimiter) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.limiter = limiter
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        await self.limiter.acquire(current_priority(), _REQUEST_PRIORITY.get())
+        start = time.monotonic()
+        try:
+            res = await self.model(*args, **kwargs)
+        except BaseException as exc:
+            await self.limiter.release(error=exc)
+            raise
+
+        if isinstance(res, AsyncGenerator):
+            # 流式响应在消费完毕后才释放槽位
+            return self._stream_and_release(res, start)
+
+        await self.limiter.release(latency=time.monotonic() - start)
+        return res
+
+    async def _stream_and_release(
+        self,
+        res: AsyncGenerator,
+        start: float,
+    ) -> AsyncGenerator:
+        error: BaseException | None = None
+        try:
+            async for chunk in res:
+                yield chunk
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            await self.limiter.release(
+                latency=time.monotonic() - start,
+                error=error,
+            )
+
+
+def with_rate_limit(
+    model: ChatModelBase,
+    provider: str,
+    api_key: str | None = None,
+) -> ChatModelBase:
+    """为模型套上共享限流器；关闭限流时原样返回。
+
+    启用跨进程限流时，先在进程内取得并发槽位，再向跨进程令牌桶取令牌。
+    """
+
+    model = with_rate_governor(model, provider, api_key)
+    if not config.rate_limit_enabled:
+        return model
+    return RateLimitedChatModel(model, get_rate_limiter(provider, api_key))
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""模型响应的录制与回放：重跑一局游戏时不再调用真实模型。
+
+REPLAY_MODE=record 时，每次模型调用的请求（消息、工具/结构化 Schema、
+模型名）与响应都写入本地的内容寻址存储；REPLAY_MODE=replay 时按请求指纹
+直接返回录制的响应，重跑免费、即时且逐字节一致。
+
+指纹是请求内容的 SHA-256。同一局里完全相同的请求可能出现多次（如重试），
+因此存储键为 (指纹, 该指纹在本局中的第几次出现)。出现次数与命中统计保存在
+contextvar 中，`werewolves_game` 开局时调用 `new_replay_stats()`，
+同一进程并发的多局互不干扰。回放时提示词一旦与录制时不同（例如修改了
+提示词或引擎逻辑）就会未命中：默认报错，开启 REPLAY_FALLTHROUGH 时改为
+调用真实模型并补录。
+"""
+import hashlib
+import json
+import os
+from collections import defaultdict
+from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.model._model_usage import ChatUsage
+
+from config import config
+
+
+class ReplayMissError(LookupError):
+    """回放模式下请求未被录制，且未开启 REPLAY_FALLTHROUGH。"""
+
+
+@dataclass
+class ReplayStats:
+    """一局游戏内的录制/回放统计。"""
+
+    hits: int = 0  # 回放命中
+    misses: int = 0  # 回放未命中
+    recorded: int = 0  # 新写入存储的响应数
+    live: int = 0  # 实际调用真实模型的次数
+    occurrences: dict[str, int] = field(
+        default_factory=lambda: defaultdict(int), repr=False)
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+            "live": self.live,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"命中 {self.hits} 次，未命中 {self.misses} 次，"
+            f"调用真实模型 {self.live} 次，录制 {self.recorded} 条"
+        )
+
+
+_REPLAY_STATS: ContextVar[ReplayStats | None] = ContextVar(
+    "replay_stats", default=None)
+# 不在对局中的调用（如赛后分析）计入进程级统计
+_PROCESS_STATS = ReplayStats()
+
+
+def new_replay_stats() -> ReplayStats:
+    """为当前对局创建新的录制/回放统计，并绑定到当前上下文。"""
+    stats = ReplayStats()
+    _REPLAY_STATS.set(stats)
+    return stats
+
+
+def current_replay_stats() -> ReplayStats:
+    return _REPLAY_STATS.get() or _PROCESS_STATS
+
+
+def request_fingerprint(
+    model_name: str,
+    messages: Any,
+    tools: Any = None,
+    tool_choice: Any = None,
+    structured_model: Any = None,
+) -> str:
+    """计算请求指纹：模型名、消息、工具与结构化 Schema 的规范化 JSON 的 SHA-256。"""
+    schema = (
+        structured_model.model_json_schema()
+        if structured_model is not None else None
+    )
+    canonical = json.dumps(
+        {
+            "model_name": model_name,
+            "messages": messages,
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "structured_model": schema,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _dump_response(res: ChatResponse) -> dict[str, Any]:
+    return {
+        "content": list(res.content),
+        "id": res.id,
+        "created_at": res.created_at,
+        "usage": {
+            "input_tokens": res.usage.input_tokens,
+            "output_tokens": res.usage.output_tokens,
+            "time": res.usage.time,
+        } if res.usage else None,
+        "metadata": res.metadata,
+    }
+
+
+def _load_response(data: dict[str, Any]) -> ChatResponse:
+    usage = data.get("usage")
+    return ChatResponse(
+        content=data["content"],
+        id=data["id"],
+        created_at=data["created_at"],
+        usage=ChatUsage(**usage) if usage else None,
+        metadata=data.get("metadata"),
+    )
+
+
+class ReplayStore:
+    """内容寻址的响应存储：`<root>/<指纹前两位>/<指纹>.<出现次数>.json`。"""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, fingerprint: str, occurrence: int) -> Path:
+        return self.root / fingerprint[:2] / f"{fingerprint}.{occurrence}.json"
+
+    def get(self, fingerprint: str, occurrence: int) -> ChatResponse | None:
+        try:
+            data = json.loads(
+                self._path(fingerprint, occurrence).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return _load_response(data["response"])
+
+    def put(
+        self,
+        fingerprint: str,
+        occurrence: int,
+        request: dict[str, Any],
+        res: ChatResponse,
+    ) -> None:
+        path = self._path(fingerprint, occurrence)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "fingerprint": fingerprint,
+                    "occurrence": occurrence,
+                    # 保存请求原文，便于排查回放未命中时提示词的差异
+                    "request": request,
+                    "response": _dump_response(res),
+                },
+                ensure_ascii=False,
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+
+class ReplayChatModel(ChatModelBase):
+    """按 REPLAY_MODE 录制或回放被包装模型的响应。"""
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        store: ReplayStore,
+        mode: str,
+        fallthrough: bool = False,
+    ) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.store = store
+        self.mode = mode
+        self.fallthrough = fallthrough
+
+    async def __call__(
+        self,
+        messages: Any,
+        tools: Any = None,
+        tool_choice: Any = None,
+        structured_model: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        fingerprint = request_fingerprint(
+            self.model_name, messages, tools, tool_choice, structured_model)
+        stats = current_replay_stats()
+        # 出现次数在发起请求时就确定，不受响应返回顺序影响
+        occurrence = stats.occurrences[fingerprint]
+        stats.occurrences[fingerprint] += 1
+
+        if self.mode == "replay":
+            cached = self.store.get(fingerprint, occurrence)
+            if cached is not None:
+                stats.hits += 1
+                return self._stream(cached) if self.stream else cached
+            stats.misses += 1
+            if not self.fallthrough:
+                raise ReplayMissError(
+                    f"回放未命中: {self.model_name} 请求 {fingerprint[:12]}"
+                    f"（第 {occurrence + 1} 次出现）未被录制")
+
+        stats.live += 1
+        res = await self.model(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            structured_model=structured_model,
+            **kwargs,
+        )
+        request = {
+            "model_name": self.model_name,
+            "messages": messages,
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "structured_model": getattr(structured_model, "__name__", None),
+        }
+        if isinstance(res, AsyncGenerator):
+            return self._record_stream(res, fingerprint, occurrence, request)
+        self._save(fingerprint, occurrence, request, res)
+        return res
+
+    def _save(
+        self,
+        fingerprint: str,
+        occurrence: int,
+        request: dict[str, Any],
+        res: ChatResponse | None,
+    ) -> None:
+        if res is None:
+            return
+        self.store.put(fingerprint, occurrence, request, res)
+        current_replay_stats().recorded += 1
+
+    async def _record_stream(
+        self,
+        res: AsyncGenerator,
+        fingerprint: str,
+        occurrence: int,
+        request: dict[str, Any],
+    ) -> AsyncGenerator:
+        last = None
+        async for chunk in res:
+            last = chunk
+            yield chunk
+        # 流式分块是累积的，最后一个分块即完整响应；中途取消时不录制
+        self._save(fingerprint, occurrence, request, last)
+
+    @staticmethod
+    async def _stream(res: ChatResponse) -> AsyncGenerator:
+        yield res
+
+
+def with_replay(model: ChatModelBase) -> ChatModelBase:
+    """按 REPLAY_MODE 为模型接入录制/回放；未启用时原样返回。"""
+
+    mode = config.replay_mode
+    if mode == "off":
+        return model
+    return ReplayChatModel(
+        model,
+        ReplayStore(config.replay_dir),
+        mode,
+        fallthrough=config.replay_fallthrough,
+    )
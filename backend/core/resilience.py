@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""模型调用容错：带抖动的指数退避重试、重试预算与按端点的熔断器。
+
+`ResilientChatModel` 包在限流器外层，每次重试都会重新经过限流。
+瞬时错误（429、5xx、超时、连接中断）按“完全抖动”的指数退避重试；
+重试次数受全局重试预算约束，避免故障时重试放大流量。同一端点连续失败
+达到阈值后熔断，冷却后放行一次探测请求；熔断期间改走备用端点，未配置
+备用端点时等待探测结果，而不是让所有在途调用立即失败。429 由限流器
+负责退避，不计入熔断。
+"""
+import asyncio
+import random
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+from config import config
+from core.rate_limiter import is_rate_limit_error, status_code_of
+
+
+class CircuitOpenError(RuntimeError):
+    """端点处于熔断状态且没有可用的备用端点。"""
+
+
+_RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# 各 SDK 的传输层异常（按类名匹配，含子类），无需导入可选依赖
+_TRANSIENT_ERROR_TYPES = {
+    "APIConnectionError",  # openai（含 APITimeoutError）
+    "TimeoutException",  # httpx 各类超时
+    "NetworkError",  # httpx 连接/读写错误
+    "RemoteProtocolError",  # httpx 连接被对端中途关闭
+    "ClientConnectionError",  # aiohttp
+    "ServerTimeoutError",  # aiohttp
+}
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """判断异常是否为值得重试的瞬时错误。
+
+    只看异常类型与 HTTP 状态码，不在异常文本里匹配关键词：模型输出或参数
+    错误的提示中同样可能出现 “connection”、“timeout” 之类的字样。
+    """
+
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = status_code_of(exc)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    if any(cls.__name__ in _TRANSIENT_ERROR_TYPES for cls in type(exc).__mro__):
+        return True
+    return is_rate_limit_error(exc)
+
+
+class RetryBudget:
+    """重试预算：每次请求存入 `ratio` 个令牌，每次重试取出一个。
+
+    保证重试量不超过正常请求量的 `ratio` 倍（另有 `min_tokens` 的初始额度），
+    端点整体故障时快速停止重试。
+    """
+
+    def __init__(self, ratio: float, min_tokens: float = 10.0) -> None:
+        self.ratio = max(ratio, 0.0)
+        self.max_tokens = max(min_tokens, 1.0)
+        self._tokens = self.max_tokens
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.retries += 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+class CircuitBreaker:
+    """单个端点的熔断器（closed → open → half-open → closed）。"""
+
+    def __init__(self, failure_threshold: int, recovery_time: float) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_time = recovery_time
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """当前是否允许向该端点发送请求。"""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.recovery_time:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        # 半开状态只放行一个探测请求
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        """熔断状态下距离放行探测请求还需等待的秒数。"""
+        if self.state != "open":
+            return 0.0
+        return max(self.recovery_time - (time.monotonic() - self._opened_at), 0.0)
+
+    def release_probe(self) -> None:
+        """探测请求被取消时归还探测名额。"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BUDGET: RetryBudget | None = None
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """按端点获取共享熔断器，同一端点的所有玩家共用健康状态。"""
+    breaker = _BREAKERS.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            config.circuit_failure_threshold,
+            config.circuit_recovery_time,
+        )
+        _BREAKERS[endpoint] = breaker
+    return breaker
+
+
+def get_retry_budget() -> RetryBudget:
+    """获取进程内共享的重试预算。"""
+    global _BUDGET  # pylint: disable=global-statement
+    if _BUDGET is None:
+        _BUDGET = RetryBudget(config.retry_budget_ratio)
+    return _BUDGET
+
+
+def reset_resilience() -> None:
+    """丢弃所有熔断器与重试预算，之后按当前配置重新创建。"""
+    global _BUDGET  # pylint: disable=global-statement
+    _BREAKERS.clear()
+    _BUDGET = None
+
+
+class ResilientChatModel(ChatModelBase):
+    """为模型调用加上重试、重试预算与熔断，并在主端点不可用时切换备用端点。
+
+    流式响应在取得第一个分块前出错可以重试；之后的错误只记录并向上抛出。
+    """
+
+    PROBE_POLL_INTERVAL = 0.1  # 等待其他调用的探测结果时的最短轮询间隔
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        endpoint: str,
+        fallback: "ResilientChatModel | None" = None,
+    ) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.endpoint = endpoint
+        self.fallback = fallback
+        self.breaker = get_circuit_breaker(endpoint)
+        self.budget = get_retry_budget()
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.budget.deposit()
+        attempt = 0
+        open_waits = 0
+        last_error: Exception | None = None
+        while True:
+            if not self.breaker.allow():
+                if self.fallback is not None:
+                    return await self._route_to_fallback(args, kwargs, last_error)
+                # 没有备用端点：等到冷却结束或探测有结果再试。每经历一次熔断
+                # 计一次，探测反复失败时最终放弃
+                if self.breaker.state == "open":
+                    open_waits += 1
+                    if open_waits > config.retry_max_attempts:
+                        return await self._route_to_fallback(args, kwargs, last_error)
+                await asyncio.sleep(
+                    self.breaker.retry_after()
+                    + max(self._backoff(1), self.PROBE_POLL_INTERVAL))
+                continue
+
+            try:
+                res = await self._attempt(args, kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as exc:  # pylint: disable=broad-except
+                if not is_retryable_error(exc):
+                    # 不是端点故障（如参数错误），不计入熔断；半开时只归还
+                    # 探测名额，不能据此判断端点已恢复
+                    self.breaker.release_probe()
+                    raise
+                if is_rate_limit_error(exc):
+                    # 端点在线，只是超出配额：由限流器退避，不计入熔断
+                    self.breaker.release_probe()
+                else:
+                    self.breaker.record_failure()
+                last_error = exc
+                attempt += 1
+                if (
+                    attempt > config.retry_max_attempts
+                    or not self.budget.try_withdraw()
+                    or (self.breaker.state == "open" and self.fallback is not None)
+                ):
+                    return await self._route_to_fallback(args, kwargs, exc)
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            self.breaker.record_success()
+            return res
+
+    async def _attempt(self, args: tuple, kwargs: dict) -> Any:
+        res = await self.model(*args, **kwargs)
+        if not isinstance(res, AsyncGenerator):
+            return res
+        # 先取第一个分块，连接阶段的错误仍可重试
+        try:
+            first = await res.__anext__()
+        except StopAsyncIteration:
+            return self._chain(None, res)
+        return self._chain(first, res)
+
+    async def _chain(self, first: Any, res: AsyncGenerator) -> AsyncGenerator:
+        if first is not None:
+            yield first
+        try:
+            async for chunk in res:
+                yield chunk
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            if is_retryable_error(exc) and not is_rate_limit_error(exc):
+                self.breaker.record_failure()
+            raise
+
+    async def _route_to_fallback(
+        self,
+        args: tuple,
+        kwargs: dict,
+        error: Exception | None,
+    ) -> Any:
+        if self.fallback is not None:
+            return await self.fallback(*args, **kwargs)
+        if error is not None:
+            raise error
+        raise CircuitOpenError(f"模型端点 {self.endpoint} 已熔断，且未配置备用端点")
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """完全抖动：在 [0, min(上限, 基数 * 2^attempt)] 内均匀取值。"""
+        ceiling = min(
+            config.retry_max_delay,
+            config.retry_base_delay * (2 ** (attempt - 1)),
+        )
+        return random.uniform(0, ceiling)
+
+
+def with_resilience(
+    model: ChatModelBase,
+    endpoint: str,
+    fallback: ResilientChatModel | None = None,
+) -> ChatModelBase:
+    """为模型加上重试与熔断；关闭容错时原样返回。"""
+
+    if not config.retry_enabled:
+        return model
+    return ResilientChatModel(model, endpoint, fallback)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""按对局统计模型 token 用量。
+
+用量统计对象保存在 contextvar 中：`werewolves_game` 开局时调用
+`new_usage_stats()`，同一事件循环里并发的多局各自累计、互不干扰。
+对冲产生的副本请求同样计入，反映真实消耗。
+"""
+from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from agentscope.model import ChatModelBase
+
+
+@dataclass
+class TokenUsage:
+    """一局游戏的模型调用次数与 token 用量。"""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"调用 {self.calls} 次，输入 {self.input_tokens} tokens，"
+            f"输出 {self.output_tokens} tokens"
+        )
+
+
+_USAGE: ContextVar[TokenUsage | None] = ContextVar("token_usage", default=None)
+
+
+def new_usage_stats() -> TokenUsage:
+    """为当前对局创建新的用量统计，并绑定到当前上下文。"""
+    usage = TokenUsage()
+    _USAGE.set(usage)
+    return usage
+
+
+def usage_of(res: Any) -> tuple[int, int]:
+    """返回模型响应中的 (输入, 输出) token 数，没有用量信息时为 (0, 0)。"""
+    usage = getattr(res, "usage", None)
+    if usage is None:
+        return 0, 0
+    return (
+        int(getattr(usage, "input_tokens", 0) or 0),
+        int(getattr(usage, "output_tokens", 0) or 0),
+    )
+
+
+def _record(res: Any) -> None:
+    usage = _USAGE.get()
+    if usage is None:
+        return
+    input_tokens, output_tokens = usage_of(res)
+    usage.calls += 1
+    usage.input_tokens += input_tokens
+    usage.output_tokens += output_tokens
+
+
+class UsageTrackingChatModel(ChatModelBase):
+    """把每次调用的 token 用量计入当前对局的统计。"""
+
+    def __init__(self, model: ChatModelBase) -> None:
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        res = await self.model(*args, **kwargs)
+        if isinstance(res, AsyncGenerator):
+            return self._stream_and_record(res)
+        _record(res)
+        return res
+
+    async def _stream_and_record(self, res: AsyncGenerator) -> AsyncGenerator:
+        last = None
+        try:
+            async for chunk in res:
+                last = chunk
+                yield chunk
+        finally:
+            # 流式响应的用量在最后一个分块中
+            _record(last)
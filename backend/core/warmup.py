@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""开局预热：在分配角色的同时建立到各模型端点的连接并预加载本地模型。
+
+第一夜的狼人讨论紧跟在角色分配之后，若此时才做 DNS 解析、TLS 握手或
+加载 Ollama 模型，第一回合的延迟会明显高于之后的回合。预热与角色分配
+并行进行，失败只打印提示，不影响游戏。
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from urllib.parse import urlparse
+
+import httpx
+
+from config import config
+from core.http_pool import get_http_client
+
+
+_DASHSCOPE_HOST = "dashscope.aliyuncs.com"
+
+
+async def _resolve(host: str, port: int = 443) -> None:
+    """预先解析 DNS，让系统缓存结果。"""
+    await asyncio.get_running_loop().getaddrinfo(host, port)
+
+
+async def _warm_openai(base_url: str, api_key: str | None) -> None:
+    """在共享连接池中并发建立若干长连接。"""
+    if not config.http_pool_enabled:
+        await _resolve(urlparse(base_url).hostname or base_url)
+        return
+    client = get_http_client("openai", base_url, api_key)
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    url = f"{base_url.rstrip('/')}/models"
+    # 只为建立连接，响应状态码无关紧要
+    await asyncio.gather(
+        *(
+            client.get(url, headers=headers)
+            for _ in range(max(config.warmup_connections, 1))
+        ),
+    )
+
+
+async def _warm_ollama(host: str | None, model_name: str) -> None:
+    """请求 Ollama 加载模型并按 keep_alive 常驻内存。"""
+    host = (host or config.ollama_host or "http://localhost:11434").rstrip("/")
+    async with httpx.AsyncClient(timeout=config.warmup_timeout) as client:
+        await client.post(
+            f"{host}/api/generate",
+            json={"model": model_name, "keep_alive": config.ollama_keep_alive},
+        )
+
+
+def _warmup_targets() -> dict[tuple, tuple[str, Callable[[], Awaitable]]]:
+    """按当前配置列出需要预热的端点（同一端点只预热一次）。"""
+    endpoints: list[tuple[str, str | None, str | None, str | None]] = []
+    if config.model_provider == "openai":
+        player_cfgs = (
+            config.openai_pool
+            if config.openai_player_mode == "pool"
+            else config.openai_player_configs
+        )
+        endpoints.extend(
+            ("openai", cfg.get("base_url"), cfg.get("api_key"), None)
+            for cfg in player_cfgs
+        )
+    else:
+        endpoints.append((config.model_provider, None, None, None))
+
+    fallback = config.fallback_model_config
+    if fallback:
+        endpoints.append((
+            fallback["provider"],
+            fallback["base_url"],
+            fallback["api_key"],
+            fallback["model_name"],
+        ))
+
+    targets: dict[tuple, tuple[str, Callable[[], Awaitable]]] = {}
+    for provider, base_url, api_key, model_name in endpoints:
+        if provider == "openai":
+            base_url = base_url or config.openai_base_url
+            api_key = api_key or config.openai_api_key
+            targets.setdefault(
+                (provider, base_url, api_key),
+                (f"openai {base_url}", partial(_warm_openai, base_url, api_key)),
+            )
+        elif provider == "dashscope":
+            targets.setdefault(
+                (provider,),
+                ("dashscope", partial(_resolve, _DASHSCOPE_HOST)),
+            )
+        elif provider == "ollama":
+            model_name = model_name or config.ollama_model_name
+            targets.setdefault(
+                (provider, base_url, model_name),
+                (f"ollama {model_name}", partial(_warm_ollama, base_url, model_name)),
+            )
+    return targets
+
+
+async def warm_up_endpoints() -> dict[str, str]:
+    """并发预热所有端点，返回每个端点的结果描述。"""
+
+    targets = list(_warmup_targets().values())
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(warm() for _, warm in targets),
+        return_exceptions=True,
+    )
+    elapsed = time.monotonic() - start
+
+    summary = {
+        label: "ok" if not isinstance(res, BaseException) else f"失败: {res}"
+        for (label, _), res in zip(targets, results)
+    }
+    ok = sum(1 for v in summary.values() if v == "ok")
+    print(f"✓ 端点预热完成: {ok}/{len(summary)} 成功，耗时 {elapsed:.1f}s")
+    return summary
+
+
+def start_warmup() -> asyncio.Task | None:
+    """在后台启动预热任务；未启用预热时返回 None。"""
+    if not config.warmup_enabled:
+        return None
+    return asyncio.create_task(warm_up_endpoints())
+
+
+async def wait_for_warmup(task: asyncio.Task | None) -> None:
+    """最多等待 WARMUP_TIMEOUT 秒，超时则放弃剩余预热。"""
+    if task is None:
+        return
+    done, _ = await asyncio.wait({task}, timeout=config.warmup_timeout)
+    if task not in done:
+        task.cancel()
+        print("⚠️ 端点预热超时，直接开始游戏")
@@ -6,12 +6,13 @@ from pathlib import Path
 
 from core.game_engine import werewolves_game
 from core.knowledge_base import PlayerKnowledgeStore
+from core.http_pool import close_http_clients
+from core.warmup import start_warmup
+from core.model_factory import create_chat_model, create_formatter
 from config import config
 from analysis.pipeline import run_analysis
 
 from agentscope.agent import ReActAgent
-from agentscope.formatter import DashScopeMultiAgentFormatter, OpenAIMultiAgentFormatter, OllamaMultiAgentFormatter
-from agentscope.model import DashScopeChatModel, OpenAIChatModel, OllamaChatModel
 from agentscope.session import JSONSession
 
 prompt = """
@@ -116,53 +117,57 @@ def get_official_agents(
 ) -> ReActAgent:
     """根据配置获取官方狼人杀代理，可指定模型/密钥/基址覆盖。"""
 
-    # 根据配置选择模型
-    if config.model_provider == "dashscope":
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=DashScopeChatModel(
-                api_key=config.dashscope_api_key,
-                model_name=config.dashscope_model_name,
-            ),
-            formatter=DashScopeMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    elif config.model_provider == "openai":
+    # 根据配置选择模型；限流、重试/熔断与请求对冲由模型工厂统一套上，
+    # 不支持的提供商由工厂抛出 ValueError
+    cfg: dict[str, str] = {}
+    if config.model_provider == "openai":
         cfg = model_cfg or {
             "api_key": config.openai_api_key,
             "base_url": config.openai_base_url,
             "model_name": config.openai_model_name,
         }
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=OpenAIChatModel(
-                api_key=cfg.get("api_key"),
-                model_name=cfg.get("model_name"),
-                client_args={
-                    "base_url": cfg.get("base_url"),
-                },
-            ),
-            formatter=OpenAIMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    elif config.model_provider == "ollama":
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=OllamaChatModel(
-                model_name=config.ollama_model_name,
-            ),
-            formatter=OllamaMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    else:
-        raise ValueError(f"不支持的模型提供商: {config.model_provider}")
+
+    agent = ReActAgent(
+        name=name,
+        sys_prompt=prompt.format(name=name),
+        model=create_chat_model(
+            api_key=cfg.get("api_key"),
+            model_name=cfg.get("model_name"),
+            base_url=cfg.get("base_url"),
+            hedged=True,
+            pooled=True,
+            routed=True,
+        ),
+        formatter=create_formatter(),
+        print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
+    )
 
     return agent
 
 
+def player_model_overrides() -> list[dict[str, str] | None]:
+    """9 名玩家各自的模型配置覆盖（仅 openai 提供商有值）。"""
+    if config.model_provider == "openai":
+        return config.openai_player_configs
+    return [None] * 9
+
+
+def player_model_label(cfg: dict[str, str] | None) -> str:
+    """玩家使用的模型说明（用于日志与经验文件）。"""
+    provider = config.model_provider
+    if provider == "openai" and config.openai_player_mode == "pool":
+        return f"openai pool: {len(config.openai_pool)} endpoints"
+    if provider == "openai" and cfg:
+        return f"openai: {cfg.get('model_name', '')}"
+    if provider == "dashscope":
+        return f"dashscope: {config.dashscope_model_name}"
+    if provider == "ollama":
+        return f"ollama: {config.ollama_model_name}"
+    if provider == "mock":
+        return f"mock: seed {config.mock_seed}"
+    return provider
+
+
 async def main() -> None:
     """The main entry point for the werewolf game."""
 
@@ -185,13 +190,12 @@ async def main() -> None:
         )
         print(f"✓ AgentScope Studio 已启用: {config.studio_url}")
 
+    # 预热模型端点，与创建玩家、分配角色并行进行
+    warmup = start_warmup()
+
     # 准备 9 名玩家（可在此修改名字/模型）
     print("\n正在创建 9 个玩家...")
-    model_overrides = (
-        config.openai_player_configs
-        if config.model_provider == "openai"
-        else [None] * 9
-    )
+    model_overrides = player_model_overrides()
     players = [
         get_official_agents(f"Player{idx + 1}", model_overrides[idx])
         for idx in range(9)
@@ -199,17 +203,8 @@ async def main() -> None:
     print("✓ 玩家创建完成\n")
 
     # 记录玩家使用的模型（用于日志与经验文件）
-    def _model_label(provider: str, cfg: dict[str, str] | None) -> str:
-        if provider == "openai" and cfg:
-            return f"openai: {cfg.get('model_name', '')}"
-        if provider == "dashscope":
-            return f"dashscope: {config.dashscope_model_name}"
-        if provider == "ollama":
-            return f"ollama: {config.ollama_model_name}"
-        return provider
-
     player_model_map = {
-        player.name: _model_label(config.model_provider, model_overrides[idx])
+        player.name: player_model_label(model_overrides[idx])
         for idx, player in enumerate(players)
     }
 
@@ -241,6 +236,8 @@ async def main() -> None:
         players,
         knowledge_store=knowledge_store,
         player_model_map=player_model_map,
+        warmup=warmup,
+        seed=config.game_seed,
     )
 
     # 将最新状态保存到检查点
@@ -265,6 +262,7 @@ async def main() -> None:
         except Exception as e:
             print(f"❌ 分析报告生成失败: {e}")
 
+    await close_http_clients()
     print("\n游戏结束！")
 
 
@@ -11,9 +11,12 @@ from models.roles import (
 )
 from models.schemas import (
     DiscussionModel,
+    RoundReflectionModel,
     WitchResurrectModel,
+    get_discussion_model,
     get_vote_model,
     get_poison_model,
+    get_witch_decision_model,
     get_seer_model,
     get_hunter_model,
 )
@@ -29,9 +32,12 @@ __all__ = [
     "RoleFactory",
     # Schemas
     "DiscussionModel",
+    "RoundReflectionModel",
     "WitchResurrectModel",
+    "get_discussion_model",
     "get_vote_model",
     "get_poison_model",
+    "get_witch_decision_model",
     "get_seer_model",
     "get_hunter_model",
 ]
@@ -1,23 +1,127 @@
 # -*- coding: utf-8 -*-
 """角色类定义模块 - 每个角色都有独立的行为逻辑"""
+import asyncio
+import json
+from contextvars import ContextVar
 from typing import Optional, List
 from abc import ABC, abstractmethod
 
 from agentscope.agent import ReActAgent
 from agentscope.message import Msg
+from pydantic import BaseModel
 
+from config import config
+from core.model_router import decision_kind
+from core.rate_limiter import BACKGROUND, RequestPriority, request_priority
 from prompts.role_prompts import RolePrompts
 from models.schemas import (
     BaseDecision,
     DiscussionModel,
+    get_discussion_model,
     get_vote_model,
     get_poison_model,
+    get_witch_decision_model,
     WitchResurrectModel,
     get_seer_model,
     get_hunter_model,
 )
 
 
+class DirectDecisionError(ValueError):
+    """单次调用的输出无法解析为 JSON 或未通过结构化校验。"""
+
+
+async def _forget(agent: ReActAgent, msg_ids: set[str]) -> None:
+    """从智能体记忆中删除指定 id 的消息。"""
+    memory = await agent.memory.get_memory()
+    indices = [idx for idx, msg in enumerate(memory) if msg.id in msg_ids]
+    if indices:
+        await agent.memory.delete(indices)
+
+
+async def _direct_decision(
+    agent: ReActAgent,
+    prompt: Msg,
+    structured_model: type[BaseModel],
+) -> Msg:
+    """单次模型调用完成结构化决策，绕过 ReAct 的工具循环。
+
+    以 [系统提示, 记忆, 提问] 直接调用模型，由提供商的 JSON Schema /
+    response format 约束输出，结果在本地用 pydantic 校验。提问与回复
+    会写入智能体记忆，与 ReAct 流程保持一致；调用或校验失败时撤回提问，
+    避免回退流程再次写入。输出无效时抛出 `DirectDecisionError`，
+    模型调用本身的错误（重试耗尽、熔断等）原样抛出。
+    """
+    await agent.memory.add(prompt)
+    try:
+        formatted = await agent.formatter.format(
+            msgs=[
+                Msg("system", agent.sys_prompt, "system"),
+                *await agent.memory.get_memory(),
+            ],
+        )
+        res = await agent.model(formatted, structured_model=structured_model)
+        if agent.model.stream:
+            # 流式输出的每个分块都是累积结果，只需保留最后一个
+            last = None
+            async for chunk in res:
+                last = chunk
+            res = last
+
+        try:
+            raw = getattr(res, "metadata", None)
+            if not raw:
+                # 部分模型只在文本中返回 JSON
+                text = "".join(
+                    block.get("text", "")
+                    for block in getattr(res, "content", None) or []
+                    if block.get("type") == "text"
+                )
+                raw = json.loads(text)
+            metadata = structured_model.model_validate(raw).model_dump()
+        except (ValueError, TypeError) as exc:
+            # json.JSONDecodeError 与 pydantic.ValidationError 均为 ValueError
+            raise DirectDecisionError(str(exc)) from exc
+    except Exception:
+        # 超时取消（CancelledError）时保留提问，由超时兜底写入回复
+        await _forget(agent, {prompt.id})
+        raise
+
+    msg = Msg(
+        agent.name,
+        metadata.get("speech") or json.dumps(metadata, ensure_ascii=False),
+        "assistant",
+        metadata=metadata,
+    )
+    await agent.memory.add(msg)
+    await agent.print(msg, True)
+    return msg
+
+
+# 各类决策的名称，键同时用于读取 DECISION_TIMEOUT_<KIND> 与 MODEL_ROUTES 配置
+DECISION_KINDS = {
+    "discussion": "白天发言",
+    "vote": "投票",
+    "last_words": "遗言",
+    "wolf_discussion": "狼人讨论",
+    "wolf_vote": "狼人投票",
+    "seer": "预言家查验",
+    "witch": "女巫用药",
+    "hunter": "猎人开枪",
+    "reflection": "回合反思",
+    "knowledge": "知识更新",
+    "summary": "游戏总结",
+}
+
+# 超时兜底生成的决策在 metadata 中带有该标记
+TIMED_OUT = "timed_out"
+
+
+# 推测性调用（如预先计算猎人开枪）产生的日志先暂存，结果被采用时才写入
+_DEFERRED_LOGS: ContextVar[list[tuple[str, str]] | None] = ContextVar(
+    "deferred_logs", default=None)
+
+
 class BaseRole(ABC):
     """角色基类"""
 
@@ -25,6 +129,7 @@ class BaseRole(ABC):
         self.agent = agent
         self.role_name = role_name
         self.is_alive = True
+        self.logger = None  # 由游戏引擎注入，用于记录超时兜底
 
     @property
     def name(self) -> str:
@@ -36,14 +141,143 @@ class BaseRole(ABC):
         """夜晚行动 - 每个角色需要实现自己的夜晚行为"""
         pass
 
+    def _log_action(self, action: str, detail: str) -> None:
+        """写入游戏日志；推测性调用中只暂存，由调用方决定是否写入。"""
+        deferred = _DEFERRED_LOGS.get()
+        if deferred is not None:
+            deferred.append((action, detail))
+        elif self.logger:
+            self.logger.log_action(action, detail)
+
+    async def fork_agent(self) -> ReActAgent:
+        """复制当前记忆，创建与本体同名、同模型的临时智能体。
+
+        在临时智能体上的调用不会与本体上同时进行的调用或广播相互干扰，
+        需要保留的问答由调用方再补记到本体记忆中。
+        """
+        fork = ReActAgent(
+            name=self.agent.name,
+            sys_prompt=self.agent.sys_prompt,
+            model=self.agent.model,
+            formatter=self.agent.formatter,
+            print_hint_msg=False,
+        )
+        await fork.memory.add(list(await self.agent.memory.get_memory()))
+        return fork
+
+    async def decide(
+        self,
+        prompt: Msg,
+        structured_model: type[BaseModel] | None = None,
+        agent: ReActAgent | None = None,
+        kind: str = "discussion",
+        fallback: dict | None = None,
+    ) -> Msg:
+        """所有决策的统一入口。
+
+        DECISION_MODE=direct 时用单次模型调用完成结构化决策，输出无法解析
+        或校验不通过时回退到 ReAct 流程；模型调用本身失败时直接抛出。
+
+        每类决策（`kind`）有独立的超时时间；超时后取消模型调用，改用
+        `fallback` 中的规则决策，并在日志中标记。`kind` 同时决定 MODEL_ROUTES
+        中的模型档位。
+        """
+        agent = agent or self.agent
+        timeout = config.decision_timeout(kind)
+        with decision_kind(kind):
+            if not timeout:
+                return await self._invoke(agent, prompt, structured_model)
+            # 任务创建时复制当前上下文，模型调用可据此按决策类型路由
+            task = asyncio.ensure_future(
+                self._invoke(agent, prompt, structured_model))
+
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        if task in done:
+            msg = task.result()
+            # ReActAgent 被中断时会返回带 _is_interrupted 标记的消息
+            if not (msg.metadata or {}).get("_is_interrupted"):
+                return msg
+        else:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):  # pylint: disable=broad-except
+                pass
+
+        # 中断回复（"I noticed that you have interrupted me"）不是实际采用的
+        # 决策：从记忆中删除，改为记录兜底决策，后续回合才能基于真实结果推理
+        memory = await agent.memory.get_memory()
+        await _forget(agent, {
+            m.id for m in memory if (m.metadata or {}).get("_is_interrupted")
+        })
+        msg = self._fallback_decision(kind, timeout, structured_model, fallback)
+        await agent.memory.add(msg)
+        return msg
+
+    def _fallback_decision(
+        self,
+        kind: str,
+        timeout: float,
+        structured_model: type[BaseModel] | None,
+        fallback: dict | None,
+    ) -> Msg:
+        """生成超时兜底决策，字段与结构化模型保持一致。"""
+        label = DECISION_KINDS.get(kind, kind)
+        metadata = {
+            "thought": f"（{label}超时，按规则自动处理）",
+            "behavior": "",
+            "speech": "",
+            **(fallback or {}),
+        }
+        if structured_model is not None:
+            metadata = structured_model.model_validate(metadata).model_dump()
+        metadata[TIMED_OUT] = True
+
+        self._log_action(
+            "超时兜底",
+            f"{self.name} 的{label}超过 {timeout:g}s 未完成，已按规则自动处理",
+        )
+        return Msg(
+            self.name,
+            metadata.get("speech") or "（超时未作答）",
+            "assistant",
+            metadata=metadata,
+        )
+
+    async def _invoke(
+        self,
+        agent: ReActAgent,
+        prompt: Msg,
+        structured_model: type[BaseModel] | None,
+    ) -> Msg:
+        if (
+            structured_model is not None
+            and config.decision_mode == "direct"
+            and isinstance(agent, ReActAgent)
+        ):
+            try:
+                return await _direct_decision(agent, prompt, structured_model)
+            except DirectDecisionError as exc:
+                # 只有输出格式问题才回退；模型调用失败时重跑 ReAct 只会加倍延迟与费用
+                self._log_action(
+                    "决策回退", f"{agent.name} 的单次决策输出无效，已改用 ReAct 流程: {exc}")
+        return await agent(prompt, structured_model=structured_model)
+
     async def day_discussion(self, prompt: Msg, context: str | None = None) -> Msg:
         """白天讨论 - 所有角色共用"""
         if context:
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+        return await self.decide(
             prompt,
             structured_model=BaseDecision,
+            kind="discussion",
+            fallback={"speech": "我暂时没有补充，先听听其他人的意见。"},
         )
 
     async def vote(
@@ -56,9 +290,11 @@ class BaseRole(ABC):
         if context:
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+        return await self.decide(
             prompt,
             structured_model=get_vote_model(alive_players),
+            kind="vote",
+            fallback={"vote": None},  # 超时视为弃权
         )
 
     async def observe(self, msg: Msg) -> None:
@@ -82,9 +318,11 @@ class BaseRole(ABC):
 
     async def leave_last_words(self, prompt: Msg) -> Msg:
         """发表遗言"""
-        return await self.agent(
+        return await self.decide(
             prompt,
             structured_model=BaseDecision,
+            kind="last_words",
+            fallback={"speech": "我没有更多要说的了。"},
         )
 
 
@@ -98,14 +336,25 @@ class Werewolf(BaseRole):
         """狼人夜晚行动 - 返回空字典，因为狼人的行动在团队讨论中完成"""
         return {}
 
-    async def discuss_with_team(self, prompt: Msg, context: str | None = None) -> Msg:
-        """狼人团队讨论"""
+    async def discuss_with_team(
+        self,
+        prompt: Msg,
+        context: str | None = None,
+        alive_players: list | None = None,
+    ) -> Msg:
+        """狼人团队讨论；传入存活玩家时会同时给出提议的击杀目标"""
         if context:
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+        return await self.decide(
             prompt,
-            structured_model=DiscussionModel,
+            structured_model=(
+                get_discussion_model(alive_players)
+                if alive_players
+                else DiscussionModel
+            ),
+            kind="wolf_discussion",
+            fallback={"speech": "我听大家的安排。", "reach_agreement": False},
         )
 
     async def team_vote(
@@ -113,15 +362,26 @@ class Werewolf(BaseRole):
         prompt: Msg,
         alive_players: list,
         context: str | None = None,
+        fallback_target: str | None = None,
     ) -> Msg:
-        """狼人团队投票选择击杀目标"""
+        """狼人团队投票选择击杀目标
+
+        超时时投给 `fallback_target`（通常是夜聊中提议最多的目标），
+        未提供时投给第一个非自己的存活玩家。
+        """
         if context:
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+        names = [p.name for p in alive_players]
+        if fallback_target not in names:
+            fallback_target = next(
+                (n for n in names if n != self.name), names[0])
+        return await self.decide(
             prompt,
             structured_model=get_vote_model(
                 alive_players, allow_abstain=False),
+            kind="wolf_vote",
+            fallback={"vote": fallback_target},
         )
 
 
@@ -160,9 +420,17 @@ class Seer(BaseRole):
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
 
-        msg_seer = await self.agent(
+        # 超时则查验第一个尚未查验过的其他玩家
+        candidates = [p.name for p in alive_players if p.name != self.name]
+        fallback_name = next(
+            (n for n in candidates if n not in self.checked_players),
+            candidates[0] if candidates else self.name,
+        )
+        msg_seer = await self.decide(
             prompt,
             structured_model=get_seer_model(alive_players),
+            kind="seer",
+            fallback={"name": fallback_name},
         )
 
         result = {
@@ -221,6 +489,10 @@ class Witch(BaseRole):
             player for player in alive_players if player.name != killed_player
         ]
 
+        if game_state.get("combined_decision"):
+            return await self._combined_night_action(
+                killed_player, poison_candidates, moderator, context)
+
         # 解药环节
         if self.has_healing and killed_player and killed_player != self.name:
             prompt = await moderator(
@@ -232,9 +504,11 @@ class Witch(BaseRole):
                 prompt = Msg(
                     prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
 
-            msg_resurrect = await self.agent(
+            msg_resurrect = await self.decide(
                 prompt,
                 structured_model=WitchResurrectModel,
+                kind="witch",
+                fallback={"resurrect": False},
             )
 
             result["resurrect_speech"] = msg_resurrect.metadata.get("speech")
@@ -257,9 +531,11 @@ class Witch(BaseRole):
                 prompt = Msg(
                     prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
 
-            msg_poison = await self.agent(
+            msg_poison = await self.decide(
                 prompt,
                 structured_model=get_poison_model(poison_candidates),
+                kind="witch",
+                fallback={"poison": False},
             )
 
             result["poison_speech"] = msg_poison.metadata.get("speech")
@@ -274,6 +550,67 @@ class Witch(BaseRole):
 
         return result
 
+    async def _combined_night_action(
+        self,
+        killed_player: Optional[str],
+        poison_candidates: list,
+        moderator,
+        context: str | None,
+    ) -> dict:
+        """单次调用同时决定解药与毒药，规则校验与分步流程一致。"""
+        can_resurrect = bool(
+            self.has_healing and killed_player and killed_player != self.name)
+        can_poison = bool(self.has_poison and poison_candidates)
+        if not (can_resurrect or can_poison):
+            return {}
+
+        options = []
+        if can_resurrect:
+            options.append(f"今晚 {killed_player} 被狼人杀死了，你可以使用解药救他/她。")
+        if can_poison:
+            options.append(
+                "你也可以使用毒药，当前可毒杀的存活玩家（不含被狼人击杀者）："
+                f"{', '.join([p.name for p in poison_candidates])}。"
+            )
+        prompt = await moderator(
+            f"[{self.name} ONLY] {self.name}，你是女巫。{''.join(options)}"
+            "同一晚最多只能使用一瓶药水，请一次性给出你的决定。"
+        )
+
+        if context:
+            prompt = Msg(
+                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
+
+        msg_decision = await self.decide(
+            prompt,
+            structured_model=get_witch_decision_model(
+                poison_candidates, can_resurrect, can_poison),
+            kind="witch",
+            fallback={},  # 超时则两瓶药都不使用
+        )
+        metadata = msg_decision.metadata or {}
+
+        result = {
+            "combined": True,
+            "speech": metadata.get("speech"),
+            "behavior": metadata.get("behavior"),
+            "thought": metadata.get("thought"),
+        }
+
+        # 同一晚只能使用一瓶药水：同时选择时以解药为准
+        if can_resurrect and metadata.get("resurrect"):
+            self.has_healing = False
+            result["resurrect"] = killed_player
+            return result
+
+        poisoned_name = metadata.get("name")
+        candidate_names = {p.name for p in poison_candidates}
+        if can_poison and metadata.get("poison") and poisoned_name in candidate_names:
+            self.has_poison = False
+            result["poison"] = poisoned_name
+
+        return result
+
 
 class Hunter(BaseRole):
     """猎人角色"""
@@ -281,16 +618,91 @@ class Hunter(BaseRole):
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "hunter")
         self.has_shot = True  # 是否还有开枪机会
+        # 预先计算的开枪决定: (计算时的候选玩家名, 后台任务, 请求优先级)
+        self._speculative_shot: Optional[
+            tuple[frozenset[str], asyncio.Task, RequestPriority]] = None
 
     async def night_action(self, game_state: dict) -> dict:
         """猎人夜晚行动（被杀时可能触发）"""
         return {}
 
-    async def shoot(self, alive_players: list, moderator, context: str | None = None) -> Optional[dict]:
-        """猎人开枪带走一人，返回包含目标与思考的字典。"""
-        if not self.has_shot:
+    def start_speculative_shot(
+        self,
+        alive_players: list,
+        moderator,
+        context: str | None = None,
+    ) -> Optional[asyncio.Task]:
+        """死亡已确定时，在后台预先计算开枪决定，返回对应任务。
+
+        预计算在复制了记忆的临时智能体上进行，不会与本体上正在进行的
+        调用（如遗言）相互干扰；结果在 `shoot` 时被采用或丢弃。预计算的
+        模型调用按后台优先级排队，`shoot` 开始等待它时才提升为关键。
+        """
+        if not self.has_shot or self._speculative_shot or not isinstance(self.agent, ReActAgent):
             return None
 
+        priority = RequestPriority(BACKGROUND)
+        with request_priority(priority):
+            task = asyncio.create_task(
+                self._speculate(list(alive_players), moderator, context))
+        self._speculative_shot = (
+            frozenset(p.name for p in alive_players), task, priority)
+        return task
+
+    async def _speculate(
+        self,
+        alive_players: list,
+        moderator,
+        context: str | None,
+    ) -> tuple[dict, list[Msg], list[tuple[str, str]]]:
+        # 任务有独立的上下文，暂存只作用于本次预计算
+        logs: list[tuple[str, str]] = []
+        _DEFERRED_LOGS.set(logs)
+        fork = await self.fork_agent()
+        result, messages = await self._decide_shot(
+            fork, alive_players, moderator, context)
+        return result, messages, logs
+
+    def discard_speculative_shot(self) -> None:
+        """丢弃并取消预计算的开枪决定（如猎人被毒杀），其暂存的日志一并丢弃。"""
+        if self._speculative_shot:
+            _, task, _ = self._speculative_shot
+            self._speculative_shot = None
+            task.cancel()
+
+    async def _take_speculative_shot(self, alive_players: list) -> Optional[dict]:
+        """取出预计算结果；若局面已实质变化（候选增加或目标已出局）则丢弃。"""
+        if not self._speculative_shot:
+            return None
+        speculated_names, task, priority = self._speculative_shot
+        self._speculative_shot = None
+
+        current_names = {p.name for p in alive_players}
+        if not current_names <= speculated_names:
+            task.cancel()
+            return None
+        # 开枪已在关键路径上等待预计算结果
+        priority.promote()
+        try:
+            result, messages, logs = await task
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if result["shoot"] and result["target"] not in current_names:
+            return None
+
+        # 将预计算的问答补记到本体记忆中，保持对话历史完整
+        await self.agent.memory.add(messages)
+        for action, detail in logs:
+            self._log_action(action, detail)
+        return result
+
+    async def _decide_shot(
+        self,
+        agent: ReActAgent,
+        alive_players: list,
+        moderator,
+        context: str | None,
+    ) -> tuple[dict, list[Msg]]:
         prompt = await moderator(
             f"[{self.name} ONLY] {self.name}，你是猎人，即将死亡。"
             f"你要开枪带走一人吗？当前存活玩家：{', '.join([p.name for p in alive_players])}"
@@ -300,9 +712,12 @@ class Hunter(BaseRole):
             prompt = Msg(
                 prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
 
-        msg_hunter = await self.agent(
+        msg_hunter = await self.decide(
             prompt,
             structured_model=get_hunter_model(alive_players),
+            agent=agent,
+            kind="hunter",
+            fallback={"shoot": False},
         )
 
         decision = bool(msg_hunter.metadata.get("shoot"))
@@ -315,8 +730,22 @@ class Hunter(BaseRole):
             "behavior": msg_hunter.metadata.get("behavior"),
             "thought": msg_hunter.metadata.get("thought"),
         }
+        return result, [prompt, msg_hunter]
+
+    async def shoot(self, alive_players: list, moderator, context: str | None = None) -> Optional[dict]:
+        """猎人开枪带走一人，返回包含目标与思考的字典。
+
+        若已有可用的预计算决定则直接采用，否则同步询问。
+        """
+        if not self.has_shot:
+            return None
+
+        result = await self._take_speculative_shot(alive_players)
+        if result is None:
+            result, _ = await self._decide_shot(
+                self.agent, alive_players, moderator, context)
 
-        if decision:
+        if result["shoot"]:
             self.has_shot = False
 
         return result
@@ -50,6 +50,17 @@ class KnowledgeUpdateModel(BaseModel):
     )
 
 
+class RoundReflectionModel(ReflectionModel):
+    """合并的回合反思模型：一次输出印象更新与长期游戏理解。"""
+
+    knowledge: str = Field(
+        description=(
+            "请用简洁的一段话更新你对狼人杀的长期理解/经验，用于未来的决策。"
+            "聚焦可复用的策略、识别模式、合作或欺诈信号，避免包含本局具体的发言/票型原文。"
+        ),
+    )
+
+
 class DiscussionModel(BaseDecision):
     """讨论阶段的输出模型。"""
 
@@ -58,6 +69,20 @@ class DiscussionModel(BaseDecision):
     )
 
 
+def get_discussion_model(agents: list[AgentBase]) -> type[BaseModel]:
+    """根据存活玩家生成狼人讨论模型，额外记录当前提议的击杀目标。"""
+
+    class WolfDiscussionModel(DiscussionModel):
+        """狼人夜聊的输出模型。"""
+
+        target: Literal[tuple(_.name for _ in agents)] | None = Field(  # type: ignore
+            description="你目前提议今晚击杀的玩家名字，尚无明确目标时请留空",
+            default=None,
+        )
+
+    return WolfDiscussionModel
+
+
 def get_vote_model(
     agents: list[AgentBase],
     allow_abstain: bool = True,
@@ -115,6 +140,40 @@ def get_poison_model(agents: list[AgentBase]) -> type[BaseModel]:
     return WitchPoisonModel
 
 
+def get_witch_decision_model(
+    agents: list[AgentBase],
+    can_resurrect: bool,
+    can_poison: bool,
+) -> type[BaseModel]:
+    """根据当前可用药水生成女巫合并决策模型，一次调用同时决定解药与毒药。
+
+    Args:
+        agents: 可毒杀的玩家列表（不含当晚被狼人击杀者）
+        can_resurrect: 本回合是否可以使用解药
+        can_poison: 本回合是否可以使用毒药
+    """
+
+    class WitchDecisionModel(BaseDecision):
+        """女巫合并决策的输出模型。同一晚最多使用一瓶药水。"""
+
+        if can_resurrect:
+            resurrect: bool = Field(
+                description="是否使用解药救今晚被狼人杀死的玩家",
+                default=False,
+            )
+        if can_poison:
+            poison: bool = Field(
+                description="是否使用毒药（若已决定使用解药则必须为 false）",
+                default=False,
+            )
+            name: Literal[tuple(_.name for _ in agents)] | None = Field(  # type: ignore
+                description="你想毒杀的玩家名字，如果你不想毒杀任何人，请留空",
+                default=None,
+            )
+
+    return WitchDecisionModel
+
+
 def get_seer_model(agents: list[AgentBase]) -> type[BaseModel]:
     """根据玩家名字生成预言家模型。"""
 
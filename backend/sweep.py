@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""多机锦标赛：通过共享的 SQLite 作业队列把对局分发到任意机器上运行。
+
+    # 协调端：写入 100 局作业（可指定座位模型与配置覆盖）
+    python backend/sweep.py enqueue --games 100 --seat-models seats.json
+    # 每台机器上启动若干工作进程
+    python backend/sweep.py work --concurrency 2
+    # 查看进度，完成后导出日志、经验文件与结果清单
+    python backend/sweep.py status --tournament <ID>
+    python backend/sweep.py collect --tournament <ID>
+
+座位模型文件为 JSON：一个包含 9 项的列表表示所有对局共用的座位配置，
+由多个这样的列表组成的列表则按对局轮换。每项可包含 model_name / base_url，
+API Key 始终取自工作端自身的配置，不会写入队列。
+
+作业的配置覆盖（--set）作用于整个工作进程。限流器、熔断器、端点池与
+HTTP 客户端是进程内共享、按创建时的配置构建的，切换到不同覆盖的作业前
+会全部丢弃重建，使 RATE_LIMIT_* 等覆盖对新作业生效。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import uuid
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from config import config
+from core.endpoint_pool import reset_endpoint_pools
+from core.http_pool import close_http_clients
+from core.job_queue import JobQueue
+from core.rate_governor import reset_rate_governors
+from core.rate_limiter import reset_rate_limiters
+from core.resilience import reset_resilience
+from core.warmup import start_warmup, wait_for_warmup
+from main import player_model_overrides
+from tournament import run_game, summarize_games, write_manifest
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run a WolfMind tournament across hosts")
+    p.add_argument("--queue", default=None,
+                   help="SQLite job queue path (default JOB_QUEUE_PATH)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Write game jobs into the queue")
+    enqueue.add_argument("--games", type=int, required=True)
+    enqueue.add_argument("--seat-models", default=None,
+                         help="JSON file with per-seat model configs")
+    enqueue.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                         help="Config override applied to every job")
+    enqueue.add_argument("--seed", type=int, default=None,
+                         help="Base seed; game i uses seed + i")
+
+    work = sub.add_parser("work", help="Pull and run jobs")
+    work.add_argument("--concurrency", type=int, default=1,
+                      help="Jobs run at once by this worker")
+    work.add_argument("--max-jobs", type=int, default=0,
+                      help="Exit after this many jobs (0 = unlimited)")
+    work.add_argument("--poll", type=float, default=5.0,
+                      help="Seconds between polls when the queue is empty")
+    work.add_argument("--exit-when-empty", action="store_true")
+
+    status = sub.add_parser("status", help="Show job counts")
+    status.add_argument("--tournament", default=None)
+
+    collect = sub.add_parser("collect", help="Export artifacts and manifest")
+    collect.add_argument("--tournament", required=True)
+    collect.add_argument("--out", default=None, help="Output directory")
+    return p.parse_args()
+
+
+def _load_seat_models(path: str | None) -> list[list[dict[str, str] | None]] | None:
+    if not path:
+        return None
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    rotations = data if data and isinstance(data[0], list) else [data]
+    for seats in rotations:
+        if len(seats) != 9:
+            raise ValueError("座位模型配置必须包含 9 项")
+        for seat in seats:
+            if seat and "api_key" in seat:
+                raise ValueError("座位模型配置不应包含 api_key，请在工作端 .env 中配置")
+    return rotations
+
+
+def enqueue(queue: JobQueue, args: argparse.Namespace) -> str:
+    """写入一次锦标赛的全部作业，返回锦标赛 ID。"""
+
+    # 同一秒内可能有多个协调端写入，追加随机后缀避免 ID 冲突
+    tournament_id = (
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}")
+    rotations = _load_seat_models(args.seat_models)
+    overrides = dict(item.split("=", 1) for item in args.set)
+    if args.seed is not None:
+        base_seed = args.seed
+    elif config.game_seed is not None:
+        base_seed = config.game_seed
+    else:
+        base_seed = random.randrange(2**31)
+    payloads = [
+        {
+            "seed": base_seed + idx,
+            "seat_models": rotations[(idx - 1) % len(rotations)] if rotations else None,
+            "config": overrides,
+        }
+        # 与 game_index 一致从 1 开始，第 i 局的种子为 seed + i（同 tournament.py）
+        for idx in range(1, args.games + 1)
+    ]
+    queue.enqueue(tournament_id, payloads, max_attempts=config.job_max_attempts)
+    print(f"✓ 已写入 {len(payloads)} 个作业，锦标赛 ID: {tournament_id}")
+    return tournament_id
+
+
+def _seat_overrides(
+    seat_models: list[dict[str, str] | None] | None,
+) -> list[dict[str, str] | None]:
+    """把作业中的座位模型与本机配置合并（API Key 等取自本机）。"""
+    local = player_model_overrides()
+    if not seat_models:
+        return local
+    return [
+        {**(base or {}), **(seat or {})} if (base or seat) else None
+        for base, seat in zip(local, seat_models)
+    ]
+
+
+async def _heartbeat(queue: JobQueue, job_id: int, worker_id: str) -> None:
+    lease = config.job_lease_seconds
+    while True:
+        await asyncio.sleep(lease / 3)
+        if not await asyncio.to_thread(queue.heartbeat, job_id, worker_id, lease):
+            print(f"⚠️ 作业 {job_id} 的租约已被接管，本次结果将不会提交")
+            return
+
+
+async def _run_job(
+    queue: JobQueue,
+    job: dict[str, Any],
+    worker_id: str,
+    warmup: asyncio.Task | None,
+) -> None:
+    """运行一个作业；意外异常时报告失败，让作业放回队列重试。"""
+
+    try:
+        await _play_job(queue, job, worker_id, warmup)
+    except Exception as exc:  # pylint: disable=broad-except
+        await asyncio.to_thread(
+            queue.fail, job["id"], worker_id, f"{type(exc).__name__}: {exc}")
+        raise
+
+
+async def _play_job(
+    queue: JobQueue,
+    job: dict[str, Any],
+    worker_id: str,
+    warmup: asyncio.Task | None,
+) -> None:
+    """运行一个作业并回传结果、日志与经验文件（共用本进程的预热任务）。"""
+
+    payload = job["payload"]
+    heartbeat = asyncio.create_task(_heartbeat(queue, job["id"], worker_id))
+    try:
+        result = await run_game(
+            job["game_index"],
+            job["tournament_id"],
+            asyncio.Semaphore(1),
+            warmup,
+            model_overrides=_seat_overrides(payload.get("seat_models")),
+            seed=payload.get("seed"),
+        )
+    finally:
+        heartbeat.cancel()
+
+    result.update({"worker": worker_id, "attempt": job["attempts"]})
+    if result.get("error"):
+        await asyncio.to_thread(queue.fail, job["id"], worker_id, result["error"])
+        return
+
+    artifacts = {
+        Path(path).name: Path(path).read_bytes()
+        for path in (result.get("log_path"), result.get("experience_path"))
+        if path and Path(path).exists()
+    }
+    if not await asyncio.to_thread(
+        queue.complete, job["id"], worker_id, result, artifacts,
+    ):
+        print(f"⚠️ 作业 {job['id']} 的租约已失效，结果被丢弃以避免重复计入")
+
+
+def _reap(finished: set[asyncio.Task]) -> int:
+    """取回已结束作业任务的异常（已在 `_run_job` 中报告失败），返回数量。"""
+    for task in finished:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ 作业运行出错: {task.exception()!r}")
+    return len(finished)
+
+
+async def _reset_shared_state() -> None:
+    """丢弃按旧配置创建的进程级共享对象，切换配置覆盖前调用。"""
+    reset_rate_limiters()
+    reset_rate_governors()
+    reset_resilience()
+    reset_endpoint_pools()
+    await close_http_clients()
+
+
+async def work(queue: JobQueue, args: argparse.Namespace) -> int:
+    """循环领取并运行作业，返回本进程完成的作业数。"""
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    warmup = start_warmup()
+    await wait_for_warmup(warmup)
+
+    done = 0
+    running: set[asyncio.Task] = set()
+    # 配置覆盖作用于整个进程，只有覆盖相同的作业才能同时运行
+    applied = ExitStack()
+    applied_cfg: dict[str, str] | None = None
+    try:
+        while not args.max_jobs or done + len(running) < args.max_jobs:
+            finished = {task for task in running if task.done()}
+            running -= finished
+            done += _reap(finished)
+            if len(running) >= max(args.concurrency, 1):
+                finished, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED)
+                done += _reap(finished)
+                continue
+            job = await asyncio.to_thread(
+                queue.lease, worker_id, config.job_lease_seconds)
+            if job is None:
+                if args.exit_when_empty and not running:
+                    break
+                await asyncio.sleep(args.poll)
+                continue
+
+            job_cfg = job["payload"].get("config") or {}
+            if running and job_cfg != applied_cfg:
+                # 归还作业，等当前作业结束后再切换配置
+                await asyncio.to_thread(queue.release, job["id"], worker_id)
+                finished, _ = await asyncio.wait(running)
+                done += _reap(finished)
+                running = set()
+                continue
+            if not running and job_cfg != applied_cfg:
+                applied.close()
+                applied = ExitStack()
+                applied.enter_context(config.overrides(job_cfg))
+                if applied_cfg is not None or job_cfg:
+                    # 首个作业无覆盖时保留预热建立的连接；否则按新配置重新预热
+                    await _reset_shared_state()
+                    warmup = start_warmup()
+                    await wait_for_warmup(warmup)
+                applied_cfg = job_cfg
+
+            print(f"▶ {worker_id} 领取作业 {job['tournament_id']}#{job['game_index']}"
+                  f"（第 {job['attempts']} 次尝试）")
+            running.add(asyncio.create_task(_run_job(queue, job, worker_id, warmup)))
+        if running:
+            finished, _ = await asyncio.wait(running)
+            done += _reap(finished)
+    finally:
+        applied.close()
+        await close_http_clients()
+    return done
+
+
+def collect(queue: JobQueue, tournament_id: str, out: str | None) -> Path:
+    """导出已完成作业的附件，并写出与单机锦标赛相同格式的结果清单。"""
+
+    out_dir = Path(out) if out else Path(config.tournament_dir) / tournament_id
+    out_dir.mkdir(parents=True, exist_ok=True)
+    games = []
+    for job in queue.jobs(tournament_id):
+        if job["status"] == "done":
+            for name, content in queue.artifacts(job["id"]).items():
+                (out_dir / name).write_bytes(content)
+            games.append(job["result"])
+        else:
+            games.append({
+                "index": job["game_index"],
+                "status": job["status"],
+                "error": job["error"] or job["status"],
+            })
+
+    manifest_path = out_dir / f"tournament_{tournament_id}.json"
+    write_manifest(manifest_path, {
+        "tournament_id": tournament_id,
+        "collected_at": datetime.now().isoformat(),
+        "games_requested": len(games),
+        "job_counts": queue.counts(tournament_id),
+        "summary": summarize_games(games),
+        "games": games,
+    })
+    return manifest_path
+
+
+def main() -> None:
+    args = _parse_args()
+    queue = JobQueue(args.queue or config.job_queue_path)
+
+    if args.command == "enqueue":
+        enqueue(queue, args)
+    elif args.command == "work":
+        is_valid, error_msg = config.validate()
+        if not is_valid:
+            print(f"❌ 配置错误: {error_msg}")
+            sys.exit(1)
+        done = asyncio.run(work(queue, args))
+        print(f"✓ 工作进程退出，共完成 {done} 个作业")
+    elif args.command == "status":
+        print(json.dumps(queue.counts(args.tournament), ensure_ascii=False))
+    elif args.command == "collect":
+        print(f"✓ 结果清单已保存: {collect(queue, args.tournament, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""SQLite 作业队列：领取、续约、提交与失败重试。"""
+import time
+
+from core.job_queue import JobQueue
+
+
+def _queue(tmp_path, n: int = 1, max_attempts: int = 2) -> JobQueue:
+    queue = JobQueue(tmp_path / "jobs.db")
+    queue.enqueue("t1", [{"seed": i} for i in range(n)], max_attempts=max_attempts)
+    return queue
+
+
+def test_lease_and_complete(tmp_path) -> None:
+    queue = _queue(tmp_path)
+    job = queue.lease("w1", lease_seconds=60)
+    assert job["game_index"] == 1
+    assert job["payload"] == {"seed": 0}
+    assert job["attempts"] == 1
+    assert queue.lease("w2", lease_seconds=60) is None
+
+    assert queue.heartbeat(job["id"], "w1", 60)
+    assert not queue.heartbeat(job["id"], "w2", 60)
+    assert queue.complete(job["id"], "w1", {"winner": "villager"}, {"a.log": b"log"})
+    assert queue.counts("t1") == {"done": 1}
+    assert queue.artifacts(job["id"]) == {"a.log": b"log"}
+    assert queue.jobs("t1")[0]["result"] == {"winner": "villager"}
+
+
+def test_expired_lease_is_taken_over_and_stale_result_rejected(tmp_path) -> None:
+    queue = _queue(tmp_path)
+    first = queue.lease("w1", lease_seconds=0.01)
+    time.sleep(0.02)
+    second = queue.lease("w2", lease_seconds=60)
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+
+    assert not queue.heartbeat(first["id"], "w1", 60)
+    assert not queue.complete(first["id"], "w1", {"winner": "werewolf"})
+    assert queue.complete(second["id"], "w2", {"winner": "villager"})
+    assert queue.jobs("t1")[0]["result"] == {"winner": "villager"}
+
+
+def test_fail_retries_until_max_attempts(tmp_path) -> None:
+    queue = _queue(tmp_path, max_attempts=2)
+    job = queue.lease("w1", 60)
+    assert queue.fail(job["id"], "w1", "boom")
+    assert queue.counts("t1") == {"pending": 1}
+
+    job = queue.lease("w1", 60)
+    assert queue.fail(job["id"], "w1", "boom again")
+    assert queue.counts("t1") == {"failed": 1}
+    assert queue.lease("w1", 60) is None
+    assert queue.jobs("t1")[0]["error"] == "boom again"
+
+
+def test_release_does_not_count_an_attempt(tmp_path) -> None:
+    queue = _queue(tmp_path)
+    job = queue.lease("w1", 60)
+    assert queue.release(job["id"], "w1")
+    again = queue.lease("w2", 60)
+    assert again["id"] == job["id"]
+    assert again["attempts"] == 1
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""自适应限流器：并发上限、AIMD 退避与恢复、优先级调度。"""
+import asyncio
+
+from core.rate_limiter import (
+    BACKGROUND,
+    CRITICAL,
+    AdaptiveRateLimiter,
+    RequestPriority,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_concurrency_cap() -> None:
+    limiter = AdaptiveRateLimiter(rate=0, burst=1, max_concurrency=2)
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        await limiter.acquire()
+        peak = max(peak, limiter.stats()["in_flight"])
+        await asyncio.sleep(0.01)
+        await limiter.release(latency=0.01)
+
+    async def main() -> None:
+        await asyncio.gather(*(call() for _ in range(9)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.total_requests == 9
+
+
+def test_unlimited_limiter_never_waits() -> None:
+    limiter = AdaptiveRateLimiter(rate=0, burst=1, max_concurrency=0)
+    assert limiter.unlimited
+
+    async def main() -> None:
+        await asyncio.gather(*(limiter.acquire() for _ in range(20)))
+
+    asyncio.run(main())
+    assert limiter.queue_wait[CRITICAL].max_wait == 0.0
+
+
+def test_429_halves_rate_and_concurrency_then_recovers_additively() -> None:
+    limiter = AdaptiveRateLimiter(rate=10, burst=10, max_concurrency=8)
+
+    async def main() -> None:
+        await limiter.acquire()
+        await limiter.release(error=RateLimited("too many requests"))
+
+    asyncio.run(main())
+    assert limiter.rate == 5
+    assert limiter.concurrency == 4
+    assert limiter.rate_limited == 1
+
+    # 每次成功恢复上限速率的 5%；并发需连续成功 concurrency 次才加 1
+    for _ in range(3):
+        limiter._recover()  # pylint: disable=protected-access
+    assert limiter.rate == 6.5
+    assert limiter.concurrency == 4
+    limiter._recover()  # pylint: disable=protected-access
+    assert limiter.concurrency == 5
+
+    for _ in range(200):
+        limiter._recover()  # pylint: disable=protected-access
+    assert limiter.rate == limiter.max_rate
+    assert limiter.concurrency == limiter.max_concurrency
+
+
+def test_latency_spike_shrinks_rate_and_concurrency() -> None:
+    limiter = AdaptiveRateLimiter(
+        rate=10, burst=10, max_concurrency=10, latency_spike_factor=3.0)
+    for _ in range(AdaptiveRateLimiter.MIN_LATENCY_SAMPLES + 1):
+        limiter._observe_latency(1.0)  # pylint: disable=protected-access
+    limiter._observe_latency(10.0)  # pylint: disable=protected-access
+    assert limiter.latency_spikes == 1
+    assert limiter.rate == 8
+    assert limiter.concurrency == 8
+
+
+def test_latency_spike_backs_off_without_a_rate_limit() -> None:
+    """默认配置不限速，尖峰退避只能作用在并发窗口上。"""
+    limiter = AdaptiveRateLimiter(
+        rate=0, burst=1, max_concurrency=16, latency_spike_factor=3.0)
+    for _ in range(AdaptiveRateLimiter.MIN_LATENCY_SAMPLES + 1):
+        limiter._observe_latency(1.0)  # pylint: disable=protected-access
+    limiter._observe_latency(10.0)  # pylint: disable=protected-access
+    assert limiter.concurrency == 12
+
+
+def test_background_yields_to_waiting_critical() -> None:
+    limiter = AdaptiveRateLimiter(rate=0, burst=1, max_concurrency=1)
+    order: list[str] = []
+
+    async def call(priority: str, name: str) -> None:
+        await limiter.acquire(priority)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        await limiter.release(latency=0.01)
+
+    async def main() -> None:
+        await limiter.acquire(CRITICAL)
+        waiters = [
+            asyncio.create_task(call(BACKGROUND, "reflection")),
+            asyncio.create_task(call(CRITICAL, "vote")),
+        ]
+        await asyncio.sleep(0.01)
+        await limiter.release(latency=0.01)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert order == ["vote", "reflection"]
+
+
+def test_critical_reserve_is_not_used_by_background() -> None:
+    limiter = AdaptiveRateLimiter(
+        rate=0, burst=1, max_concurrency=2, critical_reserve=1)
+
+    async def main() -> None:
+        await limiter.acquire(BACKGROUND)
+        blocked = asyncio.create_task(limiter.acquire(BACKGROUND))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        # 保留槽位仍可供关键请求使用
+        await asyncio.wait_for(limiter.acquire(CRITICAL), 1)
+        blocked.cancel()
+
+    asyncio.run(main())
+
+
+def test_promoted_request_takes_reserved_slot() -> None:
+    limiter = AdaptiveRateLimiter(
+        rate=0, burst=1, max_concurrency=2, critical_reserve=1)
+
+    async def main() -> None:
+        await limiter.acquire(CRITICAL)
+        priority = RequestPriority(BACKGROUND)
+        waiter = asyncio.create_task(limiter.acquire(CRITICAL, priority))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        priority.promote()
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(main())
+    assert limiter.queue_wait[CRITICAL].count == 2
+    assert limiter.queue_wait[BACKGROUND].count == 0
+
+
+def test_limiter_survives_a_new_event_loop() -> None:
+    limiter = AdaptiveRateLimiter(rate=0, burst=1, max_concurrency=1)
+
+    async def main() -> None:
+        await limiter.acquire()
+        await limiter.release(latency=0.01)
+
+    asyncio.run(main())
+    asyncio.run(main())
+    assert limiter.total_requests == 2
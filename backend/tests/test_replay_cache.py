@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""模型响应录制/回放：请求指纹与重复请求的出现次数。"""
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from core.mock_model import MockChatModel
+from core.replay_cache import (
+    ReplayChatModel,
+    ReplayMissError,
+    ReplayStore,
+    new_replay_stats,
+    request_fingerprint,
+)
+
+MESSAGES = [{"role": "user", "content": "Player1 Player2 请投票"}]
+
+
+class Vote(BaseModel):
+    name: str
+
+
+class CountingModel(MockChatModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return await super().__call__(*args, **kwargs)
+
+
+def test_fingerprint_is_stable_and_content_sensitive() -> None:
+    base = request_fingerprint("m", MESSAGES, structured_model=Vote)
+    assert base == request_fingerprint("m", [dict(m) for m in MESSAGES], structured_model=Vote)
+    assert base != request_fingerprint("other", MESSAGES, structured_model=Vote)
+    assert base != request_fingerprint("m", MESSAGES)
+    assert base != request_fingerprint(
+        "m", [{"role": "user", "content": "Player1 请投票"}], structured_model=Vote)
+
+
+def test_record_then_replay_without_calling_the_model(tmp_path) -> None:
+    store = ReplayStore(tmp_path)
+
+    async def run(mode: str, model: CountingModel) -> tuple:
+        stats = new_replay_stats()
+        replay = ReplayChatModel(model, store, mode)
+        # 同一请求出现两次，按出现次数分别录制
+        responses = [
+            await replay(MESSAGES, structured_model=Vote),
+            await replay(MESSAGES, structured_model=Vote),
+        ]
+        return responses, stats
+
+    recorder = CountingModel()
+    recorded, rec_stats = asyncio.run(run("record", recorder))
+    assert recorder.calls == 2
+    assert rec_stats.recorded == 2
+    fingerprint = request_fingerprint("mock", MESSAGES, structured_model=Vote)
+    assert store.get(fingerprint, 0) is not None
+    assert store.get(fingerprint, 1) is not None
+    assert store.get(fingerprint, 2) is None
+
+    player = CountingModel()
+    replayed, stats = asyncio.run(run("replay", player))
+    assert player.calls == 0
+    assert stats.hits == 2
+    assert [r.content for r in replayed] == [r.content for r in recorded]
+    assert [r.metadata for r in replayed] == [r.metadata for r in recorded]
+
+
+def test_replay_miss_raises_or_falls_through(tmp_path) -> None:
+    store = ReplayStore(tmp_path)
+
+    async def call(fallthrough: bool, model: CountingModel):
+        stats = new_replay_stats()
+        res = await ReplayChatModel(model, store, "replay", fallthrough)(MESSAGES)
+        return res, stats
+
+    with pytest.raises(ReplayMissError):
+        asyncio.run(call(False, CountingModel()))
+
+    model = CountingModel()
+    _, stats = asyncio.run(call(True, model))
+    assert model.calls == 1
+    assert stats.misses == 1
+    assert stats.recorded == 1
+    # 补录之后再次回放即可命中
+    _, stats = asyncio.run(call(False, CountingModel()))
+    assert stats.hits == 1
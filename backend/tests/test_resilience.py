@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""重试分类、重试预算与熔断器。"""
+import asyncio
+import time
+
+from agentscope.model import ChatModelBase
+
+from config import config
+from core.resilience import (
+    CircuitBreaker,
+    ResilientChatModel,
+    RetryBudget,
+    is_retryable_error,
+    reset_resilience,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    """与 openai SDK 同名的传输层异常。"""
+
+
+class FlakyModel(ChatModelBase):
+    """按顺序抛出给定异常，之后返回 "ok"。"""
+
+    def __init__(self, errors: list[Exception]) -> None:
+        super().__init__("flaky", stream=False)
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class BurstModel(ChatModelBase):
+    """启动后 `outage` 秒内返回 503，之后恢复。"""
+
+    def __init__(self, outage: float) -> None:
+        super().__init__("burst", stream=False)
+        self.until = time.monotonic() + outage
+
+    async def __call__(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        if time.monotonic() < self.until:
+            raise HTTPError(503)
+        return "ok"
+
+
+def test_retryable_classification() -> None:
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert is_retryable_error(ConnectionResetError())
+    assert is_retryable_error(HTTPError(503))
+    assert is_retryable_error(HTTPError(429))
+    assert is_retryable_error(APIConnectionError("reset by peer"))
+    assert is_retryable_error(
+        RuntimeError('Failed: {"status_code": 502, "code": "BadGateway"}'))
+    assert not is_retryable_error(HTTPError(400))
+    # 状态码优先于文本：参数错误的提示里出现关键词也不重试
+    assert not is_retryable_error(
+        RuntimeError('{"status_code": 400, "message": "connection timeout field"}'))
+    assert not is_retryable_error(ValueError("invalid connection string"))
+    assert not is_retryable_error(RuntimeError("the model timed out the narrative"))
+    assert not is_retryable_error(RuntimeError("player 429 says: rate limit yourself"))
+
+
+def test_retry_budget_caps_retries() -> None:
+    budget = RetryBudget(ratio=0.5, min_tokens=2)
+    assert budget.try_withdraw()
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    assert budget.exhausted == 1
+    budget.deposit()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    assert budget.try_withdraw()
+    assert budget.retries == 3
+
+
+def test_breaker_opens_probes_and_closes() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 1
+
+    # 冷却结束后半开，只放行一个探测请求
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def _resilient(model: ChatModelBase, endpoint: str) -> ResilientChatModel:
+    reset_resilience()
+    return ResilientChatModel(model, endpoint)
+
+
+def test_transient_errors_are_retried() -> None:
+    model = FlakyModel([HTTPError(503), asyncio.TimeoutError()])
+    with config.overrides({"RETRY_BASE_DELAY": "0", "RETRY_MAX_ATTEMPTS": "3"}):
+        resilient = _resilient(model, "test|retry")
+        assert asyncio.run(resilient()) == "ok"
+    assert model.calls == 3
+    assert resilient.breaker.state == "closed"
+
+
+def test_client_error_does_not_close_half_open_breaker() -> None:
+    model = FlakyModel([HTTPError(400)])
+    with config.overrides({"CIRCUIT_FAILURE_THRESHOLD": "1", "CIRCUIT_RECOVERY_TIME": "0"}):
+        resilient = _resilient(model, "test|half-open")
+    resilient.breaker.record_failure()
+    assert resilient.breaker.state == "open"
+
+    try:
+        asyncio.run(resilient())
+    except HTTPError:
+        pass
+    else:
+        raise AssertionError("400 应直接抛出")
+    assert model.calls == 1
+    assert resilient.breaker.state == "half_open"
+    # 探测名额已归还，下一次请求仍可作为探测
+    assert resilient.breaker.allow()
+
+
+def test_short_outage_without_fallback_waits_for_probe() -> None:
+    """未配置备用端点时，熔断期间的并行调用等待探测恢复，而不是全部失败。"""
+    overrides = {
+        "RETRY_BASE_DELAY": "0.05",
+        "CIRCUIT_FAILURE_THRESHOLD": "3",
+        "CIRCUIT_RECOVERY_TIME": "0.2",
+    }
+    with config.overrides(overrides):
+        resilient = _resilient(BurstModel(outage=0.15), "test|burst")
+
+        async def main() -> list:
+            return await asyncio.gather(*(resilient() for _ in range(9)))
+
+        assert asyncio.run(main()) == ["ok"] * 9
+    assert resilient.breaker.trips >= 1
+    assert resilient.breaker.state == "closed"
+
+
+def test_rate_limit_errors_do_not_trip_breaker() -> None:
+    model = FlakyModel([HTTPError(429)] * 3)
+    overrides = {
+        "RETRY_BASE_DELAY": "0",
+        "RETRY_MAX_ATTEMPTS": "3",
+        "CIRCUIT_FAILURE_THRESHOLD": "1",
+    }
+    with config.overrides(overrides):
+        resilient = _resilient(model, "test|429")
+        assert asyncio.run(resilient()) == "ok"
+    assert resilient.breaker.trips == 0
+    assert resilient.breaker.state == "closed"
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""狼人夜聊提前结束的一致判断。"""
+from core.game_engine import _discussion_consensus
+
+
+def test_consensus_requires_every_wolf_to_speak() -> None:
+    assert _discussion_consensus({"Player1": "Player5"}, 2, 1.0) is None
+    assert _discussion_consensus(
+        {"Player1": "Player5", "Player2": "Player5"}, 2, 1.0) == "Player5"
+
+
+def test_consensus_quorum() -> None:
+    proposals = {"Player1": "Player5", "Player2": "Player5", "Player3": "Player7"}
+    assert _discussion_consensus(proposals, 3, 1.0) is None
+    assert _discussion_consensus(proposals, 3, 0.6) == "Player5"
+    assert _discussion_consensus(
+        {"Player1": None, "Player2": None}, 2, 0.5) is None
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""锦标赛入口：在同一个事件循环中并发运行多局游戏，用于批量评测模型。
+
+每局拥有独立的玩家、日志与经验存档，模型客户端、连接池与限流器在所有
+对局之间共享。每完成一局就刷新一次结果清单（JSON），中途中断也能保留
+已完成对局的结果。
+
+对局很多时单个事件循环会被提示词拼装、校验与日志写入占满一个 CPU 核心，
+此时可用 `--workers` 把对局按轮询分片到多个子进程，每个子进程运行自己的
+事件循环（每进程最多 `--concurrency` 局），结果经队列实时回传给父进程汇总。
+多进程共享同一 API Key 时建议同时启用 RATE_GOVERNOR_ENABLED。
+
+用法：python backend/tournament.py --games 20 --concurrency 4 [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import queue
+import sys
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from config import config
+from core.game_engine import werewolves_game
+from core.http_pool import close_http_clients
+from core.knowledge_base import PlayerKnowledgeStore
+from core.warmup import start_warmup, wait_for_warmup
+from main import get_official_agents, player_model_label, player_model_overrides
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run a WolfMind tournament")
+    p.add_argument("--games", type=int, default=10, help="Number of games")
+    p.add_argument("--concurrency", type=int, default=None,
+                   help="Max games running at once per worker "
+                        "(default TOURNAMENT_CONCURRENCY)")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Worker processes to shard games across "
+                        "(default TOURNAMENT_WORKERS)")
+    p.add_argument("--seed", type=int, default=None,
+                   help="Base seed; game i uses seed + i (default GAME_SEED, "
+                        "random per game if unset)")
+    p.add_argument("--out", default=None, help="Output manifest JSON path")
+    return p.parse_args()
+
+
+async def run_game(
+    index: int,
+    tournament_id: str,
+    semaphore: asyncio.Semaphore,
+    warmup: asyncio.Task | None,
+    model_overrides: list[dict[str, str] | None] | None = None,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """运行一局并返回结果；异常只记录在结果中，不影响其他对局。
+
+    `model_overrides` 为 9 个座位各自的模型配置，默认按当前配置生成；
+    `seed` 为本局的随机种子，未提供时由引擎随机生成并记录在结果中。
+    """
+
+    async with semaphore:
+        game_id = f"{tournament_id}_g{index:03d}"
+        model_overrides = model_overrides or player_model_overrides()
+        players = [
+            get_official_agents(f"Player{idx + 1}", model_overrides[idx])
+            for idx in range(9)
+        ]
+        player_model_map = {
+            player.name: player_model_label(model_overrides[idx])
+            for idx, player in enumerate(players)
+        }
+        knowledge_store = PlayerKnowledgeStore(
+            checkpoint_dir=config.experience_dir,
+            base_filename=f"{config.experience_id}_{game_id}",
+        )
+        knowledge_store.set_player_models(player_model_map)
+        knowledge_store.save()
+
+        results: dict[str, Any] = {"index": index}
+        try:
+            await werewolves_game(
+                players,
+                knowledge_store=knowledge_store,
+                player_model_map=player_model_map,
+                warmup=warmup,
+                game_id=game_id,
+                results=results,
+                seed=seed,
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            results["error"] = f"{type(exc).__name__}: {exc}"
+            print(f"❌ 对局 {game_id} 异常终止: {exc}")
+
+        roles = results.get("roles", {})
+        results["seats"] = {
+            name: {"role": roles.get(name), "model": model}
+            for name, model in player_model_map.items()
+        }
+        return results
+
+
+def summarize_games(games: list[dict[str, Any]]) -> dict[str, Any]:
+    """汇总已完成对局的胜率、平均回合数、耗时与 token 用量。"""
+
+    finished = [g for g in games if not g.get("error")]
+    winners = Counter(g.get("winner") for g in finished)
+    return {
+        "completed": len(finished),
+        "errors": len(games) - len(finished),
+        "werewolf_wins": winners.get("werewolf", 0),
+        "villager_wins": winners.get("villager", 0),
+        "no_winner": winners.get(None, 0),
+        "avg_rounds": round(
+            sum(g.get("rounds", 0) for g in finished) / len(finished), 2
+        ) if finished else 0,
+        "avg_duration_sec": round(
+            sum(g.get("duration_sec", 0) for g in finished) / len(finished), 2
+        ) if finished else 0,
+        "total_tokens": sum(
+            g.get("token_usage", {}).get("total_tokens", 0) for g in games),
+    }
+
+
+def write_manifest(path: Path, manifest: dict[str, Any]) -> None:
+    """把结果清单写为 JSON。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _record_result(
+    manifest: dict[str, Any],
+    manifest_path: Path,
+    result: dict[str, Any],
+) -> None:
+    """把一局结果并入清单并立即落盘。"""
+
+    manifest["games"].append(result)
+    manifest["games"].sort(key=lambda g: g["index"])
+    manifest["summary"] = summarize_games(manifest["games"])
+    write_manifest(manifest_path, manifest)
+    print(
+        f"✓ 对局 {result.get('game_id', result['index'])} 完成 "
+        f"({len(manifest['games'])}/{manifest['games_requested']})，"
+        f"胜方: {result.get('winner')}"
+    )
+
+
+async def _play_games(
+    indices: list[int],
+    tournament_id: str,
+    concurrency: int,
+    base_seed: int | None = None,
+):
+    """在当前事件循环中并发运行指定编号的对局，按完成顺序产出结果。
+
+    指定 `base_seed` 时第 i 局的种子为 `base_seed + i`，与分片方式无关。
+    """
+
+    # 同一事件循环内的对局共用一次预热
+    warmup = start_warmup()
+    await wait_for_warmup(warmup)
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    tasks = [
+        asyncio.create_task(run_game(
+            idx, tournament_id, semaphore, warmup,
+            seed=base_seed + idx if base_seed is not None else None,
+        ))
+        for idx in indices
+    ]
+    for finished in asyncio.as_completed(tasks):
+        yield await finished
+
+
+async def _shard_main(
+    indices: list[int],
+    tournament_id: str,
+    concurrency: int,
+    results: "queue.Queue[dict[str, Any]]",
+    base_seed: int | None = None,
+) -> None:
+    try:
+        async for result in _play_games(
+            indices, tournament_id, concurrency, base_seed,
+        ):
+            results.put(result)
+    finally:
+        await close_http_clients()
+
+
+def _run_shard(
+    indices: list[int],
+    tournament_id: str,
+    concurrency: int,
+    results: "queue.Queue[dict[str, Any]]",
+    base_seed: int | None = None,
+) -> None:
+    """子进程入口：用独立的事件循环运行一个分片。"""
+    asyncio.run(_shard_main(
+        indices, tournament_id, concurrency, results, base_seed))
+
+
+async def _collect_sharded(
+    manifest: dict[str, Any],
+    manifest_path: Path,
+    n_games: int,
+    workers: int,
+    concurrency: int,
+    base_seed: int | None = None,
+) -> None:
+    """把对局轮询分片给子进程，并实时汇总它们回传的结果。"""
+
+    shards = [
+        list(range(w + 1, n_games + 1, workers)) for w in range(workers)
+    ]
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as mp_manager, ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx,
+    ) as executor:
+        results = mp_manager.Queue()
+        futures: dict[Future, list[int]] = {
+            executor.submit(
+                _run_shard, shard, manifest["tournament_id"], concurrency, results,
+                base_seed,
+            ): shard
+            for shard in shards if shard
+        }
+        received: set[int] = set()
+        while len(received) < n_games:
+            try:
+                result = await asyncio.to_thread(results.get, True, 1.0)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    break
+                continue
+            received.add(result["index"])
+            _record_result(manifest, manifest_path, result)
+
+        # 子进程崩溃时，未回传的对局记为失败
+        for future, shard in futures.items():
+            error = future.exception() if future.done() else None
+            for index in shard:
+                if index not in received:
+                    _record_result(manifest, manifest_path, {
+                        "index": index,
+                        "error": f"worker failed: {error}",
+                    })
+
+
+async def run_tournament(
+    n_games: int,
+    concurrency: int,
+    manifest_path: Path | None = None,
+    workers: int = 1,
+    seed: int | None = None,
+) -> Path:
+    """运行 `n_games` 局并返回结果清单路径。
+
+    `workers` 为 1 时在当前事件循环中最多同时运行 `concurrency` 局；
+    大于 1 时分片到多个子进程，每个子进程最多同时运行 `concurrency` 局。
+    指定 `seed` 时第 i 局的种子为 `seed + i`，同一种子的两次锦标赛可直接对比。
+    """
+
+    tournament_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    manifest_path = manifest_path or (
+        Path(config.tournament_dir) / f"tournament_{tournament_id}.json")
+    workers = max(min(workers, n_games), 1)
+    manifest: dict[str, Any] = {
+        "tournament_id": tournament_id,
+        "started_at": datetime.now().isoformat(),
+        "games_requested": n_games,
+        "concurrency": concurrency,
+        "workers": workers,
+        "seed": seed,
+        "model_provider": config.model_provider,
+        "summary": {},
+        "games": [],
+    }
+
+    if workers > 1:
+        await _collect_sharded(
+            manifest, manifest_path, n_games, workers, concurrency, seed)
+    else:
+        async for result in _play_games(
+            list(range(1, n_games + 1)), tournament_id, concurrency, seed,
+        ):
+            _record_result(manifest, manifest_path, result)
+
+    manifest["finished_at"] = datetime.now().isoformat()
+    write_manifest(manifest_path, manifest)
+    return manifest_path
+
+
+async def main() -> None:
+    args = _parse_args()
+
+    is_valid, error_msg = config.validate()
+    if not is_valid:
+        print(f"❌ 配置错误: {error_msg}")
+        print("请检查 .env 文件并设置正确的配置")
+        sys.exit(1)
+    config.print_config()
+
+    concurrency = args.concurrency or config.tournament_concurrency
+    workers = args.workers or config.tournament_workers
+    print(
+        f"\n🏆 锦标赛开始：共 {args.games} 局，{workers} 个进程，"
+        f"每进程最多同时 {concurrency} 局\n"
+    )
+    if workers > 1 and not config.rate_governor_enabled:
+        print("⚠️ 多进程运行时各进程独立限流，建议启用 RATE_GOVERNOR_ENABLED")
+    try:
+        manifest_path = await run_tournament(
+            args.games,
+            concurrency,
+            Path(args.out) if args.out else None,
+            workers=workers,
+            seed=args.seed if args.seed is not None else config.game_seed,
+        )
+    finally:
+        await close_http_clients()
+    print(f"\n✓ 结果清单已保存: {manifest_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())